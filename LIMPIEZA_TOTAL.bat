@@ -34,6 +34,7 @@ echo [2/5] Limpiando historial y logs de la carpeta 'data'...
 REM Preserva la carpeta 'data' pero elimina DBs, CSVs, y JSONs de seguimiento.
 if exist "data" (
     del /q "data\promo_bot.db" >nul 2>&1
+    del /q "data\seen_cache.db*" >nul 2>&1
     del /q "data\*.csv" >nul 2>&1
     del /q "data\*.json" >nul 2>&1
     del /q "data\*.log" >nul 2>&1
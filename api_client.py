@@ -1,42 +1,19 @@
-import requests
-import json
+from src.meli_search import search
 
 def buscar_ofertas_ml(query, limite=10):
-    # MLM = MercadoLibre México
-    url = f"https://api.mercadolibre.com/sites/MLM/search"
-    
-    params = {
-        'q': query,
-        'limit': limite,
-        'sort': 'price_asc', # Opcional: ordenar por precio
-        # 'condition': 'new' # Opcional: solo productos nuevos
-    }
-
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status() # Lanza error si falla la petición
-        data = response.json()
-
-        ofertas = []
-        
-        # Iteramos sobre los resultados
-        for item in data.get('results', []):
-            producto = {
-                'id': item.get('id'),
-                'titulo': item.get('title'),
-                'precio': item.get('price'),
-                'moneda': item.get('currency_id'),
-                'link': item.get('permalink'),
-                'imagen': item.get('thumbnail'),
-                'envio_gratis': item.get('shipping', {}).get('free_shipping', False)
-            }
-            ofertas.append(producto)
-            
-        return ofertas
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error al conectar con la API: {e}")
-        return []
+    # MLM = MercadoLibre México (la petición la hace src/meli_search.py)
+    ofertas = []
+    for item in search(query, pages=1, limit_per_page=limite, sort="price_asc"):
+        ofertas.append({
+            'id': item['id'],
+            'titulo': item['title'],
+            'precio': item['price'],
+            'moneda': item['currency_id'],
+            'link': item['permalink'],
+            'imagen': item['thumbnail'],
+            'envio_gratis': item['free_shipping']
+        })
+    return ofertas
 
 # --- Prueba del script ---
 if __name__ == "__main__":
@@ -45,4 +22,4 @@ if __name__ == "__main__":
     
     print(f"Encontrados {len(resultados)} resultados para '{busqueda}':")
     for p in resultados:
-        print(f"- {p['titulo']} | ${p['precio']} MXN | {p['link']}")
\ No newline at end of file
+        print(f"- {p['titulo']} | ${p['precio']} MXN | {p['link']}")
@@ -1,5 +1,7 @@
 import requests
 
+from src.rate_limiter import request
+
 def buscar_con_token(busqueda, access_token):
     url = "https://api.mercadolibre.com/sites/MLM/search"
     
@@ -17,7 +19,7 @@ def buscar_con_token(busqueda, access_token):
     print(f"📡 Buscando '{busqueda}' con credenciales...")
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = request("GET", url, headers=headers, params=params)
         
         # Si el token venció o está mal, lanzará error aquí
         response.raise_for_status() 
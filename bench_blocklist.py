@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+bench_blocklist.py
+
+Compara el matcher compilado de src/blocklist.py contra los seis loops
+`keyword in text` que tenía main.should_block, sobre unos miles de títulos.
+
+Los títulos salen de los CSV del bot (audit_offers.csv,
+data/ofertas_publicadas.csv, data/bloqueados.csv) y se completan con
+títulos sintéticos hasta --titles. Además del tiempo muestra en qué
+títulos difieren (falsos positivos por subcadena que ya no bloquean,
+acentos que antes se escapaban).
+
+Uso:
+    python bench_blocklist.py
+    python bench_blocklist.py --titles 10000 --repeat 5
+"""
+
+import argparse
+import csv
+import random
+import time
+from collections import Counter
+from pathlib import Path
+
+from src.blocklist import block_reason
+
+ROOT = Path(__file__).resolve().parent
+CSV_SOURCES = (ROOT / "audit_offers.csv", ROOT / "data" / "ofertas_publicadas.csv", ROOT / "data" / "bloqueados.csv")
+
+# Copia de las listas y el algoritmo viejo de main.py (referencia)
+LEGACY_RULES = (
+    ("🔞 Adulto", ["juguete sexual", "adultos", "sexy", "erotico", "dildo", "sexo", "condon", "pene", "vibrador", "lubricante"]),
+    ("👕 Ropa íntima", ["ropa interior", "boxer", "calzon", "braga", "panty", "panties", "tanga", "lenceria", "brasier"]),
+    ("💊 Farmacia/suplemento", ["vitamina", "suplemento alimenticio", "farmacia", "medicina", "pastilla", "tableta recubierta", "medicamento"]),
+    ("🏠 Línea blanca/muebles", ["colchon", "matrimonial", "king", "queen", "parrilla de gas", "parrilla electrica", "estufa",
+                                "lavadora", "secadora", "refrigerador", "refrigeradora", "sala", "comedor", "ropero", "closet"]),
+    ("💳 Digital", ["gift card", "tarjeta regalo", "saldo", "codigo digital", "licencia digital"]),
+    ("📚 Misceláneo", ["libro usado", "revista", "fanzine", "pintura al oleo", "lienzo", "acuarela", "manualidades", "hecho a mano",
+                      "hospital", "hospitalario", "quirurgico", "ortopedico", "silla de ruedas", "muletas",
+                      "protector de pantalla", "mica de vidrio", "glass", "funda para celular", "case para iphone",
+                      "carcasa para", "correa para", "extensible para"]),
+)
+
+WORDS = (
+    "audífonos inalámbricos bluetooth smart tv pulgadas laptop ryzen core ssd gb consola control "
+    "cafetera freidora de aire aspiradora robot licuadora sartén juego cuchillos mochila tenis "
+    "reloj analógico sensor parking salamandra peluche balón bicicleta taladro atornillador kit "
+    "monitor gamer teclado mecánico mouse silla oficina escritorio lámpara led bocina portátil "
+    "colchón matrimonial lavadoras sala comedor vitaminas gift card funda para celular glass "
+    "calzoncillos pantymedias colchoneta medicinal kingston hospitalaria "
+    "negro blanco gris azul rojo paquete con piezas original nuevo reacondicionado"
+).split()
+
+
+def legacy_should_block(it: dict):
+    text = f"{(it.get('title') or '').lower()} {(it.get('category_label') or '').lower()} {(it.get('promo_tag') or '').lower()}"
+    for label, keywords in LEGACY_RULES:
+        for keyword in keywords:
+            if keyword in text:
+                return f"{label}: '{keyword}'"
+    return None
+
+
+def load_titles(n: int, seed: int = 7) -> list[str]:
+    titles = []
+    for path in CSV_SOURCES:
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8", newline="") as f:
+            titles += [row["title"] for row in csv.DictReader(f) if row.get("title")]
+    rnd = random.Random(seed)
+    while len(titles) < n:
+        titles.append(" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(4, 12))).capitalize())
+    return titles[:n]
+
+
+def run(label: str, fn, items: list[dict], repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        results = [fn(it) for it in items]
+        best = min(best, time.perf_counter() - t0)
+    blocked = sum(1 for r in results if r)
+    print(f"{label:<12}{best * 1000:>10.1f}{best / len(items) * 1e6:>12.2f}{blocked:>12}")
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blocklist: loops de substring vs regex compilado")
+    parser.add_argument("--titles", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--show", type=int, default=8, help="ejemplos de diferencias a mostrar")
+    args = parser.parse_args()
+
+    items = [{"title": t, "promo_tag": ""} for t in load_titles(args.titles)]
+    print(f"🧪 {len(items)} títulos, mejor de {args.repeat}\n")
+    print(f"{'matcher':<12}{'total ms':>10}{'µs/título':>12}{'bloqueados':>12}")
+    t_old, old = run("loops", legacy_should_block, items, args.repeat)
+    t_new, new = run("compilado", block_reason, items, args.repeat)
+    if t_new:
+        print(f"\n⚡ {t_old / t_new:.1f}x más rápido")
+
+    diffs = [(it["title"], o, n) for it, o, n in zip(items, old, new) if bool(o) != bool(n)]
+    print(f"\n🔍 {len(diffs)} títulos con resultado distinto")
+    # Por palabra: qué dejó de bloquear (revisar que sean falsos positivos)
+    # y qué empezó a bloquear (acentos, plurales, palabras nuevas)
+    lost = Counter(o.split("'")[1] for _, o, n in diffs if o)
+    gained = Counter(n.split("'")[1] for _, o, n in diffs if n)
+    print(f"   ya no bloquea: {dict(lost.most_common())}")
+    print(f"   ahora bloquea: {dict(gained.most_common())}")
+    for title, o, n in diffs[:args.show]:
+        print(f"   {title[:60]!r}\n      antes: {o}\n      ahora: {n}")
+
+
+if __name__ == "__main__":
+    main()
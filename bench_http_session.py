@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+bench_http_session.py
+
+Mide cuánto ahorra la sesión compartida (src/http_session) en un ciclo de
+publicación: N peticiones a api.telegram.org con requests sueltos (un
+handshake TCP+TLS por mensaje, como antes) contra la sesión con pool.
+
+Por defecto hace getMe (no publica nada). Con --send manda de verdad N
+mensajes de prueba al chat personal (TELEGRAM_PERSONAL_CHAT_ID).
+
+Uso:
+    python bench_http_session.py
+    python bench_http_session.py --posts 10 --url https://api.mercadolibre.com/sites/MLM
+"""
+
+import argparse
+import os
+import time
+
+import requests
+import urllib3.connection
+from dotenv import load_dotenv
+
+from src.http_session import get_session
+
+_connects = {"n": 0}
+_original_connect = urllib3.connection.HTTPConnection.connect
+
+
+def _counting_connect(self):
+    _connects["n"] += 1
+    return _original_connect(self)
+
+
+urllib3.connection.HTTPConnection.connect = _counting_connect
+
+
+def run(label: str, send, posts: int):
+    _connects["n"] = 0
+    latencies = []
+    t0 = time.perf_counter()
+    for _ in range(posts):
+        t = time.perf_counter()
+        try:
+            send()
+        except requests.RequestException as e:
+            print(f"   ⚠️ {label}: {e}")
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - t0
+    first = latencies[0] if latencies else 0.0
+    rest = sum(latencies[1:]) / max(1, len(latencies) - 1)
+    print(f"{label:<12}{_connects['n']:>10}{total:>10.2f}{first:>10.3f}{rest:>12.3f}")
+    return total
+
+
+def main():
+    load_dotenv()
+    token = os.getenv("TELEGRAM_TOKEN", "").strip()
+    chat_id = os.getenv("TELEGRAM_PERSONAL_CHAT_ID", "").strip()
+
+    parser = argparse.ArgumentParser(description="Handshakes: requests sueltos vs sesión compartida")
+    parser.add_argument("--posts", type=int, default=10)
+    parser.add_argument("--url", default=f"https://api.telegram.org/bot{token}/getMe" if token else "https://api.telegram.org/")
+    parser.add_argument("--send", action="store_true", help="sendMessage real al chat personal")
+    args = parser.parse_args()
+
+    if args.send and token and chat_id:
+        url = f"https://api.telegram.org/bot{token}/sendMessage"
+        payload = {"chat_id": chat_id, "text": "🧪 bench_http_session"}
+        fresh = lambda: requests.post(url, json=payload, timeout=15)
+        pooled = lambda: get_session().post(url, json=payload, timeout=15)
+    else:
+        url = args.url
+        fresh = lambda: requests.get(url, timeout=15)
+        pooled = lambda: get_session().get(url, timeout=15)
+
+    print(f"🌐 {args.posts} peticiones a {url.split('/bot')[0]}\n")
+    print(f"{'modo':<12}{'conexiones':>10}{'total s':>10}{'1ra s':>10}{'resto prom':>12}")
+    t_fresh = run("sueltos", fresh, args.posts)
+    t_pooled = run("sesión", pooled, args.posts)
+    if t_pooled:
+        print(f"\n⚡ {t_fresh - t_pooled:.2f}s ahorrados ({t_fresh / t_pooled:.1f}x) en {args.posts} peticiones")
+
+
+if __name__ == "__main__":
+    main()
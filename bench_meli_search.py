@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+bench_meli_search.py
+
+Compara la búsqueda de la API de ML en serie (un requests.get por página,
+como hacían src/fetcher.py / src/meli.py) contra src/meli_search
+(offsets en paralelo sobre una sesión aiohttp).
+
+Uso:
+    python bench_meli_search.py
+    python bench_meli_search.py --q "audifonos" --pages 6 --limit 50 --repeat 3
+"""
+
+import argparse
+import time
+
+import requests
+
+from src import meli_search
+from src.meli_search import HEADERS, SEARCH_URL, search_raw
+
+
+def serial_search(q: str, pages: int, limit: int) -> list:
+    """El loop de antes: una petición tras otra, sin sesión compartida."""
+    results = []
+    for p in range(pages):
+        params = {"q": q, "offset": p * limit, "limit": limit, "sort": "discount"}
+        try:
+            resp = requests.get(SEARCH_URL, params=params, headers=HEADERS, timeout=15)
+            results.append(resp.json().get("results", []) if resp.status_code == 200 else [])
+        except (requests.RequestException, ValueError):
+            results.append([])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serie vs async de /sites/MLM/search")
+    parser.add_argument("--q", default="ofertas")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=meli_search.SEARCH_CONCURRENCY)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"🔎 q='{args.q}' | {args.pages} págs x {args.limit} | concurrencia={args.concurrency} | repeat={args.repeat}\n")
+    print(f"{'modo':<10}{'items':>8}{'seg/ronda':>12}{'items/seg':>12}")
+
+    runs = {
+        "serie": lambda: serial_search(args.q, args.pages, args.limit),
+        "async": lambda: search_raw(args.q, args.pages, args.limit, concurrency=args.concurrency),
+    }
+    times = {}
+    for name, fn in runs.items():
+        total_items = 0
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            total_items = sum(len(p) for p in fn())
+        per_round = (time.perf_counter() - t0) / args.repeat
+        times[name] = per_round
+        rate = total_items / per_round if per_round else 0
+        print(f"{name:<10}{total_items:>8}{per_round:>12.2f}{rate:>12.0f}")
+
+    if times.get("async"):
+        print(f"\n⚡ async {times['serie'] / times['async']:.1f}x más rápido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+bench_parsers.py
+
+Benchmark lado a lado de los backends de _parse_html_offers
+(bs4 / lxml / selectolax) sobre páginas guardadas.
+
+Uso:
+    python bench_parsers.py                      # usa data/snapshots
+    python bench_parsers.py pagina1.html dir/    # archivos o carpetas
+    python bench_parsers.py --repeat 10
+
+Acepta .html y .html.gz. Verifica que todos los backends devuelvan
+exactamente los mismos items que bs4 (también con cuerpo vacío o solo
+espacios, p.ej. un 200 sin contenido) y reporta items/seg.
+"""
+
+import argparse
+import gzip
+import sys
+import time
+from pathlib import Path
+
+from src.html_backends import BACKENDS, resolve_backend
+from src.offers_fetcher import _parse_html_offers
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_DIR = ROOT / "data" / "snapshots"
+# Casos borde que siempre se comparan (no cuentan para el benchmark)
+EDGE_PAGES = [("(vacía)", ""), ("(solo espacios)", " \n\t  \r\n")]
+
+
+def _load_pages(paths) -> list[tuple[str, str]]:
+    files = []
+    for raw in paths:
+        p = Path(raw)
+        if p.is_dir():
+            files.extend(sorted(p.rglob("*.html")) + sorted(p.rglob("*.html.gz")))
+        elif p.exists():
+            files.append(p)
+
+    pages = []
+    for f in files:
+        if f.suffix == ".gz":
+            html = gzip.decompress(f.read_bytes()).decode("utf-8", errors="replace")
+        else:
+            html = f.read_text(encoding="utf-8", errors="replace")
+        pages.append((f.name, html))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de parsers HTML")
+    parser.add_argument("paths", nargs="*", default=[str(DEFAULT_DIR)])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = _load_pages(args.paths)
+    if not pages:
+        print(f"❌ No encontré páginas .html/.html.gz en {args.paths}")
+        sys.exit(1)
+
+    available = []
+    for b in BACKENDS:
+        try:
+            if resolve_backend(b) == b:
+                available.append(b)
+        except ImportError:
+            pass
+
+    print(f"📄 {len(pages)} páginas | repeat={args.repeat} | backends: {', '.join(available)}\n")
+
+    pages = pages + EDGE_PAGES
+    reference = {name: _parse_html_offers(html, "bs4") for name, html in pages} if "bs4" in available else None
+
+    print(f"{'backend':<12}{'items':>8}{'seg':>10}{'items/seg':>12}{'idéntico':>10}")
+    for b in available:
+        outputs = {}
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            for name, html in pages:
+                outputs[name] = _parse_html_offers(html, b)
+        elapsed = time.perf_counter() - t0
+
+        total_items = sum(len(v) for v in outputs.values())
+        rate = total_items * args.repeat / elapsed if elapsed else 0
+        same = "—" if reference is None else ("✅" if outputs == reference else "❌")
+        print(f"{b:<12}{total_items:>8}{elapsed:>10.2f}{rate:>12.0f}{same:>10}")
+
+        if reference is not None and outputs != reference:
+            for name in outputs:
+                if outputs[name] != reference[name]:
+                    print(f"   ⚠️ difiere en {name}: {len(outputs[name])} vs {len(reference[name])} items")
+
+
+if __name__ == "__main__":
+    main()
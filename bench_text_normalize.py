@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+bench_text_normalize.py
+
+Costo por título de la normalización vieja contra src/text_normalize:
+
+  - acentos: .upper().replace("Á","A")... encadenado (offers_fetcher,
+    promo_enricher, main) contra fold_upper() (mismo costo, pero cubre ñ, ü y el
+    resto de los diacríticos latinos)
+  - títulos: el main.normalize_title viejo (16 re.sub por título) contra
+    title_key() sin memo (caché vaciado) y con memo (títulos repetidos,
+    como pasa entre páginas, fuentes y ciclos)
+
+Uso:
+    python bench_text_normalize.py
+    python bench_text_normalize.py --titles 20000 --repeat 5
+"""
+
+import argparse
+import re
+import time
+
+from bench_blocklist import load_titles
+from src.text_normalize import cache_info, fold_upper, title_key
+
+OLD_COLORS = [
+    "negro", "blanco", "gris", "rojo", "azul", "rosa", "verde",
+    "beige", "café", "marr[oó]n", "amarillo", "naranja", "morado", "lila", "dorado", "plateado",
+]
+
+
+def legacy_normalize_text(text: str) -> str:
+    return text.upper().replace("Á", "A").replace("É", "E").replace("Í", "I").replace("Ó", "O").replace("Ú", "U")
+
+
+def legacy_normalize_title(title: str) -> str:
+    title = title.lower()
+    for color in OLD_COLORS:
+        title = re.sub(rf"\b{color}\b", "", title)
+    return re.sub(r"\s+", " ", title).strip()
+
+
+def per_title_us(fn, titles: list[str], repeat: int, before=None) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        if before: before()
+        t0 = time.perf_counter()
+        for t in titles:
+            fn(t)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(titles) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalización de texto: vieja vs text_normalize")
+    parser.add_argument("--titles", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    titles = load_titles(args.titles)
+    print(f"🧪 {len(titles)} títulos, mejor de {args.repeat}\n")
+    print(f"{'caso':<34}{'µs/título':>12}")
+
+    rows = (
+        ("acentos: replace encadenado", per_title_us(legacy_normalize_text, titles, args.repeat)),
+        ("acentos: fold_upper", per_title_us(fold_upper, titles, args.repeat)),
+        ("título: 16 re.sub (viejo)", per_title_us(legacy_normalize_title, titles, args.repeat)),
+        ("título: title_key sin memo", per_title_us(title_key.__wrapped__, titles, args.repeat)),
+        ("título: title_key con memo", per_title_us(title_key, titles, args.repeat)),
+    )
+    for label, us in rows:
+        print(f"{label:<34}{us:>12.2f}")
+
+    old, cold, warm = rows[2][1], rows[3][1], rows[4][1]
+    print(f"\n⚡ title_key: {old / cold:.1f}x sin memo, {old / warm:.1f}x con memo ({cache_info()})")
+
+
+if __name__ == "__main__":
+    main()
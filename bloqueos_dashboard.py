@@ -6,7 +6,7 @@ from collections import Counter
 
 import sys
 sys.path.append("src")
-from filters import BANNED_KEYWORDS
+from src.blocklist import count_keywords
 
 OUTPUT_DIR = "dashboard/analytics"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -31,14 +31,8 @@ df = pd.read_csv(csv_path)
 def generate_blocked_reasons_chart(csv_path="data/bloqueados.csv"):
     df = pd.read_csv(csv_path)
     
-    all_reasons = []
-    for title in df["title"].fillna(""):
-        title_lower = title.lower()
-        for word in BANNED_KEYWORDS:
-            if word in title_lower:
-                all_reasons.append(word)
-
-    reason_counts = Counter(all_reasons)
+    # Mismo matcher que main.should_block (palabra completa, sin acentos)
+    reason_counts = Counter(count_keywords(df["title"].fillna("")))
     common_reasons = dict(reason_counts.most_common(10))
 
     if not common_reasons:
@@ -55,10 +49,7 @@ def generate_blocked_reasons_chart(csv_path="data/bloqueados.csv"):
 
     print("✅ Gráfico de bloqueos generado en", f"{OUTPUT_DIR}/blocked_reasons.png")
 
-# NOTA: Asegúrate de importar o definir BANNED_KEYWORDS en este script o pásalos como parámetro
-
 if __name__ == "__main__":
     from dashboard_generator import load_data
-    from filters import BANNED_KEYWORDS
 
     generate_blocked_reasons_chart()
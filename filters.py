@@ -1,48 +1,27 @@
 # filters.py
+#
+# Compatibilidad: las reglas viven ahora en src/blocklist.py (única fuente
+# para main.should_block y los reportes). Aquí solo se re-exportan.
+
+from src.blocklist import KEYWORDS, keywords_for
 
 # 🔞 Adultos
-BANNED_ADULT = [
-    "juguete sexual", "adultos", "sexy", "erotico",
-    "anal", "dildo", "sexo", "condon", "pene"
-]
+BANNED_ADULT = keywords_for("adult")
 
 # 👕 Ropa íntima
-BANNED_CLOTHING = [
-    "ropa interior", "boxer", "calzon",
-    "braga", "panty", "panties", "tanga", "lenceria"
-]
+BANNED_CLOTHING = keywords_for("clothing")
 
 # 💊 Farmacia y suplementos
-BANNED_HEALTH = [
-    "vitamina", "suplemento alimenticio", "farmacia",
-    "medicina", "pastilla", "tableta recubierta"
-]
+BANNED_HEALTH = keywords_for("health")
 
 # 🏠 Línea blanca y muebles
-BANNED_HOME = [
-    "colchon", "matrimonial", "king", "queen",
-    "parrilla de gas", "parrilla electrica", "estufa", 
-    "lavadora", "secadora", "refrigerador", "refrigeradora"
-]
+BANNED_HOME = keywords_for("home")
 
 # 💳 Productos digitales
-BANNED_DIGITAL = [
-    "gift card", "tarjeta regalo", "recarga", "recargas"
-]
+BANNED_DIGITAL = keywords_for("digital")
 
 # 📚 Otros
-BANNED_MISC = [
-    "libro usado", "revista", "fanzine",
-    "pintura al oleo", "lienzo", "acuarela",
-    "manualidades", "hecho a mano",
-    "hospital", "hospitalario", "quirurgico", "ortopedico",
-    "silla de ruedas",
-    "protector de pantalla", "mica de vidrio",
-    "funda para celular", "case para iphone", "carcasa para"
-]
+BANNED_MISC = keywords_for("misc")
 
 # ✅ Unión de todas
-BANNED_KEYWORDS = (
-    BANNED_ADULT + BANNED_CLOTHING + BANNED_HEALTH +
-    BANNED_HOME + BANNED_DIGITAL + BANNED_MISC
-)
+BANNED_KEYWORDS = list(KEYWORDS)
@@ -7,7 +7,6 @@ from urllib.parse import urlsplit, urlparse, urlunparse
 from html import escape
 import sys
 import io
-import re
 import difflib
 import random
 import csv
@@ -25,13 +24,21 @@ from src.rules import score_item
 from src.telegram import post_telegram, post_telegram_photo
 from src.store_cache import (
     init_title_cache,
+    flush_seen_cache,
     is_product_seen,
     add_product_to_cache
 )
 from src.affiliate_runtime import get_or_create_affiliate_url
-from src.promo_enricher import enrich_item
+from src.promo_enricher import enrich_item, prefetch_details
 from src.database import add_published_offer, init_database, print_stats
 from src.price_validator import is_discount_real
+from src.blocklist import block_reason
+from src.image_dedup import (
+    filter_candidates as filter_image_duplicates,
+    remember_published as remember_published_image,
+    save_index as save_image_index,
+)
+from src.text_normalize import fold, fold_upper, normalize_title
 from src.logger import get_logger
 
 # ============================
@@ -43,88 +50,12 @@ logger = get_logger("promo_adictos")
 # 🔥 BLOQUEO DE PRODUCTOS (BLACKLIST)
 # ============================
 
-# 🔞 Adultos
-BANNED_ADULT = [
-    "juguete sexual", "adultos", "sexy", "erotico",
-    "dildo", "sexo", "condon", "pene", "vibrador", "lubricante"
-]
-
-# 👕 Ropa íntima
-BANNED_CLOTHING = [
-    "ropa interior", "boxer", "calzon",
-    "braga", "panty", "panties", "tanga", "lenceria", "brasier"
-]
-
-# 💊 Farmacia y suplementos
-BANNED_HEALTH = [
-    "vitamina", "suplemento alimenticio", "farmacia",
-    "medicina", "pastilla", "tableta recubierta", "medicamento"
-]
-
-# 🏠 Línea blanca y muebles grandes
-BANNED_HOME = [
-    "colchon", "matrimonial", "king", "queen",
-    "parrilla de gas", "parrilla electrica", "estufa", 
-    "lavadora", "secadora", "refrigerador", "refrigeradora",
-    "sala", "comedor", "ropero", "closet"
-]
-
-# 💳 Productos digitales
-BANNED_DIGITAL = [
-    "gift card", "tarjeta regalo",
-    "saldo", "codigo digital", "licencia digital"
-]
-
-# 📚 Otros / Basura / Accesorios genéricos
-BANNED_MISC = [
-    "libro usado", "revista", "fanzine",
-    "pintura al oleo", "lienzo", "acuarela",
-    "manualidades", "hecho a mano",
-    "hospital", "hospitalario", "quirurgico", "ortopedico",
-    "silla de ruedas", "muletas",
-    "protector de pantalla", "mica de vidrio", "glass",
-    "funda para celular", "case para iphone", "carcasa para",
-    "correa para", "extensible para"
-]
-
-# ✅ Unión de todas las listas
-BLACKLIST_KEYWORDS = (
-    BANNED_ADULT + BANNED_CLOTHING + BANNED_HEALTH +
-    BANNED_HOME + BANNED_DIGITAL + BANNED_MISC
-)
-
-def normalize_title(title: str) -> str:
-    title = title.lower()
-    colores = [
-        "negro", "blanco", "gris", "rojo", "azul", "rosa", "verde",
-        "beige", "café", "marr[oó]n", "amarillo", "naranja", "morado", "lila", "dorado", "plateado"
-    ]
-    for color in colores:
-        title = re.sub(rf"\b{color}\b", "", title)
-    title = re.sub(r"\s+", " ", title).strip()
-    return title
+# Reglas y matcher compilado en src/blocklist.py (única fuente, también
+# la usa filters.py)
 
 def should_block(it: dict) -> str | None:
     """Devuelve el motivo de bloqueo si aplica, o None si pasa."""
-    title = (it.get("title") or "").lower()
-    category = (it.get("category_label") or "").lower()
-    promo = (it.get("promo_tag") or "").lower()
-    text = f"{title} {category} {promo}"
-
-    for keyword in BANNED_ADULT:
-        if keyword in text: return f"🔞 Adulto: '{keyword}'"
-    for keyword in BANNED_CLOTHING:
-        if keyword in text: return f"👕 Ropa íntima: '{keyword}'"
-    for keyword in BANNED_HEALTH:
-        if keyword in text: return f"💊 Farmacia/suplemento: '{keyword}'"
-    for keyword in BANNED_HOME:
-        if keyword in text: return f"🏠 Línea blanca/muebles: '{keyword}'"
-    for keyword in BANNED_DIGITAL:
-        if keyword in text: return f"💳 Digital: '{keyword}'"
-    for keyword in BANNED_MISC:
-        if keyword in text: return f"📚 Misceláneo: '{keyword}'"
-
-    return None
+    return block_reason(it)
 
 # ============================
 # 🎯 FILTRO DE CALIDAD
@@ -132,6 +63,10 @@ def should_block(it: dict) -> str | None:
 
 def is_low_quality(it: dict) -> bool:
     """Rechaza productos de baja calidad basado en rating y ventas."""
+    # Sin rating ni ventas reales (solo tag de promo): no hay qué revisar
+    if it.get("quality_source") == "simulated":
+        return False
+
     try:
         rating = float(it.get("rating") or 0)
     except Exception:
@@ -147,7 +82,7 @@ def is_low_quality(it: dict) -> bool:
     except Exception:
         sold = 0
 
-    promo = (it.get("promo_tag") or "").lower()
+    promo = fold(it.get("promo_tag") or "")
 
     # 1. Validación de Rating
     if reviews >= 10:
@@ -158,7 +93,7 @@ def is_low_quality(it: dict) -> bool:
             pass 
 
     # 2. Ventas mínimas si no hay promo fuerte
-    has_strong_promo = any(p in promo for p in ("relámpago", "imperdible", "oferta del día", "full", "más vendido"))
+    has_strong_promo = any(p in promo for p in ("relampago", "imperdible", "oferta del dia", "full", "mas vendido"))
 
     if sold < 50 and not has_strong_promo and rating == 0:
         logger.info(f"[Q] Pocas ventas ({sold}), sin rating y sin promo fuerte")
@@ -207,8 +142,8 @@ def get_env_int(key: str, default: int) -> int:
         return default
 
 def is_similar_title(t1: str, t2: str, threshold: float = 0.9) -> bool:
-    t1 = (t1 or "").lower().strip()
-    t2 = (t2 or "").lower().strip()
+    t1 = normalize_title(t1 or "")
+    t2 = normalize_title(t2 or "")
     if not t1 or not t2: return False
     similarity = difflib.SequenceMatcher(None, t1, t2).ratio()
     return similarity >= threshold
@@ -364,7 +299,7 @@ def get_promo_tag_safe(item: dict) -> str:
     # 🚨 PASO 2: FALLBACK DE SEGURIDAD (Si el Enricher falló o no puso emoji)
     
     # Normalizamos para la búsqueda de texto
-    combined_norm = raw_tag.upper().replace("Á","A").replace("É","E").replace("Í","I").replace("Ó","O").replace("Ú", "U")
+    combined_norm = fold_upper(raw_tag)
     
     final_label = ""
     
@@ -433,15 +368,40 @@ def caption(it, disc, link_final: str) -> str:
         
     return "\n".join(lines)
 
+# ============================
+# 📥 FUENTES DE OFERTAS
+# ============================
+
+def load_offer_sources(raw: str) -> list:
+    """[(nombre, fetch_offers)] según OFFERS_SOURCE. Importación local para evitar ciclo."""
+    sources = []
+    for name in dict.fromkeys(s.strip().lower() for s in (raw or "").split(",") if s.strip()):
+        if name == "api":
+            from src.meli_search import fetch_offers
+        elif name == "highlights":
+            from src.highlights_source import fetch_offers
+        elif name == "scraper":
+            from src.offers_fetcher import fetch_offers
+        else:
+            logger.warning(f"[SOURCE] Fuente desconocida ignorada: '{name}'")
+            continue
+        sources.append((name, fetch_offers))
+    if not sources:
+        from src.offers_fetcher import fetch_offers
+        sources.append(("scraper", fetch_offers))
+    return sources
+
 # ============================
 # 🚀 LOOP PRINCIPAL
 # ============================
 
 def run():
-    # Importación local para evitar ciclo
-    from src.offers_fetcher import fetch_offers
-
     load_dotenv()
+
+    # OFFERS_SOURCE elige la(s) fuente(s): scraper (default), api, highlights
+    # o una lista "scraper,highlights" cuyos resultados se juntan
+    sources = load_offer_sources(os.getenv("OFFERS_SOURCE", "scraper"))
+
     init_database()
     init_title_cache()
     logger.info("✅ Caché de productos inicializado")
@@ -464,7 +424,11 @@ def run():
     logger.info(f"MIN_DISCOUNT={int(min_disc*100)}%, TOP_N={top_n}, PAGES={pages}")
 
     # 1. Fetch de productos
-    items = fetch_offers(pages=pages)
+    items = []
+    for name, fetch_offers in sources:
+        found = fetch_offers(pages=pages)
+        logger.info(f"[SOURCE] {name}: {len(found)} items")
+        items.extend(found)
     logger.info(f"[DEBUG] Total items crudos: {len(items)}")
 
     # 2. Deduplicar
@@ -480,7 +444,9 @@ def run():
     items = list(unique_map.values())
     logger.info(f"[DEBUG] Items únicos: {len(items)}")
 
-    # 3. Filtrado y Enriquecimiento
+    # 3. Filtrado y Enriquecimiento (datos reales en lote: 20 ids por petición)
+    prefetch_details(it for it in items if is_valid_item(it) and not should_block(it))
+
     blocked_reasons = [] 
     blocked_items_data = [] 
     valid_candidates = []
@@ -517,9 +483,13 @@ def run():
         
     # 4. Ordenar y Seleccionar
     valid_candidates.sort(key=lambda x: x["_score"], reverse=True)
-    to_publish = valid_candidates[:top_n]
+    logger.info(f"[DEBUG] Ofertas válidas: {len(valid_candidates)}.")
+
+    # Misma foto con otro vendedor/título: solo se revisa lo que puede
+    # llegar a publicarse (TOP_N x 3) para no bajar cientos de imágenes
+    to_publish = filter_image_duplicates(valid_candidates[:top_n * 3], get_product_image)[:top_n]
 
-    logger.info(f"[DEBUG] Ofertas válidas: {len(valid_candidates)}. Publicando TOP {len(to_publish)}.")
+    logger.info(f"[DEBUG] Publicando TOP {len(to_publish)}.")
 
     # 5. Publicación
     pushed = 0
@@ -549,6 +519,7 @@ def run():
             if ok:
                 save_offer_to_csv(it, disc_val, final_link)
                 add_product_to_cache(it, final_link)
+                remember_published_image(img_url, it.get("title", ""))
                 add_published_offer(it, disc_val, final_link)
                 pushed += 1
                 
@@ -572,6 +543,15 @@ def run():
 
     # Reporte final
     print_stats()
+    logger.info(f"💾 Caché de vistos: {flush_seen_cache()} altas guardadas")
+    save_image_index()
+    from src.rate_limiter import stats_summary
+    from src.http_cache import end_cycle as cache_end_cycle
+    from src.circuit_breaker import end_cycle as breakers_end_cycle
+    logger.info(f"🌐 HTTP por host: {stats_summary()}")
+    logger.info(f"🗄️ Caché HTTP: {cache_end_cycle()}")
+    breakers = breakers_end_cycle()
+    logger.info(f"🔌 Circuitos: {breakers}")
     logger.info(f"Total publicadas: {pushed}")
 
     if pushed == 0:
@@ -582,7 +562,7 @@ def run():
     from src.alerts import send_success
     send_success(
         "Bot ejecutado exitosamente",
-        f"Duración: {duration:.1f} minutos\nPublicadas: {pushed} ofertas"
+        f"Duración: {duration:.1f} minutos\nPublicadas: {pushed} ofertas\nCircuitos: {breakers}"
     )
 
 if __name__ == "__main__":
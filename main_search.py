@@ -1,6 +1,10 @@
 import os
-import requests
-from dotenv import load_dotenv, set_key
+from dotenv import load_dotenv
+
+from src.http_cache import cached_get
+from src.http_session import APP_USER_AGENT
+from src.rate_limiter import request
+from src.token_manager import get_access_token
 
 # Cargar variables del archivo .env
 env_file = ".env"
@@ -8,52 +12,10 @@ load_dotenv(env_file)
 
 def refrescar_credenciales():
     """
-    Renueva el token y actualiza el .env
+    Access token vigente (cacheado en data/meli_token.json por token_manager;
+    solo se renueva contra /oauth/token cuando está por vencer).
     """
-    # Limpiamos comillas por si acaso quedaron en el .env
-    client_id = os.getenv("MELI_CLIENT_ID", "").strip().strip("'").strip('"')
-    client_secret = os.getenv("MELI_CLIENT_SECRET", "").strip().strip("'").strip('"')
-    refresh_token = os.getenv("MELI_REFRESH_TOKEN", "").strip().strip("'").strip('"')
-
-    if not all([client_id, client_secret, refresh_token]):
-        print("❌ Error: Faltan variables en el archivo .env")
-        return None
-
-    url = "https://api.mercadolibre.com/oauth/token"
-    payload = {
-        "grant_type": "refresh_token",
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "refresh_token": refresh_token
-    }
-
-    print("🔄 Renovando tokens con MercadoLibre...")
-    try:
-        response = requests.post(url, data=payload)
-        response.raise_for_status()
-        data = response.json()
-
-        # --- AQUÍ ESTABA EL ERROR: Faltaba definir estas variables ---
-        new_access_token = data['access_token']
-        new_refresh_token = data['refresh_token']
-        # -------------------------------------------------------------
-
-        # Guardamos el nuevo refresh token en el .env para la próxima
-        print("💾 Guardando nuevo Refresh Token en .env...")
-        set_key(env_file, "MELI_REFRESH_TOKEN", new_refresh_token, quote_mode="never")
-        
-        # Recargamos para asegurar que memoria y archivo estén sincronizados
-        load_dotenv(env_file, override=True)
-        
-        return new_access_token
-
-    except requests.exceptions.HTTPError as e:
-        print(f"❌ Error al renovar token: {e}")
-        print(f"Respuesta API: {response.text}")
-        return None
-    except Exception as e:
-        print(f"❌ Error inesperado: {e}")
-        return None
+    return get_access_token()
 
 def buscar_ofertas(query, access_token):
     url = "https://api.mercadolibre.com/sites/MLM/search"
@@ -64,7 +26,7 @@ def buscar_ofertas(query, access_token):
     #    Esto le dice a ML: "Soy yo, la app que registraste, no soy un hacker".
     headers = {
         "Authorization": f"Bearer {access_token}",
-        "User-Agent": "PromoAdictosBot/1.0",  # <--- Nombre honesto
+        "User-Agent": APP_USER_AGENT,  # <--- Nombre honesto
         "Accept": "application/json"
     }
     
@@ -77,7 +39,7 @@ def buscar_ofertas(query, access_token):
     print(f"📡 Buscando: '{query}' (Modo App Honesta)...")
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = request("GET", url, headers=headers, params=params, timeout=15)
         
         # Si falla, vamos a imprimir el error PERO NO nos rendimos
         if response.status_code != 200:
@@ -126,7 +88,7 @@ if __name__ == "__main__":
     url_item = f"https://api.mercadolibre.com/items/{id_prueba}"
     headers_item = {"Authorization": f"Bearer {token_valido}"}
     
-    resp_item = requests.get(url_item, headers=headers_item)
+    resp_item = cached_get(url_item, headers=headers_item)
     if resp_item.status_code == 200:
         d = resp_item.json()
         print(f"✅ ¡LECTURA EXITOSA! {d.get('title')} cuesta ${d.get('price')}")
@@ -1,7 +1,8 @@
-import requests
 import os
 from dotenv import load_dotenv
 
+from src.token_manager import exchange_authorization_code
+
 # Carga las variables de tu archivo .env (CLIENT_ID y CLIENT_SECRET)
 load_dotenv()
 
@@ -31,21 +32,11 @@ def obtener_primeros_tokens():
     
     auth_code = input("\nPegue el CODE (TG-xxxx...) aquí: ").strip()
 
-    # 2. Canjear el código por el token real
-    url = "https://api.mercadolibre.com/oauth/token"
-    payload = {
-        "grant_type": "authorization_code",
-        "client_id": APP_ID,
-        "client_secret": CLIENT_SECRET,
-        "code": auth_code,
-        "redirect_uri": REDIRECT_URI
-    }
-
+    # 2. Canjear el código por el token real (queda guardado en data/meli_token.json)
     print("\n--- PASO 2: GENERANDO TOKENS ---")
-    response = requests.post(url, data=payload)
+    data = exchange_authorization_code(auth_code, REDIRECT_URI)
     
-    if response.status_code == 200:
-        data = response.json()
+    if data:
         refresh_token = data['refresh_token']
         print("\n✅ ¡EXCELENTE! Tenemos conexión.")
         print(f"\nTu nuevo REFRESH TOKEN es:")
@@ -55,8 +46,7 @@ def obtener_primeros_tokens():
         print("\n>>> ACCIÓN REQUERIDA: Copia ese token largo y pégalo en tu archivo .env")
         print("donde dice MELI_REFRESH_TOKEN=...")
     else:
-        print(f"❌ Error: {response.status_code}")
-        print(response.text)
+        print("❌ No se pudo canjear el código (ver el error de arriba)")
 
 if __name__ == "__main__":
     obtener_primeros_tokens()
\ No newline at end of file
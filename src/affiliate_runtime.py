@@ -12,6 +12,8 @@ import requests
 from pathlib import Path
 from playwright.sync_api import sync_playwright, Page
 
+from src.circuit_breaker import get_breaker
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data"
 CSV_PATH = DATA_DIR / "affiliate_links.csv"
@@ -346,14 +348,22 @@ def get_or_create_affiliate_url(permalink: str) -> str | None:
         print(f"[AFF] 💾 DESDE CACHÉ: {cached}")
         return cached
 
+    # Si la sesión de afiliado está caída no pagamos 40s+10s por producto
+    breaker = get_breaker("affiliate")
+    if not breaker.allow():
+        print(f"[AFF] ⛔ Circuito abierto, se usa el permalink ({breaker.summary()})")
+        return None
+
     print(f"[AFF] 🆕 NO EN CACHÉ - GENERANDO NUEVO LINK")
     aff = _generate_affiliate_url(permalink)
     
     # ✅ VALIDACIÓN FINAL: Solo acepta SEC
     if aff and aff.startswith("https://mercadolibre.com/sec/"):
+        breaker.record_success()
         print(f"[AFF] 📁 GUARDANDO EN CSV")
         _save_mapping(permalink, aff)
         return aff
     
+    breaker.record_failure("no se generó link SEC")
     print(f"[AFF] 🚫 RECHAZADO: No se pudo generar link")
     return None
\ No newline at end of file
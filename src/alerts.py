@@ -8,9 +8,10 @@ Envía alertas al chat PERSONAL (no al grupo).
 
 import os
 from datetime import datetime
-import requests
 from dotenv import load_dotenv
 
+from src.rate_limiter import request
+
 load_dotenv()
 
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN", "").strip()
@@ -78,7 +79,7 @@ def send_alert(title: str, message: str, level: str = "ERROR"):
     }
     
     try:
-        resp = requests.post(url, data=payload, timeout=10)
+        resp = request("POST", url, data=payload, timeout=10)
         
         if resp.status_code == 200:
             print(f"[ALERT SENT] {level}: {title}")
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+blocklist.py
+
+Lista negra de productos: UNA sola fuente de reglas y UN matcher compilado.
+
+Antes había dos copias que ya no coincidían (main.py tenía "vibrador" y
+"glass", filters.py tenía "anal" y "recargas") y should_block corría seis
+loops de `keyword in text`, con falsos positivos por subcadena: "king"
+dentro de "parking", "sala" dentro de "salamandra", "anal" dentro de
+"analógico"...
+
+Aquí:
+  - BLOCK_RULES: categorías en orden -> (etiqueta, palabras clave)
+  - un solo regex con alternación y límites de palabra, compilado una vez
+    (acepta plural simple: "lavadora" bloquea "lavadoras")
+  - texto y palabras se comparan sin acentos ni mayúsculas
+    ("Colchón" ya no se escapa de "colchon")
+  - los compuestos que la subcadena vieja sí bloqueaba y que son del
+    mismo rubro ("calzoncillo", "pantymedias", "colchoneta"...) están
+    como palabras propias en BLOCK_RULES; los que eran falsos positivos
+    ("parking", "salamandra", "kingston", "analógico") ya no bloquean
+
+Uso:
+    find_blocked("Colchón Matrimonial")   -> ("🏠 Línea blanca/muebles", "colchon")
+    block_reason(item)                    -> "🏠 Línea blanca/muebles: 'colchon'" o None
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.text_normalize import fold
+
+# categoría -> (etiqueta del motivo, palabras clave). El orden define la
+# prioridad cuando dos palabras empiezan en la misma posición.
+BLOCK_RULES = {
+    # 🔞 Adultos
+    "adult": ("🔞 Adulto", [
+        "juguete sexual", "adultos", "sexy", "erotico", "anal",
+        "dildo", "sexo", "condon", "pene", "vibrador", "lubricante",
+    ]),
+    # 👕 Ropa íntima
+    "clothing": ("👕 Ropa íntima", [
+        "ropa interior", "boxer", "calzon", "calzoncillo", "calzoncito", "calzoneta",
+        "braga", "panty", "panties", "pantymedia", "pantimedia", "pantyhose",
+        "tanga", "lenceria", "brasier",
+    ]),
+    # 💊 Farmacia y suplementos
+    "health": ("💊 Farmacia/suplemento", [
+        "vitamina", "vitaminado", "vitaminada", "suplemento alimenticio", "farmacia",
+        "medicina", "medicinal", "pastilla", "tableta recubierta", "medicamento",
+    ]),
+    # 🏠 Línea blanca y muebles grandes
+    "home": ("🏠 Línea blanca/muebles", [
+        "colchon", "colchoneta", "matrimonial", "king", "queen",
+        "parrilla de gas", "parrilla electrica", "estufa",
+        "lavadora", "secadora", "refrigerador", "refrigeradora",
+        "sala", "comedor", "ropero", "closet",
+    ]),
+    # 💳 Productos digitales
+    "digital": ("💳 Digital", [
+        "gift card", "tarjeta regalo", "recarga",
+        "saldo", "codigo digital", "licencia digital",
+    ]),
+    # 📚 Otros / Basura / Accesorios genéricos
+    "misc": ("📚 Misceláneo", [
+        "libro usado", "revista", "fanzine",
+        "pintura al oleo", "lienzo", "acuarela",
+        "manualidades", "hecho a mano",
+        "hospital", "hospitalario", "hospitalaria", "quirurgico", "ortopedico",
+        "silla de ruedas", "muletas",
+        "protector de pantalla", "mica de vidrio", "glass",
+        "funda para celular", "case para iphone", "carcasa para",
+        "correa para", "extensible para",
+    ]),
+}
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Alternación factorizada por prefijos ("sal(?:a|do)" en lugar de
+    "sala|saldo"): el motor descarta una posición con un solo carácter en
+    vez de probar las ~90 palabras una por una.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node: dict) -> str:
+        end = node.get("", False)
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + emit(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:   # palabra completa aquí, pero puede seguir una más larga
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+def _build(rules: Dict[str, Tuple[str, List[str]]]) -> Tuple[re.Pattern, Dict[str, Tuple[str, str]]]:
+    """(regex compilado, palabra normalizada -> (categoría, etiqueta))."""
+    lookup: Dict[str, Tuple[str, str]] = {}
+    for category, (label, keywords) in rules.items():
+        for kw in keywords:
+            lookup.setdefault(" ".join(fold(kw).split()), (category, label))
+    return re.compile(rf"\b({_trie_regex(lookup)})(?:es|s)?\b"), lookup
+
+
+_PATTERN, _LOOKUP = _build(BLOCK_RULES)
+
+# Lista plana (para reportes como bloqueos_dashboard.py)
+KEYWORDS: List[str] = list(_LOOKUP)
+
+
+def keywords_for(category: str) -> List[str]:
+    return list(BLOCK_RULES[category][1])
+
+
+def find_blocked(*texts: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(etiqueta de la categoría, palabra) del primer match en los textos, o None."""
+    m = _PATTERN.search(fold(" ".join(t for t in texts if t)))
+    if m is None:
+        return None
+    keyword = " ".join(m.group(1).split())
+    return _LOOKUP[keyword][1], keyword
+
+
+def block_reason(it: dict) -> Optional[str]:
+    """Motivo de bloqueo del item (título, categoría y promo), o None si pasa."""
+    hit = find_blocked(it.get("title"), it.get("category_label"), it.get("promo_tag"))
+    return f"{hit[0]}: '{hit[1]}'" if hit else None
+
+
+def count_keywords(titles: Iterable[str]) -> Dict[str, int]:
+    """Cuántos títulos bloquea cada palabra (primer match por título)."""
+    counts: Dict[str, int] = {}
+    for title in titles:
+        hit = find_blocked(title)
+        if hit:
+            counts[hit[1]] = counts.get(hit[1], 0) + 1
+    return counts
@@ -18,6 +18,9 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 
+# En modo daemon mantenemos Chromium tibio entre ciclos (ver browser_manager.py)
+os.environ.setdefault("BROWSER_PERSISTENT", "1")
+
 from src.scheduler import PromoScheduler
 from main import run
 
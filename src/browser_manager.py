@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+browser_manager.py
+
+Chromium "tibio" compartido entre ciclos de scraping.
+
+En lugar de lanzar y cerrar Chromium en cada fetch_offers, mantenemos un
+solo browser + context vivos (con su cache y cookies) y vamos entregando
+páginas bajo demanda. El browser se recicla solo cuando:
+  - deja de responder (health-check falla)
+  - acumula BROWSER_MAX_NAVIGATIONS navegaciones
+  - la memoria de los procesos de Chromium pasa de BROWSER_MAX_MEMORY_MB
+    (requiere psutil, opcional)
+
+IMPORTANTE: sync_playwright está atado al hilo que lo creó y además deja
+un event loop corriendo en ese hilo: ahí ya no se puede llamar a
+asyncio.run ni abrir otro `with sync_playwright()`. Por eso el browser
+vive en un hilo PROPIO ("browser") y el trabajo se le manda con run();
+el hilo del ciclo (scheduler) queda libre para asyncio.run (items_api,
+image_dedup, meli_search...) y para el Playwright de affiliate_runtime.
+
+Uso:
+    from src.browser_manager import get_browser_manager
+
+    def job():
+        with get_browser_manager().page() as page:
+            page.goto("https://www.mercadolibre.com.mx/ofertas")
+            return page.title()
+
+    title = get_browser_manager().run(job)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+from src.offers_fetcher import LAUNCH_ARGS, USER_AGENT
+
+try:
+    import psutil  # opcional: solo para medir memoria de Chromium
+except ImportError:
+    psutil = None
+
+MAX_NAVIGATIONS = int(os.getenv("BROWSER_MAX_NAVIGATIONS", "200") or 200)
+MAX_MEMORY_MB = float(os.getenv("BROWSER_MAX_MEMORY_MB", "1500") or 1500)
+
+
+class BrowserManager:
+    """
+    Mantiene un Chromium + context vivos y entrega páginas.
+
+    Uso:
+        manager = BrowserManager()
+        manager.run(lambda: ...)   # page()/new_page() solo dentro de run()
+        manager.shutdown()
+    """
+
+    def __init__(self, max_navigations: int = MAX_NAVIGATIONS,
+                 max_memory_mb: float = MAX_MEMORY_MB, headless: bool = True):
+        self.max_navigations = max_navigations
+        self.max_memory_mb = max_memory_mb
+        self.headless = headless
+
+        self._pw = None
+        self._browser = None
+        self._context = None
+        self._owner_thread = None
+        self._navigations = 0
+        self._launches = 0
+        self._started_at = 0.0
+        self._executor = None
+        self._thread_id = None
+        self._executor_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Hilo propio del browser
+    # ------------------------------------------------------------------
+
+    def _in_browser_thread(self) -> bool:
+        return self._thread_id == threading.get_ident()
+
+    def _bind_thread(self):
+        self._thread_id = threading.get_ident()
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Ejecuta fn(*args, **kwargs) en el hilo del browser y devuelve su
+        resultado (las excepciones se relanzan en el que llama).
+        """
+        if self._in_browser_thread():
+            return fn(*args, **kwargs)
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+                self._executor.submit(self._bind_thread).result()
+            executor = self._executor
+        return executor.submit(fn, *args, **kwargs).result()
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def _launch(self):
+        t0 = time.perf_counter()
+        self._pw = sync_playwright().start()
+        self._browser = self._pw.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+        self._context = self._browser.new_context(user_agent=USER_AGENT)
+        self._owner_thread = threading.get_ident()
+        self._navigations = 0
+        self._launches += 1
+        self._started_at = time.time()
+        print(f"[BROWSER] 🚀 Chromium lanzado (#{self._launches}) en {time.perf_counter() - t0:.1f}s")
+
+    def _close(self):
+        for obj in (self._context, self._browser):
+            try:
+                if obj is not None:
+                    obj.close()
+            except Exception:
+                pass
+        try:
+            if self._pw is not None:
+                self._pw.stop()
+        except Exception:
+            pass
+        self._pw = None
+        self._browser = None
+        self._context = None
+        self._owner_thread = None
+
+    def shutdown(self):
+        """Cerrar browser y Playwright (en su hilo) y terminar ese hilo."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        was_running = self._browser is not None
+        try:
+            executor.submit(self._close).result(timeout=30)
+        finally:
+            executor.shutdown(wait=False)
+            self._thread_id = None
+        if was_running:
+            print("[BROWSER] ✓ Chromium cerrado")
+
+    # ------------------------------------------------------------------
+    # Salud y reciclaje
+    # ------------------------------------------------------------------
+
+    def _is_healthy(self) -> bool:
+        try:
+            return self._browser is not None and self._browser.is_connected()
+        except Exception:
+            return False
+
+    def memory_mb(self) -> float | None:
+        """RSS total de los procesos hijos (Chromium). None si no hay psutil."""
+        if psutil is None:
+            return None
+        try:
+            children = psutil.Process(os.getpid()).children(recursive=True)
+            return sum(c.memory_info().rss for c in children) / (1024 * 1024)
+        except Exception:
+            return None
+
+    def _recycle_reason(self) -> str | None:
+        if self._browser is None:
+            return "sin lanzar"
+        if self._owner_thread != threading.get_ident():
+            return "otro hilo"
+        if not self._is_healthy():
+            return "no responde"
+        if self._navigations >= self.max_navigations:
+            return f"{self._navigations} navegaciones"
+        mem = self.memory_mb()
+        if mem is not None and mem >= self.max_memory_mb:
+            return f"memoria {mem:.0f} MB"
+        return None
+
+    def _ensure(self):
+        reason = self._recycle_reason()
+        if reason is None:
+            return
+        if self._browser is not None:
+            print(f"[BROWSER] ♻️ Reciclando Chromium ({reason})")
+            self._close()
+        self._launch()
+
+    def _count_navigation(self, frame):
+        if frame.parent_frame is None:
+            self._navigations += 1
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def new_page(self):
+        """Página nueva del context tibio (relanza si hace falta). Solo dentro de run()."""
+        if not self._in_browser_thread():
+            raise RuntimeError("BrowserManager.new_page() se usa dentro de BrowserManager.run()")
+        self._ensure()
+        try:
+            page = self._context.new_page()
+        except Exception as e:
+            print(f"[BROWSER] ⚠️ new_page falló ({e}), relanzando...")
+            self._close()
+            self._launch()
+            page = self._context.new_page()
+        page.on("framenavigated", self._count_navigation)
+        return page
+
+    @contextmanager
+    def page(self):
+        """Context manager: entrega una página y la cierra al terminar."""
+        page = self.new_page()
+        try:
+            yield page
+        finally:
+            try:
+                page.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "launches": self._launches,
+            "navigations": self._navigations,
+            "uptime_minutes": (time.time() - self._started_at) / 60 if self._browser else 0.0,
+            "memory_mb": self.memory_mb(),
+        }
+
+
+_manager: BrowserManager | None = None
+
+
+def get_browser_manager() -> BrowserManager:
+    """Singleton del proceso."""
+    global _manager
+    if _manager is None:
+        _manager = BrowserManager()
+    return _manager
+
+
+def shutdown_browser_manager():
+    """Cierra el browser compartido si existe (desde cualquier hilo)."""
+    global _manager
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+circuit_breaker.py
+
+Circuit breakers por dependencia externa: scraper de ofertas, generador
+de links de afiliado, Telegram y la API de Mercado Libre.
+
+Cuando ML nos bloquea o la sesión de afiliado venció, cada producto
+seguía pagando los timeouts completos (45s de goto, 40s del afiliado,
+10s de _extract_affiliate_link...). Con el breaker:
+
+  - CERRADO      -> las llamadas pasan; se cuentan las fallas SEGUIDAS
+  - ABIERTO      -> tras N fallas seguidas; las llamadas se cortan al
+                    instante (allow() = False) durante el cool-down
+  - SEMI-ABIERTO -> vencido el cool-down pasa UNA llamada de prueba: si
+                    sale bien se cierra, si falla vuelve a abrirse
+
+El estado se guarda en data/circuit_breakers.json (el bot se reinicia con
+os.execv al final de cada ciclo, así que sin eso se perdería) y el
+resumen va en la alerta de fin de ciclo (summary / end_cycle).
+
+Límites por defecto en BREAKER_LIMITS; se pueden cambiar con
+BREAKER_LIMITS="affiliate=3:1800,telegram=5:300"  (fallas:segundos)
+
+Uso:
+    breaker = get_breaker("affiliate")
+    if not breaker.allow():
+        return None                      # cortocircuito
+    ok = hacer_la_llamada()
+    breaker.record(ok, "detalle del error")
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+STATE_FILE = ROOT / "data" / "circuit_breakers.json"
+
+# dependencia -> (fallas seguidas para abrir, segundos de cool-down)
+BREAKER_LIMITS = {
+    "scraper": (3, 900),
+    "affiliate": (3, 1800),
+    "telegram": (5, 300),
+    "ml_api": (5, 300),
+}
+DEFAULT_LIMIT = (5, 600)
+PROBE_TIMEOUT = 120   # una prueba sin resultado en este tiempo libera otra
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STATE_LABELS = {CLOSED: "cerrado", OPEN: "ABIERTO", HALF_OPEN: "semi-abierto"}
+
+
+def _parse_limits(raw: str) -> Dict[str, Tuple[int, int]]:
+    limits = {}
+    for chunk in raw.split(","):
+        try:
+            name, spec = chunk.strip().split("=")
+            failures, cooldown = spec.split(":")
+            limits[name.strip()] = (int(failures), int(cooldown))
+        except ValueError:
+            if chunk.strip():
+                print(f"[BREAKER] ⚠️ Límite inválido ignorado: '{chunk}'")
+    return limits
+
+
+BREAKER_LIMITS.update(_parse_limits(os.getenv("BREAKER_LIMITS", "")))
+
+
+def breakers_enabled() -> bool:
+    return os.getenv("CIRCUIT_BREAKERS", "1").strip().lower() in ("1", "true", "yes")
+
+
+def service_up(status: int) -> bool:
+    """¿El servicio respondió bien? Un 400/404 es culpa de la petición, no una caída."""
+    return not (status in (401, 403, 429) or status >= 500)
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int, cooldown: float, saved: Optional[dict] = None):
+        self.name = name
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        saved = saved or {}
+        self.state = saved.get("state", CLOSED)
+        self.failures = int(saved.get("failures", 0))
+        self.opened_at = float(saved.get("opened_at", 0.0))
+        self.last_error = saved.get("last_error", "")
+        if self.state == HALF_OPEN:   # la prueba quedó a medias (proceso reiniciado)
+            self.state = OPEN
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.counters = {"ok": 0, "failed": 0, "short_circuited": 0}
+
+    def _remaining(self) -> float:
+        return max(0.0, self.opened_at + self.cooldown - time.time())
+
+    def is_open(self) -> bool:
+        """Abierto y todavía en cool-down (no consume la llamada de prueba)."""
+        return breakers_enabled() and self.state == OPEN and self._remaining() > 0
+
+    def allow(self) -> bool:
+        """¿Puede pasar esta llamada? Vencido el cool-down deja pasar UNA de prueba."""
+        if not breakers_enabled():
+            return True
+        with self._lock:
+            if self.state == OPEN and self._remaining() <= 0:
+                self.state = HALF_OPEN
+                self._probing = False
+                print(f"[BREAKER] 🟡 {self.name}: cool-down terminado, probando")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and (not self._probing or time.time() - self._probe_started > PROBE_TIMEOUT):
+                self._probing, self._probe_started = True, time.time()
+                return True
+            self.counters["short_circuited"] += 1
+            return False
+
+    def record(self, ok: bool, error: str = ""):
+        if ok:
+            self.record_success()
+        else:
+            self.record_failure(error)
+
+    def record_success(self):
+        with self._lock:
+            self.counters["ok"] += 1
+            changed = self.state != CLOSED or self.failures
+            if self.state != CLOSED:
+                print(f"[BREAKER] 🟢 {self.name}: responde de nuevo, circuito cerrado")
+            self.state, self.failures, self._probing = CLOSED, 0, False
+        if changed:
+            _save()
+
+    def record_failure(self, error: str = ""):
+        with self._lock:
+            self.counters["failed"] += 1
+            self.failures += 1
+            self.last_error = (error or "")[:200]
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+                self.state, self.opened_at, self._probing = OPEN, time.time(), False
+                print(f"[BREAKER] 🔴 {self.name}: {self.failures} fallas seguidas, "
+                      f"circuito abierto por {self.cooldown / 60:.0f} min ({self.last_error})")
+        _save()
+
+    def to_dict(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "opened_at": self.opened_at, "last_error": self.last_error}
+
+    def summary(self) -> str:
+        text = f"{self.name}={STATE_LABELS.get(self.state, self.state)}"
+        if self.state == OPEN:
+            text += f" (quedan {self._remaining() / 60:.0f} min)"
+        elif self.failures:
+            text += f" ({self.failures}/{self.threshold} fallas)"
+        if self.counters["short_circuited"]:
+            text += f" [{self.counters['short_circuited']} cortadas]"
+        return text
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+_saved: Optional[dict] = None
+
+
+def _load_saved() -> dict:
+    global _saved
+    if _saved is None:
+        try:
+            _saved = json.loads(STATE_FILE.read_text(encoding="utf-8")) if STATE_FILE.exists() else {}
+        except Exception as e:
+            print(f"[BREAKER] ⚠️ Estado ilegible, se empieza cerrado: {e}")
+            _saved = {}
+    return _saved
+
+
+def _save():
+    with _registry_lock:
+        data = dict(_load_saved())
+        data.update({name: b.to_dict() for name, b in _breakers.items()})
+        try:
+            STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = STATE_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp, STATE_FILE)
+        except Exception as e:
+            print(f"[BREAKER] ❌ No se pudo guardar {STATE_FILE.name}: {e}")
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _registry_lock:
+        b = _breakers.get(name)
+        if b is None:
+            threshold, cooldown = BREAKER_LIMITS.get(name, DEFAULT_LIMIT)
+            b = _breakers[name] = CircuitBreaker(name, threshold, cooldown, _load_saved().get(name))
+        return b
+
+
+def summary() -> str:
+    """Estado de todos los breakers conocidos (los usados y los guardados)."""
+    for name in set(BREAKER_LIMITS) | set(_load_saved()):
+        get_breaker(name)
+    return ", ".join(b.summary() for _, b in sorted(_breakers.items()))
+
+
+def end_cycle() -> str:
+    """Resumen del ciclo; los contadores vuelven a cero (el estado se conserva)."""
+    text = summary()
+    for b in _breakers.values():
+        for k in b.counters:
+            b.counters[k] = 0
+    return text
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+crawl_plan.py
+
+Paginación adaptativa para el scraper de ofertas.
+
+En lugar de bajar siempre PAGES páginas, medimos en cada página qué
+fracción de items es NUEVA (su título no está en el seen-cache de
+store_cache, ni es casi duplicado de uno publicado, ni apareció antes en
+este ciclo):
+
+  - ratio < SCRAPE_STOP_RATIO   -> cortamos ahí (ya es puro repetido)
+  - ratio >= SCRAPE_EXTEND_RATIO en la última página planeada
+                                -> agregamos una página más, hasta SCRAPE_PAGES_MAX
+  - siempre se bajan al menos SCRAPE_PAGES_MIN páginas
+
+SCRAPE_ADAPTIVE=0 vuelve al comportamiento fijo (exactamente PAGES).
+Cada decisión queda en el log del ciclo para poder ajustar los umbrales.
+
+Bandas de precio (SCRAPE_PRICE_BANDS):
+    Una sola búsqueda ?price=MIN-MAX solo deja ver lo que cabe en las
+    primeras páginas. Partiendo el rango en bandas (300-800, 800-2000, ...)
+    y bajando las primeras páginas de CADA banda cubrimos mucho más
+    catálogo con el mismo presupuesto de páginas.
+
+    SCRAPE_PRICE_BANDS=""                  -> sin bandas (default)
+    SCRAPE_PRICE_BANDS="300-800,800-2000"  -> bandas fijas
+    SCRAPE_PRICE_BANDS="auto"              -> bandas guardadas en
+        data/price_bands.json, que se re-balancean con el rendimiento
+        (items nuevos por página) de cada banda: las que rinden mucho se
+        parten en dos y las vecinas que rinden poco se juntan.
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+
+from src.store_cache import seen_ratio
+
+ROOT = Path(__file__).resolve().parents[1]
+BANDS_FILE = ROOT / "data" / "price_bands.json"
+
+PAGES_MIN = int(os.getenv("SCRAPE_PAGES_MIN", "1") or 1)
+PAGES_MAX = int(os.getenv("SCRAPE_PAGES_MAX", "10") or 10)
+STOP_RATIO = float(os.getenv("SCRAPE_STOP_RATIO", "0.15") or 0.15)
+EXTEND_RATIO = float(os.getenv("SCRAPE_EXTEND_RATIO", "0.6") or 0.6)
+
+BANDS_DEFAULT_COUNT = int(os.getenv("SCRAPE_BAND_COUNT", "4") or 4)
+BANDS_MIN = 2
+BANDS_MAX = int(os.getenv("SCRAPE_BAND_MAX", "8") or 8)
+BAND_PAGES = int(os.getenv("SCRAPE_BAND_PAGES", "0") or 0)  # 0 = repartir PAGES entre bandas
+BAND_EMA_ALPHA = 0.3
+SPLIT_FACTOR = 1.6   # rinde > 1.6x el promedio -> se parte
+MERGE_FACTOR = 0.5   # dos vecinas < 0.5x el promedio -> se juntan
+
+
+def adaptive_enabled() -> bool:
+    return os.getenv("SCRAPE_ADAPTIVE", "1").strip().lower() in ("1", "true", "yes")
+
+
+class AdaptivePager:
+    """
+    Lleva el límite de páginas del ciclo.
+
+    Uso:
+        pager = AdaptivePager(base_pages=3)
+        n = 1
+        while n <= pager.limit:
+            items = scrape(n)
+            pager.record(n, items, all_items)   # ANTES de mezclar en all_items
+            merge(items)
+            n += 1
+        print(pager.summary())
+    """
+
+    def __init__(self, base_pages: int, label: str = "", adaptive: bool | None = None,
+                 min_pages: int = PAGES_MIN, max_pages: int = PAGES_MAX,
+                 stop_ratio: float = STOP_RATIO, extend_ratio: float = EXTEND_RATIO):
+        self.base_pages = max(1, base_pages)
+        self.label = label
+        self.adaptive = adaptive_enabled() if adaptive is None else adaptive
+        self.min_pages = max(1, min(min_pages, self.base_pages))
+        self.max_pages = max(self.base_pages, max_pages)
+        self.stop_ratio = stop_ratio
+        self.extend_ratio = extend_ratio
+
+        self.limit = self.base_pages
+        self.ratios = {}
+        self.items_total = 0
+        self.fresh_total = 0
+        self.decision = "fijo" if not self.adaptive else "sin cambios"
+
+    def new_ratio(self, items: list, all_items: dict) -> float:
+        """Fracción de items que no están en el seen-cache ni en el ciclo."""
+        if not items:
+            return 0.0
+        # seen_ratio es de solo lectura y sin logs (is_product_seen no:
+        # imprime cada casi duplicado y espera el link de afiliado)
+        titles = [it.get("title", "") for it in items if it.get("permalink", "") not in all_items]
+        if not titles:
+            return 0.0
+        return len(titles) * (1 - seen_ratio(titles)) / len(items)
+
+    def record(self, page_num: int, items: list | None, all_items: dict) -> float | None:
+        """Registra el resultado de una página y ajusta `limit`. None = error."""
+        if items is None:
+            return None
+        ratio = self.new_ratio(items, all_items)
+        self.ratios[page_num] = ratio
+        self.items_total += len(items)
+        self.fresh_total += round(ratio * len(items))
+        if not self.adaptive:
+            return ratio
+
+        if page_num >= self.min_pages and ratio < self.stop_ratio:
+            self.decision = f"corte en pág {page_num} (nuevos {ratio:.0%} < {self.stop_ratio:.0%})"
+            self.limit = min(self.limit, page_num)
+        elif page_num == self.limit and ratio >= self.extend_ratio and self.limit < self.max_pages:
+            self.limit += 1
+            self.decision = f"extendido a {self.limit} (nuevos {ratio:.0%} >= {self.extend_ratio:.0%})"
+        return ratio
+
+    def summary(self) -> str:
+        prefix = f"[{self.label}] " if self.label else ""
+        ratios = " ".join(f"p{n}={r:.0%}" for n, r in sorted(self.ratios.items()))
+        return (
+            f"{prefix}base={self.base_pages} final={self.limit} máx={self.max_pages} "
+            f"-> {self.decision} | {ratios or 'sin datos'}"
+        )
+
+
+# ---------------------------------------------------------------------------
+# 💲 BANDAS DE PRECIO
+# ---------------------------------------------------------------------------
+
+def band_label(band: tuple[float, float]) -> str:
+    return f"${band[0]:.0f}-{band[1]:.0f}"
+
+
+def _geometric_bands(lo: float, hi: float, count: int) -> list[tuple[float, float]]:
+    """Parte [lo, hi] en `count` bandas de proporción constante (300-800-2000...)."""
+    lo = max(lo, 1.0)
+    step = (hi / lo) ** (1 / count)
+    edges = [round(lo * step ** i, -1) for i in range(count)] + [hi]
+    edges[0] = lo
+    return [(edges[i], edges[i + 1]) for i in range(count) if edges[i + 1] > edges[i]]
+
+
+def _parse_bands(raw: str) -> list[tuple[float, float]]:
+    bands = []
+    for chunk in raw.split(","):
+        try:
+            a, b = chunk.split("-")
+            bands.append((float(a), float(b)))
+        except ValueError:
+            print(f"[BANDAS] ⚠️ Banda inválida ignorada: '{chunk}'")
+    return sorted(b for b in bands if b[1] > b[0])
+
+
+def _load_band_state() -> dict:
+    if not BANDS_FILE.exists():
+        return {}
+    try:
+        return json.loads(BANDS_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _save_band_state(state: dict):
+    try:
+        BANDS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = BANDS_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, BANDS_FILE)
+    except Exception as e:
+        print(f"[BANDAS] ❌ No se pudo guardar {BANDS_FILE.name}: {e}")
+
+
+def plan_bands(min_price: float, max_price: float) -> list[tuple[float, float]] | None:
+    """Bandas para este ciclo, o None si el modo bandas está apagado."""
+    raw = os.getenv("SCRAPE_PRICE_BANDS", "").strip()
+    if not raw or raw.lower() in ("0", "off", "no"):
+        return None
+    if raw.lower() != "auto":
+        return _parse_bands(raw) or None
+
+    state = _load_band_state()
+    saved = [tuple(b) for b in state.get("bands", [])]
+    if saved and saved[0][0] == min_price and saved[-1][1] == max_price:
+        return saved
+    return _geometric_bands(min_price, max_price, BANDS_DEFAULT_COUNT)
+
+
+def pages_per_band(total_pages: int, band_count: int) -> int:
+    if BAND_PAGES > 0:
+        return BAND_PAGES
+    return max(1, math.ceil(total_pages / max(1, band_count)))
+
+
+def record_band_yield(pagers: dict) -> None:
+    """
+    Guarda el rendimiento de cada banda (EMA de items nuevos por página) y,
+    en modo auto, re-balancea las fronteras para el próximo ciclo.
+    `pagers` = {banda: AdaptivePager}.
+    """
+    state = _load_band_state()
+    ema = state.get("yield", {})
+    for band, pager in pagers.items():
+        pages = len(pager.ratios)
+        if pages == 0:
+            continue
+        per_page = pager.fresh_total / pages
+        key = band_label(band)
+        prev = ema.get(key)
+        ema[key] = per_page if prev is None else prev + BAND_EMA_ALPHA * (per_page - prev)
+        print(f"[BANDAS] {key}: {pager.fresh_total} nuevos / {pager.items_total} items en {pages} págs (EMA {ema[key]:.1f}/pág)")
+
+    bands = sorted(pagers)
+    if os.getenv("SCRAPE_PRICE_BANDS", "").strip().lower() == "auto":
+        new_bands = rebalance_bands(bands, ema)
+        if new_bands != bands:
+            print(f"[BANDAS] ♻️ Próximo ciclo: {', '.join(band_label(b) for b in new_bands)}")
+        bands = new_bands
+
+    valid = {band_label(b) for b in bands}
+    state["bands"] = [list(b) for b in bands]
+    state["yield"] = {k: v for k, v in ema.items() if k in valid}
+    _save_band_state(state)
+
+
+def rebalance_bands(bands: list[tuple[float, float]], ema: dict) -> list[tuple[float, float]]:
+    """Parte la banda que más rinde y junta el par de vecinas que menos rinde."""
+    yields = [ema.get(band_label(b)) for b in bands]
+    known = [y for y in yields if y is not None]
+    if len(known) < 2:
+        return bands
+    mean = sum(known) / len(known)
+    if mean <= 0:
+        return bands
+    result = list(bands)
+
+    # 1) Juntar: el par de vecinas con menor rendimiento combinado
+    if len(result) > BANDS_MIN:
+        pairs = [
+            (yields[i] + yields[i + 1], i) for i in range(len(bands) - 1)
+            if yields[i] is not None and yields[i + 1] is not None
+            and yields[i] < mean * MERGE_FACTOR and yields[i + 1] < mean * MERGE_FACTOR
+        ]
+        if pairs:
+            _, i = min(pairs)
+            result[i:i + 2] = [(bands[i][0], bands[i + 1][1])]
+            yields[i:i + 2] = [None]
+
+    # 2) Partir: la banda que más rinde, en su punto medio geométrico
+    if len(result) < BANDS_MAX:
+        best = max(
+            (i for i, y in enumerate(yields) if y is not None),
+            key=lambda i: yields[i],
+            default=None,
+        )
+        if best is not None and yields[best] > mean * SPLIT_FACTOR:
+            lo, hi = result[best]
+            mid = round(math.sqrt(lo * hi), -1)
+            if lo < mid < hi:
+                result[best:best + 1] = [(lo, mid), (mid, hi)]
+    return result
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+highlights_source.py
+
+Fuente barata de ofertas: los "destacados" de cada categoría.
+    GET https://api.mercadolibre.com/highlights/MLM/category/{id}
+
+test_backdoor.py mostró que el endpoint responde; aquí se barren muchas
+categorías a la vez:
+
+  - todas las categorías de HIGHLIGHT_CATEGORIES se piden en paralelo
+    sobre UNA sesión aiohttp (http_cache: TTL de 1h, revalida con ETag)
+  - los highlights solo traen ids: las entradas ITEM se resuelven a
+    registros completos con el multi-get de items_api (lotes de 20), que
+    de paso deja listo el caché de enriquecimiento
+  - las entradas PRODUCT (fichas de catálogo, sin precio propio) se
+    cuentan y se ignoran
+
+Decenas de categorías cuestan unas pocas peticiones JSON en lugar de una
+sesión de navegador. main.run la usa con OFFERS_SOURCE=highlights (o en
+una lista: OFFERS_SOURCE=scraper,highlights).
+"""
+
+from __future__ import annotations
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from src.circuit_breaker import get_breaker, service_up
+from src.http_cache import cached_get_async
+from src.http_session import API_HEADERS, APP_USER_AGENT, async_session
+from src.items_api import fetch_item_records_async
+from src.meli_search import _normalize_item
+from src.token_manager import get_access_token, has_credentials
+
+HIGHLIGHTS_URL = "https://api.mercadolibre.com/highlights/MLM/category/{category_id}"
+
+DEFAULT_CATEGORIES = (
+    "MLM1051,"   # Celulares y Telefonía
+    "MLM1648,"   # Computación
+    "MLM1000,"   # Electrónica, Audio y Video
+    "MLM1144,"   # Consolas y Videojuegos
+    "MLM1574,"   # Hogar, Muebles y Jardín
+    "MLM1276,"   # Deportes y Fitness
+    "MLM1132,"   # Juegos y Juguetes
+    "MLM1246,"   # Belleza y Cuidado Personal
+    "MLM1039,"   # Cámaras y Accesorios
+    "MLM1747"    # Accesorios para Vehículos
+)
+
+HIGHLIGHTS_CONCURRENCY = max(1, int(os.getenv("HIGHLIGHTS_CONCURRENCY", "6") or 6))
+HIGHLIGHTS_TIMEOUT = 15
+
+HEADERS = {**API_HEADERS, "User-Agent": APP_USER_AGENT}
+
+
+def highlight_categories() -> List[str]:
+    raw = os.getenv("HIGHLIGHT_CATEGORIES", "") or DEFAULT_CATEGORIES
+    return list(dict.fromkeys(c.strip().upper() for c in raw.split(",") if c.strip()))
+
+
+async def _fetch_category(session, sem, category_id: str) -> Tuple[str, List[str], int]:
+    """(categoría, ids de items en orden, cuántas entradas PRODUCT se ignoraron)."""
+    url = HIGHLIGHTS_URL.format(category_id=category_id)
+    breaker = get_breaker("ml_api")
+    async with sem:
+        try:
+            resp = await cached_get_async(session, url)
+            if resp.from_cache != "hit":
+                breaker.record(service_up(resp.status), f"highlights HTTP {resp.status}")
+            if resp.status != 200:
+                print(f"[HIGHLIGHTS] ❌ {category_id}: HTTP {resp.status}")
+                return category_id, [], 0
+            content = resp.json().get("content") or []
+        except Exception as e:
+            breaker.record_failure(f"highlights: {e}")
+            print(f"[HIGHLIGHTS] ❌ {category_id}: {e}")
+            return category_id, [], 0
+
+    ids, products = [], 0
+    for entry in content:
+        kind = str(entry.get("type") or "").upper()
+        if kind == "ITEM" and entry.get("id"):
+            ids.append(entry["id"])
+        elif kind == "PRODUCT":
+            products += 1
+    return category_id, ids, products
+
+
+async def _sweep(categories: List[str]) -> List[Dict[str, Any]]:
+    if not get_breaker("ml_api").allow():
+        print(f"[HIGHLIGHTS] ⛔ Circuito de la API abierto ({get_breaker('ml_api').summary()})")
+        return []
+    headers = dict(HEADERS)
+    token = await asyncio.to_thread(get_access_token) if has_credentials() else None
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    sem = asyncio.Semaphore(HIGHLIGHTS_CONCURRENCY)
+    async with async_session(headers, limit=HIGHLIGHTS_CONCURRENCY, timeout=HIGHLIGHTS_TIMEOUT) as session:
+        swept = await asyncio.gather(*(_fetch_category(session, sem, c) for c in categories))
+
+    category_of: Dict[str, str] = {}
+    skipped = 0
+    for category_id, ids, products in swept:
+        skipped += products
+        for item_id in ids:
+            category_of.setdefault(item_id, category_id)
+        print(f"[HIGHLIGHTS] 📂 {category_id}: {len(ids)} items" + (f", {products} productos ignorados" if products else ""))
+
+    if skipped:
+        print(f"[HIGHLIGHTS] ℹ️ {skipped} entradas PRODUCT (catálogo) ignoradas")
+    records = await fetch_item_records_async(list(category_of))
+
+    items = []
+    for record in records:
+        if record.get("status") not in (None, "", "active"):
+            continue
+        item = _normalize_item(record)
+        item["category_id"] = record.get("category_id") or category_of.get(item["id"])
+        item["source"] = "highlights"
+        items.append(item)
+    return items
+
+
+def fetch_offers(pages: int = 3) -> List[Dict[str, Any]]:
+    """
+    Entrada para main.run (OFFERS_SOURCE=highlights). `pages` se acepta
+    por compatibilidad con las otras fuentes: aquí el alcance lo da la
+    lista de categorías. Aplica el mismo rango de precios que el scraper.
+    """
+    from src.offers_fetcher import MAX_PRICE, MIN_PRICE
+
+    categories = highlight_categories()
+    print(f"\n[HIGHLIGHTS] {len(categories)} categorías ({HIGHLIGHTS_CONCURRENCY} en paralelo)")
+    t0 = time.perf_counter()
+    try:
+        items = asyncio.run(_sweep(categories))
+    except Exception as e:
+        print(f"[HIGHLIGHTS] ❌ Error en el barrido: {e}")
+        return []
+
+    in_range = [it for it in items if MIN_PRICE <= float(it.get("price") or 0) <= MAX_PRICE]
+    print(f"[HIGHLIGHTS] 🏁 {len(in_range)}/{len(items)} items en rango de precio en {time.perf_counter() - t0:.1f}s")
+    return in_range
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+html_backends.py
+
+Backends intercambiables para parsear el HTML de ofertas.
+
+Todos exponen la misma mini-API sobre cada nodo, que es lo único que usa
+offers_fetcher._parse_html_offers:
+
+    node.select(css)      -> lista de nodos
+    node.select_one(css)  -> nodo o None
+    node.text(sep="")     -> texto con strip por fragmento (como get_text(sep, strip=True))
+    node.attr(name)       -> valor del atributo o None
+
+Backends:
+    "bs4"        BeautifulSoup + html.parser (el original, Python puro)
+    "lxml"       lxml.html + cssselect (lxml ya está en requirements)
+    "selectolax" selectolax/lexbor (opcional: pip install selectolax)
+
+HTML_PARSER en .env elige el backend (default: lxml). Si el backend pedido
+no está instalado, se cae al siguiente disponible.
+
+find_cards() devuelve solo las tarjetas EXTERIORES: el selector de tarjetas
+también matchea contenedores anidados (li > div.poly-card > div.andes-card)
+y antes el mismo producto se parseaba 2-3 veces.
+"""
+
+from __future__ import annotations
+import os
+from typing import List, Optional
+
+CARD_SELECTORS = "li.ui-search-layout__item, div.ui-search-result__wrapper, div.poly-card, div.andes-card"
+
+BACKENDS = ("lxml", "selectolax", "bs4")
+DEFAULT_BACKEND = os.getenv("HTML_PARSER", "lxml").strip().lower() or "lxml"
+
+
+def _join(strings, sep: str) -> str:
+    return sep.join(s for s in (x.strip() for x in strings) if s)
+
+
+# ---------------------------------------------------------------------------
+# bs4
+# ---------------------------------------------------------------------------
+
+class _Bs4Node:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css: str) -> List["_Bs4Node"]:
+        return [_Bs4Node(e) for e in self.el.select(css)]
+
+    def select_one(self, css: str) -> Optional["_Bs4Node"]:
+        e = self.el.select_one(css)
+        return _Bs4Node(e) if e is not None else None
+
+    def text(self, sep: str = "") -> str:
+        return self.el.get_text(sep, strip=True)
+
+    def attr(self, name: str) -> Optional[str]:
+        return self.el.get(name)
+
+
+def _bs4_cards(html: str) -> List[_Bs4Node]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    cards = soup.select(CARD_SELECTORS)
+    # Tag.__eq__ compara contenido, así que la identidad va por id()
+    seen = {id(c) for c in cards}
+    return [_Bs4Node(c) for c in cards if not any(id(p) in seen for p in c.parents)]
+
+
+# ---------------------------------------------------------------------------
+# lxml
+# ---------------------------------------------------------------------------
+
+_lxml_selectors = {}
+
+
+def _lxml_css(css: str):
+    sel = _lxml_selectors.get(css)
+    if sel is None:
+        from lxml.cssselect import CSSSelector
+        sel = _lxml_selectors[css] = CSSSelector(css)
+    return sel
+
+
+class _LxmlNode:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css: str) -> List["_LxmlNode"]:
+        return [_LxmlNode(e) for e in _lxml_css(css)(self.el) if e is not self.el]
+
+    def select_one(self, css: str) -> Optional["_LxmlNode"]:
+        for e in _lxml_css(css)(self.el):
+            if e is not self.el:
+                return _LxmlNode(e)
+        return None
+
+    def text(self, sep: str = "") -> str:
+        return _join(self.el.itertext(), sep)
+
+    def attr(self, name: str) -> Optional[str]:
+        return self.el.get(name)
+
+
+def _lxml_cards(html: str) -> List[_LxmlNode]:
+    import lxml.etree
+    import lxml.html
+
+    # fromstring revienta con documento vacío (bs4/selectolax dan 0 cards)
+    if not html or not html.strip():
+        return []
+    try:
+        root = lxml.html.fromstring(html)
+    except lxml.etree.ParserError:
+        return []
+    cards = _lxml_css(CARD_SELECTORS)(root)
+    seen = set(cards)
+    return [_LxmlNode(c) for c in cards if not any(a in seen for a in c.iterancestors())]
+
+
+# ---------------------------------------------------------------------------
+# selectolax (lexbor)
+# ---------------------------------------------------------------------------
+
+class _SelectolaxNode:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css: str) -> List["_SelectolaxNode"]:
+        return [_SelectolaxNode(e) for e in self.el.css(css)]
+
+    def select_one(self, css: str) -> Optional["_SelectolaxNode"]:
+        e = self.el.css_first(css)
+        return _SelectolaxNode(e) if e is not None else None
+
+    def text(self, sep: str = "") -> str:
+        return _join((n.text_content or "" for n in self.el.traverse(include_text=True) if n.tag == "-text"), sep)
+
+    def attr(self, name: str) -> Optional[str]:
+        return self.el.attributes.get(name)
+
+
+def _selectolax_cards(html: str) -> List[_SelectolaxNode]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    cards = tree.css(CARD_SELECTORS)
+    seen = {c.mem_id for c in cards}
+    outer = []
+    for c in cards:
+        p = c.parent
+        while p is not None and p.mem_id not in seen:
+            p = p.parent
+        if p is None:
+            outer.append(_SelectolaxNode(c))
+    return outer
+
+
+# ---------------------------------------------------------------------------
+# Selección de backend
+# ---------------------------------------------------------------------------
+
+_CARD_FINDERS = {
+    "bs4": _bs4_cards,
+    "lxml": _lxml_cards,
+    "selectolax": _selectolax_cards,
+}
+
+_IMPORTS = {
+    "bs4": "bs4",
+    "lxml": "lxml.cssselect",
+    "selectolax": "selectolax.lexbor",
+}
+
+_resolved = {}
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """Devuelve el backend pedido si está instalado, si no el primero disponible."""
+    name = (name or DEFAULT_BACKEND).lower()
+    if name in _resolved:
+        return _resolved[name]
+
+    import importlib
+
+    order = [name] + [b for b in BACKENDS if b != name]
+    for candidate in order:
+        if candidate not in _CARD_FINDERS:
+            continue
+        try:
+            importlib.import_module(_IMPORTS[candidate])
+        except ImportError:
+            continue
+        if candidate != name:
+            print(f"[PARSER] ⚠️ Backend '{name}' no disponible, usando '{candidate}'")
+        _resolved[name] = candidate
+        return candidate
+    raise ImportError("No hay ningún parser HTML instalado (bs4, lxml o selectolax)")
+
+
+def find_cards(html: str, backend: Optional[str] = None) -> list:
+    """Tarjetas exteriores de la página con el backend elegido."""
+    return _CARD_FINDERS[resolve_backend(backend)](html)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+http_cache.py
+
+Caché de respuestas HTTP en disco (SQLite, data/http_cache.db) para los
+GET de la API de ML que cambian poco: /items/{id}, /categories/{id},
+/highlights/MLM/category/{id}...
+
+  - clave = método + URL + params (ordenados)
+  - TTL por tipo de endpoint (ENDPOINT_TTLS); TTL 0 = no se cachea
+  - al vencer, si la respuesta traía ETag / Last-Modified se revalida con
+    If-None-Match / If-Modified-Since: un 304 renueva el TTL sin bajar
+    el cuerpo de nuevo
+  - el archivo queda acotado a HTTP_CACHE_MAX_MB: primero se borra lo
+    vencido y después lo usado hace más tiempo (LRU)
+  - un hit no escribe en disco: el last_access de la LRU se junta en
+    memoria y se baja en un solo UPDATE al desalojar / al final del ciclo
+  - contadores hit / miss / revalidated por ciclo (stats_summary)
+
+Todas las peticiones pasan por rate_limiter. HTTP_CACHE=0 lo apaga.
+
+Uso:
+    resp = cached_get(url, params={...}, headers={...})
+    resp.status, resp.text, resp.json(), resp.from_cache
+"""
+
+from __future__ import annotations
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+from src.rate_limiter import request, request_async
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DB = ROOT / "data" / "http_cache.db"
+
+CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "50") or 50)
+EVICT_EVERY = 50   # cada cuántas escrituras se revisa el tamaño
+
+# (regex sobre la URL, TTL en segundos) -> el primero que matchea gana
+ENDPOINT_TTLS = (
+    (re.compile(r"/oauth/"), 0),
+    (re.compile(r"/categories/"), 7 * 24 * 3600),
+    (re.compile(r"/highlights/"), 3600),
+    (re.compile(r"/items/MLM\d+"), 1800),
+    (re.compile(r"/sites/\w+/search"), 0),
+)
+DEFAULT_TTL = 0
+
+
+def cache_enabled() -> bool:
+    return os.getenv("HTTP_CACHE", "1").strip().lower() in ("1", "true", "yes")
+
+
+def ttl_for(url: str) -> int:
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+class CachedResponse:
+    __slots__ = ("status", "text", "url", "headers", "from_cache")
+
+    def __init__(self, status: int, text: str, url: str, headers: Optional[Dict[str, str]] = None, from_cache: str = ""):
+        self.status = status
+        self.text = text
+        self.url = url
+        self.headers = headers or {}
+        self.from_cache = from_cache   # "", "hit" o "revalidated"
+
+    @property
+    def status_code(self) -> int:
+        return self.status
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class HttpCache:
+    def __init__(self, path: Path = CACHE_DB, max_mb: float = CACHE_MAX_MB):
+        self.path = Path(path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+        self._accessed = {}   # key -> last_access pendiente de escribir
+        self.counters = {"hit": 0, "miss": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    status INTEGER,
+                    headers TEXT,
+                    body TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expires_at REAL,
+                    last_access REAL,
+                    size INTEGER
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        return self._conn
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return f"{method.upper()} {url}?{query}" if query else f"{method.upper()} {url}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT url, status, headers, body, etag, last_modified, expires_at FROM responses WHERE key=?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+        url, status, headers, body, etag, last_modified, expires_at = row
+        return {
+            "url": url, "status": status, "headers": json.loads(headers or "{}"), "body": body,
+            "etag": etag, "last_modified": last_modified, "expires_at": expires_at,
+        }
+
+    def put(self, key: str, resp: CachedResponse, ttl: int):
+        headers = {k: v for k, v in resp.headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+        size = len(resp.text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._db().execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, resp.url, resp.status, json.dumps(headers), resp.text,
+                 _header(resp.headers, "ETag"), _header(resp.headers, "Last-Modified"),
+                 now + ttl, now, size),
+            )
+            self._db().commit()
+            self.counters["stored"] += 1
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict_locked()
+
+    def touch(self, key: str, ttl: int):
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(key, None)
+            self._db().execute("UPDATE responses SET expires_at=?, last_access=? WHERE key=?", (now + ttl, now, key))
+            self._db().commit()
+
+    def _flush_access_locked(self):
+        if not self._accessed:
+            return
+        db = self._db()
+        db.executemany("UPDATE responses SET last_access=? WHERE key=?",
+                       [(ts, key) for key, ts in self._accessed.items()])
+        db.commit()
+        self._accessed.clear()
+
+    def _evict_locked(self):
+        # La LRU necesita los accesos al día antes de elegir víctimas
+        self._flush_access_locked()
+        db = self._db()
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 1) lo vencido y sin validador (no se puede revalidar)
+        cur = db.execute(
+            "DELETE FROM responses WHERE expires_at < ? AND etag IS NULL AND last_modified IS NULL",
+            (time.time(),),
+        )
+        evicted = cur.rowcount
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # 2) LRU hasta quedar en 90% del máximo
+        target = int(self.max_bytes * 0.9)
+        if total > target:
+            freed = 0
+            victims = []
+            for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                if total - freed <= target:
+                    break
+                victims.append((key,))
+                freed += size
+            db.executemany("DELETE FROM responses WHERE key=?", victims)
+            evicted += len(victims)
+        db.commit()
+        self.counters["evicted"] += evicted
+        if evicted:
+            print(f"[HTTP_CACHE] 🧹 {evicted} respuestas desalojadas (límite {self.max_bytes // (1024 * 1024)} MB)")
+
+    def evict(self):
+        with self._lock:
+            self._evict_locked()
+
+    def summary(self) -> str:
+        c = self.counters
+        lookups = c["hit"] + c["miss"] + c["revalidated"]
+        rate = (c["hit"] + c["revalidated"]) / lookups if lookups else 0.0
+        return (
+            f"{c['hit']} hit, {c['revalidated']} revalidadas (304), {c['miss']} miss "
+            f"({rate:.0%} sin bajar cuerpo) | {c['stored']} guardadas, {c['evicted']} desalojadas"
+        )
+
+    def reset_counters(self):
+        for k in self.counters:
+            self.counters[k] = 0
+
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    for k, v in (headers or {}).items():
+        if k.lower() == name.lower():
+            return v
+    return None
+
+
+_cache: Optional[HttpCache] = None
+
+
+def get_cache() -> HttpCache:
+    global _cache
+    if _cache is None:
+        _cache = HttpCache()
+    return _cache
+
+
+def _conditional_headers(entry: Dict[str, Any], headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    out = dict(headers or {})
+    if entry.get("etag"):
+        out["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        out["If-Modified-Since"] = entry["last_modified"]
+    return out
+
+
+def _lookup(url: str, params) -> tuple:
+    """(cache, key, ttl, entry) — entry es None si no hay nada guardado."""
+    ttl = ttl_for(url) if cache_enabled() else 0
+    if ttl <= 0:
+        return None, None, 0, None
+    cache = get_cache()
+    key = cache.make_key("GET", url, params)
+    return cache, key, ttl, cache.get(key)
+
+
+def _from_entry(entry: Dict[str, Any], kind: str) -> CachedResponse:
+    return CachedResponse(entry["status"], entry["body"], entry["url"], entry["headers"], kind)
+
+
+def _settle(cache: HttpCache, key: str, ttl: int, entry, resp: CachedResponse) -> CachedResponse:
+    """Decide qué devolver/guardar después de ir a la red."""
+    if entry is not None and resp.status == 304:
+        cache.touch(key, ttl)
+        cache.counters["revalidated"] += 1
+        return _from_entry(entry, "revalidated")
+    cache.counters["miss"] += 1
+    if resp.status == 200:
+        cache.put(key, resp, ttl)
+    return resp
+
+
+def cached_get(url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+               session=None, timeout: float = 15) -> CachedResponse:
+    """GET con caché (requests). Los endpoints con TTL 0 van directo a la red."""
+    cache, key, ttl, entry = _lookup(url, params)
+    if entry is not None and entry["expires_at"] > time.time():
+        cache.counters["hit"] += 1
+        return _from_entry(entry, "hit")
+
+    send_headers = _conditional_headers(entry, headers) if entry else headers
+    r = request("GET", url, session=session, params=params, headers=send_headers, timeout=timeout)
+    resp = CachedResponse(r.status_code, r.text, r.url, dict(r.headers))
+    if cache is None:
+        return resp
+    return _settle(cache, key, ttl, entry, resp)
+
+
+async def cached_get_async(session, url: str, params: Optional[Dict[str, Any]] = None,
+                           headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+    """GET con caché sobre una sesión aiohttp."""
+    cache, key, ttl, entry = _lookup(url, params)
+    if entry is not None and entry["expires_at"] > time.time():
+        cache.counters["hit"] += 1
+        return _from_entry(entry, "hit")
+
+    send_headers = _conditional_headers(entry, headers) if entry else headers
+    status, text, final_url, resp_headers = await request_async(
+        session, "GET", url, params=params, headers=send_headers, with_headers=True
+    )
+    resp = CachedResponse(status, text, final_url, resp_headers)
+    if cache is None:
+        return resp
+    return _settle(cache, key, ttl, entry, resp)
+
+
+def stats_summary() -> str:
+    return get_cache().summary() if _cache is not None else "sin uso"
+
+
+def end_cycle() -> str:
+    """Resumen del ciclo + poda de tamaño; los contadores vuelven a cero."""
+    if _cache is None:
+        return "sin uso"
+    _cache.evict()
+    summary = _cache.summary()
+    _cache.reset_counters()
+    return summary
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+http_session.py
+
+Fábrica única de sesiones HTTP (requests y aiohttp).
+
+Antes cada módulo hacía requests.get/post sueltos: cada mensaje de
+Telegram y cada página de la API pagaban un handshake TCP+TLS nuevo.
+Aquí hay:
+
+  - get_session(): requests.Session por hilo, con pool de conexiones por
+    host (keep-alive), reintento de CONEXIÓN (los 429/5xx los maneja
+    rate_limiter) y headers por defecto
+  - async_session(): ClientSession de aiohttp con TCPConnector
+    compartido (keep-alive, caché DNS) y timeout por defecto. Una sesión
+    vive dentro de un event loop, así que se crea una por asyncio.run()
+  - API_HEADERS / HTML_HEADERS: los headers que estaban copiados en
+    fetcher.py, meli.py, items_api.py, offers_http.py...
+
+rate_limiter.request() usa get_session() si no le pasan otra, así que
+todo lo que ya pasa por el rate limiter reutiliza conexiones.
+"""
+
+from __future__ import annotations
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Nombre "honesto" de la app registrada en ML (el que usan los scripts de la API)
+APP_USER_AGENT = "PromoAdictosBot/1.0"
+
+# JSON de la API de ML / Telegram
+API_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "es-MX,es;q=0.9,en;q=0.8",
+}
+
+# Páginas HTML (scraper HTTP)
+HTML_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "es-MX,es;q=0.9,en;q=0.7",
+    "Accept-Encoding": "gzip, deflate",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10") or 10)      # conexiones por host
+POOL_HOSTS = 10                                                # hosts con pool propio
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15") or 15)
+CONNECT_RETRIES = 2
+
+_local = threading.local()
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=CONNECT_RETRIES,
+        connect=CONNECT_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=0.5,
+        allowed_methods=None,   # solo fallas de conexión: es seguro reintentar POST
+        respect_retry_after_header=False,   # Retry-After lo maneja rate_limiter
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(API_HEADERS)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Sesión requests del hilo actual (se crea la primera vez)."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = _build_session()
+    return session
+
+
+def close_session():
+    session = getattr(_local, "session", None)
+    if session is not None:
+        session.close()
+        _local.session = None
+
+
+def async_session(headers: Optional[Dict[str, str]] = None, limit: int = POOL_SIZE,
+                  timeout: float = DEFAULT_TIMEOUT, **kwargs):
+    """
+    ClientSession de aiohttp con los defaults del proyecto. Usar como:
+        async with async_session(limit=6) as session: ...
+    """
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=max(1, limit),
+        limit_per_host=max(1, limit),
+        ttl_dns_cache=300,
+        keepalive_timeout=30,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers if headers is not None else API_HEADERS,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        **kwargs,
+    )
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+image_dedup.py
+
+Deduplicación por imagen: el mismo producto aparece con otro vendedor y
+otro título pero con la misma foto (la URL que elige
+main.get_product_image). La deduplicación por título no lo ve.
+
+  - las imágenes se bajan en paralelo (aiohttp, IMAGE_CONCURRENCY) y se
+    resumen en un dHash de 64 bits con Pillow (gris 9x8, un bit por
+    par de píxeles vecinos): resiste recompresión, reescalado y marcas
+    de agua chicas
+  - el hash se cachea por URL (data/image_hashes.json), así cada imagen
+    se baja una sola vez aunque el item reaparezca en otros ciclos
+  - los hashes de lo publicado en los últimos IMAGE_DEDUP_DAYS días van
+    en un BK-tree: buscar todo lo que está a distancia de Hamming
+    <= IMAGE_DEDUP_DISTANCE no recorre el historial completo
+  - filter_candidates() quita los candidatos cuya foto ya se publicó
+    (o que repiten la foto de otro candidato mejor puntuado del ciclo)
+  - el archivo se reescribe una vez por ciclo (save_index() al final de
+    main.run, y al salir), no en cada publicación
+
+IMAGE_DEDUP=0 desactiva la etapa.
+"""
+
+from __future__ import annotations
+import asyncio
+import atexit
+import io
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from src.http_session import HTML_HEADERS, async_session
+from src.rate_limiter import throttle_async
+
+INDEX_FILE = "data/image_hashes.json"
+
+IMAGE_DEDUP_ENABLED = os.getenv("IMAGE_DEDUP", "1") != "0"
+IMAGE_DEDUP_DISTANCE = int(os.getenv("IMAGE_DEDUP_DISTANCE", "6") or 6)
+IMAGE_DEDUP_DAYS = int(os.getenv("IMAGE_DEDUP_DAYS", "14") or 14)
+IMAGE_CONCURRENCY = max(1, int(os.getenv("IMAGE_CONCURRENCY", "8") or 8))
+IMAGE_CACHE_MAX = int(os.getenv("IMAGE_CACHE_MAX", "20000") or 20000)
+IMAGE_TIMEOUT = 10
+IMAGE_MAX_BYTES = 5 * 1024 * 1024
+
+HASH_BITS = 64
+_FLAT = {0, (1 << HASH_BITS) - 1}   # imagen lisa / placeholder: no identifica nada
+
+
+def dhash(data: bytes) -> Optional[int]:
+    """dHash de 64 bits de la imagen (None si Pillow no la puede abrir)."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.draft("L", (64, 64))   # JPEG: decodifica ya reducida
+            pixels = list(img.convert("L").resize((9, 8), Image.BILINEAR).getdata())
+    except Exception:
+        return None
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            i = row * 9 + col
+            value = (value << 1) | (pixels[i] > pixels[i + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """BK-tree sobre distancia de Hamming; cada nodo es [hash, payload, {dist: hijo}]."""
+
+    __slots__ = ("root", "size")
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value: int, payload: Any = None):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, payload, {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, payload, {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[tuple]:
+        """[(distancia, hash, payload)] a distancia <= radius, del más cercano al más lejano."""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                found.append((d, node[0], node[1]))
+            for dist, child in node[2].items():
+                if d - radius <= dist <= d + radius:
+                    stack.append(child)
+        return sorted(found, key=lambda f: f[0])
+
+
+_url_hashes: Dict[str, Dict[str, Any]] = {}     # url -> {"hash": hex, "ts": epoch}
+_published: List[Dict[str, Any]] = []           # [{"hash", "title", "ts"}]
+_tree = BKTree()
+_loaded = False
+_dirty = False
+
+
+def _cutoff() -> str:
+    return (datetime.now() - timedelta(days=IMAGE_DEDUP_DAYS)).isoformat(timespec="seconds")
+
+
+def _rebuild_tree():
+    global _tree, _published
+    cutoff = _cutoff()
+    _published = [p for p in _published if p.get("ts", "") >= cutoff]
+    _tree = BKTree()
+    for p in _published:
+        _tree.add(int(p["hash"], 16), p)
+
+
+def _load():
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    try:
+        with open(INDEX_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    _url_hashes.update(data.get("urls") or {})
+    _published.extend(data.get("published") or [])
+    _rebuild_tree()
+
+
+def save_index():
+    global _dirty
+    if not _dirty:
+        return
+    urls = _url_hashes
+    if len(urls) > IMAGE_CACHE_MAX:
+        newest = sorted(urls.items(), key=lambda kv: kv[1].get("ts", 0))[-IMAGE_CACHE_MAX:]
+        urls = dict(newest)
+        _url_hashes.clear()
+        _url_hashes.update(urls)
+    try:
+        os.makedirs(os.path.dirname(INDEX_FILE) or ".", exist_ok=True)
+        tmp = INDEX_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"urls": urls, "published": _published}, f, ensure_ascii=False)
+        os.replace(tmp, INDEX_FILE)
+        _dirty = False
+    except Exception as e:
+        print(f"[IMAGE_DEDUP] ❌ No se pudo guardar {INDEX_FILE}: {e}")
+
+
+async def _fetch_hash(session, sem, url: str) -> Optional[int]:
+    async with sem:
+        await throttle_async(url)
+        try:
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    return None
+                data = await resp.content.read(IMAGE_MAX_BYTES)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+    # Pillow decodifica en un hilo para no frenar las otras descargas
+    return await asyncio.to_thread(dhash, data)
+
+
+async def _hash_urls_async(urls: List[str]) -> Dict[str, Optional[int]]:
+    sem = asyncio.Semaphore(IMAGE_CONCURRENCY)
+    headers = {**HTML_HEADERS, "Accept": "image/avif,image/webp,image/*,*/*;q=0.8"}
+    async with async_session(headers, limit=IMAGE_CONCURRENCY, timeout=IMAGE_TIMEOUT) as session:
+        hashes = await asyncio.gather(*(_fetch_hash(session, sem, u) for u in urls))
+    return dict(zip(urls, hashes))
+
+
+def hash_images(urls: Iterable[str]) -> Dict[str, int]:
+    """{url: dHash} de las URLs; solo se bajan las que no están en caché."""
+    global _dirty
+    _load()
+    wanted = list(dict.fromkeys(u for u in urls if u))
+    missing = [u for u in wanted if u not in _url_hashes]
+    if missing:
+        t0 = time.perf_counter()
+        try:
+            fetched = asyncio.run(_hash_urls_async(missing))
+        except Exception as e:
+            print(f"[IMAGE_DEDUP] ❌ Error bajando imágenes: {e}")
+            fetched = {}
+        now = time.time()
+        ok = 0
+        for url, h in fetched.items():
+            if h is not None:   # las fallas no se cachean: se reintentan otro ciclo
+                _url_hashes[url] = {"hash": f"{h:016x}", "ts": now}
+                ok += 1
+        _dirty = _dirty or ok > 0
+        print(f"[IMAGE_DEDUP] 🖼️ {len(wanted)} imágenes | {len(wanted) - len(missing)} en caché | "
+              f"{ok}/{len(missing)} bajadas en {time.perf_counter() - t0:.1f}s")
+    return {u: int(_url_hashes[u]["hash"], 16) for u in wanted if u in _url_hashes}
+
+
+def find_published(h: int) -> Optional[tuple]:
+    """(distancia, título) de la foto publicada más parecida dentro del radio."""
+    _load()
+    if h in _FLAT:
+        return None
+    found = _tree.search(h, IMAGE_DEDUP_DISTANCE)
+    return (found[0][0], found[0][2].get("title", "")) if found else None
+
+
+def filter_candidates(items: List[Dict[str, Any]], image_of: Callable[[Dict[str, Any]], str]) -> List[Dict[str, Any]]:
+    """
+    Quita (conservando el orden) los items cuya foto ya se publicó o que
+    repiten la de un item anterior de la lista (la lista llega ordenada
+    por score, así que se queda el mejor). Sin foto o sin hash: pasan.
+    """
+    if not IMAGE_DEDUP_ENABLED or not items:
+        return items
+    urls = [image_of(it) for it in items]
+    hashes = hash_images(urls)
+
+    kept, cycle = [], BKTree()
+    for it, url in zip(items, urls):
+        h = hashes.get(url)
+        if h is None or h in _FLAT:
+            kept.append(it)
+            continue
+        match = find_published(h)
+        if match:
+            print(f"[IMAGE_DEDUP] 🔁 Foto ya publicada (dist {match[0]}): "
+                  f"'{(it.get('title') or '')[:40]}' ~ '{match[1][:40]}'")
+            continue
+        twin = cycle.search(h, IMAGE_DEDUP_DISTANCE)
+        if twin:
+            print(f"[IMAGE_DEDUP] 🔁 Misma foto que otro candidato: "
+                  f"'{(it.get('title') or '')[:40]}' ~ '{(twin[0][2] or '')[:40]}'")
+            continue
+        cycle.add(h, it.get("title") or "")
+        kept.append(it)
+
+    if len(kept) < len(items):
+        print(f"[IMAGE_DEDUP] 🧹 {len(items) - len(kept)} candidatos descartados por imagen")
+    return kept
+
+
+def remember_published(url: str, title: str = ""):
+    """Agrega la foto de una oferta publicada al índice (si ya tiene hash)."""
+    global _dirty
+    if not IMAGE_DEDUP_ENABLED or not url:
+        return
+    _load()
+    entry = _url_hashes.get(url)
+    if not entry:
+        return
+    h = int(entry["hash"], 16)
+    if h in _FLAT:
+        return
+    record = {"hash": entry["hash"], "title": title, "ts": datetime.now().isoformat(timespec="seconds")}
+    _published.append(record)
+    _tree.add(h, record)
+    _dirty = True   # se guarda al final del ciclo (save_index)
+
+
+atexit.register(save_index)
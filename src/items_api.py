@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+items_api.py
+
+Datos reales de los items vía el multi-get de la API de Mercado Libre:
+    GET https://api.mercadolibre.com/items?ids=MLM1,MLM2,...  (máx. 20 ids)
+
+prefetch_item_details() junta los ids de todo el ciclo, pide solo los que
+no están en caché, en lotes de 20 con varias peticiones en vuelo, y deja
+el resultado en un caché con TTL (memoria + data/item_details.json).
+Enriquecer 200 candidatos cuesta ~10 peticiones en lugar de 200.
+
+promo_enricher.enrich_item lee de ese caché con get_item_details().
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from src.circuit_breaker import get_breaker, service_up
+from src.http_session import API_HEADERS, APP_USER_AGENT, async_session
+from src.rate_limiter import request_async
+from src.token_manager import get_access_token, has_credentials
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_FILE = ROOT / "data" / "item_details.json"
+
+ITEMS_URL = "https://api.mercadolibre.com/items"
+ITEMS_BATCH = 20                      # límite del endpoint
+ITEMS_CONCURRENCY = max(1, int(os.getenv("ITEMS_CONCURRENCY", "4") or 4))
+ITEMS_TTL = int(os.getenv("ITEMS_CACHE_TTL", str(6 * 3600)) or 6 * 3600)
+ITEMS_TIMEOUT = 15
+
+# Solo los campos que usamos (respuesta más chica)
+ITEM_ATTRIBUTES = "id,sold_quantity,condition,seller_id,shipping,status,available_quantity,official_store_id"
+RECORD_ATTRIBUTES = ITEM_ATTRIBUTES + ",title,price,original_price,base_price,currency_id,permalink,thumbnail,secure_thumbnail,category_id"
+
+HEADERS = {**API_HEADERS, "User-Agent": APP_USER_AGENT}
+
+_cache: Dict[str, Dict[str, Any]] = {}
+_loaded = False
+
+
+def _load_cache():
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    if not CACHE_FILE.exists():
+        return
+    try:
+        data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return
+    now = time.time()
+    _cache.update({k: v for k, v in data.items() if v.get("expires_at", 0) > now})
+
+
+def _save_cache():
+    now = time.time()
+    live = {k: v for k, v in _cache.items() if v.get("expires_at", 0) > now}
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(live, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, CACHE_FILE)
+    except Exception as e:
+        print(f"[ITEMS] ❌ No se pudo guardar {CACHE_FILE.name}: {e}")
+
+
+def _map_body(body: Dict[str, Any]) -> Dict[str, Any]:
+    shipping = body.get("shipping") or {}
+    return {
+        "sold_quantity": int(body.get("sold_quantity") or 0),
+        "condition": body.get("condition") or "",
+        "seller_id": body.get("seller_id"),
+        "official_store_id": body.get("official_store_id"),
+        "free_shipping": bool(shipping.get("free_shipping", False)),
+        "logistic_type": shipping.get("logistic_type") or "",
+        "status": body.get("status") or "",
+        "available_quantity": int(body.get("available_quantity") or 0),
+    }
+
+
+def get_item_details(item_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Detalles cacheados y vigentes del item, o None (no se pidió / no existe)."""
+    if not item_id:
+        return None
+    _load_cache()
+    entry = _cache.get(item_id)
+    if not entry or entry.get("expires_at", 0) <= time.time():
+        return None
+    return entry.get("data")
+
+
+async def _fetch_batch(session, sem, ids: List[str], attributes: str) -> Dict[str, Optional[Dict[str, Any]]]:
+    """{id: body crudo} de un lote; None si el item no existe / no es accesible."""
+    params = {"ids": ",".join(ids), "attributes": attributes}
+    breaker = get_breaker("ml_api")
+    async with sem:
+        try:
+            status, body, _ = await request_async(session, "GET", ITEMS_URL, params=params)
+            breaker.record(service_up(status), f"items HTTP {status}")
+            if status != 200:
+                print(f"[ITEMS] ❌ HTTP {status} en lote de {len(ids)}: {body[:150]}")
+                return {}
+            payload = json.loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if not isinstance(e, ValueError): breaker.record_failure(f"items: {e}")
+            print(f"[ITEMS] ❌ Error de red en lote de {len(ids)}: {e}")
+            return {}
+
+    found = {}
+    for entry in payload if isinstance(payload, list) else []:
+        body = entry.get("body") or {}
+        item_id = body.get("id")
+        if entry.get("code") == 200 and item_id:
+            found[item_id] = body
+        elif isinstance(body, dict) and body.get("id"):
+            found[body["id"]] = None   # 404/403 del item: se cachea como "sin datos"
+    return found
+
+
+async def _fetch_all(ids: List[str], attributes: str = ITEM_ATTRIBUTES) -> Dict[str, Optional[Dict[str, Any]]]:
+    if not get_breaker("ml_api").allow():
+        print(f"[ITEMS] ⛔ Circuito de la API abierto ({get_breaker('ml_api').summary()})")
+        return {}
+    headers = dict(HEADERS)
+    token = await asyncio.to_thread(get_access_token) if has_credentials() else None
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    sem = asyncio.Semaphore(ITEMS_CONCURRENCY)
+    async with async_session(headers, limit=ITEMS_CONCURRENCY, timeout=ITEMS_TIMEOUT) as session:
+        batches = [ids[i:i + ITEMS_BATCH] for i in range(0, len(ids), ITEMS_BATCH)]
+        results = await asyncio.gather(*(_fetch_batch(session, sem, b, attributes) for b in batches))
+
+    merged = {}
+    for r in results:
+        merged.update(r)
+    return merged
+
+
+def prefetch_item_details(item_ids: Iterable[Optional[str]]) -> int:
+    """
+    Trae (en lotes de 20, en paralelo) los ids que no están en caché.
+    Devuelve cuántos ids nuevos quedaron con datos.
+    """
+    _load_cache()
+    now = time.time()
+    wanted = list(dict.fromkeys(i for i in item_ids if i))
+    missing = [i for i in wanted if _cache.get(i, {}).get("expires_at", 0) <= now]
+    print(f"[ITEMS] 📦 {len(wanted)} ids | {len(wanted) - len(missing)} en caché | "
+          f"{len(missing)} a pedir ({-(-len(missing) // ITEMS_BATCH)} peticiones)")
+    if not missing:
+        return 0
+
+    t0 = time.perf_counter()
+    try:
+        found = asyncio.run(_fetch_all(missing))
+    except Exception as e:
+        print(f"[ITEMS] ❌ Error en multi-get: {e}")
+        return 0
+
+    _remember(found)
+
+    ok = sum(1 for d in found.values() if d)
+    print(f"[ITEMS] ✅ {ok}/{len(missing)} con datos en {time.perf_counter() - t0:.1f}s")
+    return ok
+
+
+def _remember(found: Dict[str, Optional[Dict[str, Any]]]):
+    """Guarda en el caché los detalles mapeados de los bodies crudos."""
+    _load_cache()
+    expires_at = time.time() + ITEMS_TTL
+    for item_id, body in found.items():
+        _cache[item_id] = {"data": _map_body(body) if body else None, "expires_at": expires_at}
+    _save_cache()
+
+
+async def fetch_item_records_async(item_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Registros completos (título, precio, permalink...) de los ids, en lotes
+    de 20. Aprovecha para dejar sus detalles en el caché de enriquecimiento.
+    """
+    ids = list(dict.fromkeys(i for i in item_ids if i))
+    if not ids:
+        return []
+    found = await _fetch_all(ids, RECORD_ATTRIBUTES)
+    _remember(found)
+    return [found[i] for i in ids if found.get(i)]
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+meli_search.py
+
+Fuente única (async) para la API de búsqueda de Mercado Libre:
+    GET https://api.mercadolibre.com/sites/MLM/search
+
+Reemplaza a los tres clientes seriales que había (src/fetcher.py,
+src/meli.py y api_client.py, que ahora son envoltorios delgados):
+
+  - todas las páginas (offsets) se piden a la vez, con un límite de
+    concurrencia, sobre UNA sesión aiohttp con keep-alive
+  - el access token sale de token_manager (si hay credenciales en el .env)
+  - un solo _normalize_item que deja cada resultado con la forma que usa
+    el pipeline de main.py (title/price/original_price/permalink/...)
+
+main.run la usa en lugar del scraper con OFFERS_SOURCE=api.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from src.circuit_breaker import get_breaker, service_up
+from src.http_session import API_HEADERS, async_session
+from src.rate_limiter import request_async
+from src.token_manager import get_access_token, has_credentials
+
+SEARCH_URL = "https://api.mercadolibre.com/sites/MLM/search"
+
+HEADERS = API_HEADERS
+
+SEARCH_QUERY = os.getenv("MELI_SEARCH_QUERY", "ofertas")
+SEARCH_CONCURRENCY = max(1, int(os.getenv("MELI_SEARCH_CONCURRENCY", "6") or 6))
+SEARCH_LIMIT = int(os.getenv("MELI_SEARCH_LIMIT", "50") or 50)   # la API no da más de 50 por página
+SEARCH_TIMEOUT = 15
+
+
+def _discount_pct(price: float, original_price: float, given=None) -> int:
+    if given is not None:
+        try: return int(given)
+        except (TypeError, ValueError): pass
+    try:
+        if original_price and original_price > 0:
+            return int(round((1 - (price / original_price)) * 100))
+    except Exception:
+        pass
+    return 0
+
+
+def _normalize_item(r: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte un resultado crudo de /search en un item del bot."""
+    price = r.get("price") or 0
+    original_price = r.get("original_price") or r.get("base_price") or price
+    permalink = r.get("permalink") or ""
+    shipping = r.get("shipping") or {}
+    promo_tag = "FULL" if shipping.get("logistic_type") == "fulfillment" else ""
+
+    return {
+        "id": r.get("id"),
+        "title": r.get("title") or "Sin título",
+        "price": price,
+        "original_price": original_price,
+        "discount": _discount_pct(price, original_price, r.get("discount_percentage")),
+        "permalink": permalink,
+        "url": permalink,
+        "thumbnail": r.get("thumbnail") or r.get("secure_thumbnail"),
+        "currency_id": r.get("currency_id"),
+        "free_shipping": bool(shipping.get("free_shipping", False)),
+        "promo_tag": promo_tag,
+        "coupon_text": "",
+        "coupon_value": 0.0,
+        "rating": 0.0,
+        "reviews_count": 0,
+    }
+
+
+async def _fetch_offset(session, sem, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    breaker = get_breaker("ml_api")
+    async with sem:
+        try:
+            status, body, _ = await request_async(session, "GET", SEARCH_URL, params=params)
+            breaker.record(service_up(status), f"search HTTP {status}")
+            if status != 200:
+                print(f"[MELI_SEARCH] ERROR HTTP {status} (offset={params['offset']}): {body[:200]}")
+                return []
+            data = json.loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if not isinstance(e, ValueError): breaker.record_failure(f"search: {e}")
+            print(f"[MELI_SEARCH] ERROR de red (offset={params['offset']}): {e}")
+            return []
+    return data.get("results", []) or []
+
+
+async def search_raw_async(
+    q: str,
+    pages: int = 3,
+    limit_per_page: int = SEARCH_LIMIT,
+    start_page: int = 0,
+    sort: Optional[str] = "discount",
+    concurrency: int = SEARCH_CONCURRENCY,
+    extra_params: Optional[Dict[str, Any]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Resultados crudos, una lista por página (en orden de offset)."""
+    if not get_breaker("ml_api").allow():
+        print(f"[MELI_SEARCH] ⛔ Circuito de la API abierto ({get_breaker('ml_api').summary()})")
+        return [[] for _ in range(pages)]
+    base = {"q": q, "limit": limit_per_page}
+    if sort:
+        base["sort"] = sort
+    base.update(extra_params or {})
+
+    headers = dict(HEADERS)
+    token = await asyncio.to_thread(get_access_token) if has_credentials() else None
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+    async with async_session(headers, limit=concurrency, timeout=SEARCH_TIMEOUT) as session:
+        return await asyncio.gather(*(
+            _fetch_offset(session, sem, {**base, "offset": p * limit_per_page})
+            for p in range(start_page, start_page + pages)
+        ))
+
+
+def search_raw(q: str, pages: int = 3, limit_per_page: int = SEARCH_LIMIT, **kwargs) -> List[List[Dict[str, Any]]]:
+    """Versión síncrona de search_raw_async (para código que no es async)."""
+    return asyncio.run(search_raw_async(q, pages, limit_per_page, **kwargs))
+
+
+def search(q: str, pages: int = 3, limit_per_page: int = SEARCH_LIMIT, **kwargs) -> List[Dict[str, Any]]:
+    """Busca, normaliza y quita duplicados por id (conserva el orden)."""
+    unique: Dict[str, Dict[str, Any]] = {}
+    for page_results in search_raw(q, pages, limit_per_page, **kwargs):
+        for r in page_results:
+            item = _normalize_item(r)
+            if item["id"] and item["id"] not in unique:
+                unique[item["id"]] = item
+    return list(unique.values())
+
+
+def fetch_offers(pages: int = 3, q: Optional[str] = None, limit_per_page: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Entrada para main.run (OFFERS_SOURCE=api): misma firma que
+    offers_fetcher.fetch_offers y mismo rango de precios.
+    """
+    from src.offers_fetcher import MAX_PRICE, MIN_PRICE
+
+    q = q or SEARCH_QUERY
+    print(f"\n[MELI_SEARCH] q='{q}' pages={pages} limit={limit_per_page} ({SEARCH_CONCURRENCY} en paralelo)")
+    t0 = time.perf_counter()
+    items = search(q, pages, limit_per_page, extra_params={"price": f"{MIN_PRICE}-{MAX_PRICE}"})
+    print(f"[MELI_SEARCH] 🏁 {len(items)} items únicos en {time.perf_counter() - t0:.1f}s")
+    return items
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+near_dup.py
+
+Índice de títulos casi duplicados (MinHash + LSH) para lo ya publicado.
+
+store_cache solo reconocía el mismo título exacto (hash de title_key), y
+main.is_similar_title (difflib) es cuadrático por par: comparar cada
+candidato contra todo el historial no escala. Aquí:
+
+  - cada título publicado se normaliza con normalize_title, se le quitan
+    las palabras de relleno (STOPWORDS), se parte en shingles (palabras
+    sueltas + pares de palabras consecutivas) y se
+    resume en una firma MinHash de NEAR_DUP_PERMS enteros
+  - la firma se corta en bandas; cada banda es una llave de un dict, así
+    que una consulta solo compara contra los títulos que comparten alguna
+    banda (costo por consulta independiente del tamaño del historial)
+  - los candidatos se confirman con la similitud estimada (posiciones
+    iguales de la firma) >= NEAR_DUP_THRESHOLD y con los mismos tokens
+    numéricos: "Galaxy A54 128GB" no es duplicado de "Galaxy A34 128GB"
+
+Se guarda en data/near_dup_index.json junto al caché de vistos (firma en
+base64 + título); la primera vez se siembra con data/ofertas_publicadas.csv.
+
+Configuración:
+    NEAR_DUP=0                    desactiva el índice
+    NEAR_DUP_THRESHOLD=0.8        similitud de Jaccard mínima
+    NEAR_DUP_PERMS=64             largo de la firma
+    NEAR_DUP_MAX_ENTRIES=20000    se descartan las más viejas
+"""
+
+import base64
+import csv
+import json
+import os
+import random
+import re
+import zlib
+from array import array
+from collections import defaultdict
+from datetime import datetime
+
+from src.text_normalize import STOPWORDS, normalize_title
+
+INDEX_FILE = "data/near_dup_index.json"
+SEED_CSV = "data/ofertas_publicadas.csv"
+
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP", "1") != "0"
+THRESHOLD = min(0.99, max(0.1, float(os.getenv("NEAR_DUP_THRESHOLD", "0.8") or 0.8)))
+NUM_PERM = max(16, int(os.getenv("NEAR_DUP_PERMS", "64") or 64))
+MAX_ENTRIES = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "20000") or 20000)
+
+_PRIME = (1 << 61) - 1
+_MASK = 0xFFFFFFFF
+_SEED = 1
+_WORD = re.compile(r"\w+")
+_DIGIT = re.compile(r"\d")
+_STOP = frozenset(STOPWORDS)
+
+
+def _permutations(num_perm: int) -> list:
+    rng = random.Random(_SEED)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+
+def _false_rates(threshold: float, bands: int, rows: int, steps: int = 50) -> float:
+    """Área de falsos positivos (s < umbral) + falsos negativos (s >= umbral)."""
+    total = 0.0
+    for i in range(steps):
+        s = (i + 0.5) / steps
+        p = 1 - (1 - s ** rows) ** bands
+        total += p if s < threshold else 1 - p
+    return total / steps
+
+
+def _choose_bands(threshold: float, num_perm: int) -> tuple:
+    """(bandas, filas) con menor error para el umbral (bandas * filas <= num_perm)."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1)]
+    return min(options, key=lambda br: _false_rates(threshold, *br))
+
+
+_PERMS = _permutations(NUM_PERM)
+BANDS, ROWS = _choose_bands(THRESHOLD, NUM_PERM)
+
+
+def shingles(title: str) -> set:
+    """Palabras y pares de palabras del título normalizado, sin relleno."""
+    words = [w for w in _WORD.findall(normalize_title(title or "")) if w not in _STOP]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def numeric_tokens(title: str) -> str:
+    """Tokens con dígitos (modelo, capacidad, medidas) en orden canónico."""
+    return " ".join(sorted({w for w in _WORD.findall(normalize_title(title or "")) if _DIGIT.search(w)}))
+
+
+def signature(title: str) -> array:
+    hashes = [zlib.crc32(s.encode()) for s in shingles(title)]
+    if not hashes:
+        return array("I")
+    return array("I", (min((a * h + b) % _PRIME for h in hashes) & _MASK for a, b in _PERMS))
+
+
+def similarity(sig_a: array, sig_b: array) -> float:
+    """Jaccard estimado: fracción de posiciones iguales de las firmas."""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def _band_keys(sig: array) -> list:
+    return [(i, sig[i * ROWS:(i + 1) * ROWS].tobytes()) for i in range(BANDS)]
+
+
+class NearDupIndex:
+    """Firmas MinHash en buckets LSH, con persistencia en JSON."""
+
+    __slots__ = ("entries", "buckets", "dirty")
+
+    def __init__(self):
+        self.entries = []                 # [{"title", "sig", "num", "ts"}]
+        self.buckets = defaultdict(list)  # (banda, bytes) -> [índice en entries]
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _index(self, pos: int):
+        for key in _band_keys(self.entries[pos]["sig"]):
+            self.buckets[key].append(pos)
+
+    def _rebuild(self):
+        self.entries = self.entries[-MAX_ENTRIES:]
+        self.buckets = defaultdict(list)
+        for pos in range(len(self.entries)):
+            self._index(pos)
+
+    def add(self, title: str, ts: str = None):
+        sig = signature(title)
+        if not sig:
+            return
+        self.entries.append({"title": title, "sig": sig, "num": numeric_tokens(title),
+                             "ts": ts or datetime.now().isoformat(timespec="seconds")})
+        self.dirty = True
+        if len(self.entries) > MAX_ENTRIES * 1.1:
+            self._rebuild()
+        else:
+            self._index(len(self.entries) - 1)
+
+    def find(self, title: str):
+        """(título publicado, similitud) del casi duplicado más parecido, o None."""
+        sig = signature(title)
+        if not sig:
+            return None
+        candidates = set()
+        for key in _band_keys(sig):
+            candidates.update(self.buckets.get(key, ()))
+        if not candidates:
+            return None
+        num = numeric_tokens(title)
+        best = None
+        for pos in candidates:
+            entry = self.entries[pos]
+            if entry["num"] != num:
+                continue
+            score = similarity(sig, entry["sig"])
+            if score >= THRESHOLD and (best is None or score > best[1]):
+                best = (entry["title"], score)
+        return best
+
+    def load(self, path: str = INDEX_FILE) -> bool:
+        """Carga el índice; recalcula firmas si cambió NEAR_DUP_PERMS."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        same_params = data.get("perms") == NUM_PERM and data.get("seed") == _SEED
+        self.entries = []
+        for e in data.get("entries", []):
+            title = e.get("title") or ""
+            sig = array("I")
+            if same_params:
+                sig.frombytes(base64.b64decode(e.get("sig", "")))
+            else:
+                sig = signature(title)
+            if sig:
+                self.entries.append({"title": title, "sig": sig, "num": numeric_tokens(title), "ts": e.get("ts", "")})
+        self._rebuild()
+        self.dirty = not same_params
+        return True
+
+    def seed_from_csv(self, path: str = SEED_CSV) -> int:
+        """Siembra con los títulos ya publicados (para no arrancar vacío)."""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                rows = [(r.get("title") or "", r.get("timestamp") or "") for r in csv.DictReader(f)]
+        except (OSError, csv.Error):
+            return 0
+        before = len(self.entries)
+        for title, ts in rows:
+            if title and not self.find(title):
+                self.add(title, ts)
+        return len(self.entries) - before
+
+    def save(self, path: str = INDEX_FILE):
+        if not self.dirty:
+            return
+        data = {
+            "perms": NUM_PERM,
+            "seed": _SEED,
+            "entries": [
+                {"title": e["title"], "ts": e["ts"], "sig": base64.b64encode(e["sig"].tobytes()).decode("ascii")}
+                for e in self.entries
+            ],
+        }
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            self.dirty = False
+        except Exception as e:
+            print(f"[NEAR_DUP] ❌ No se pudo guardar {path}: {e}")
+
+    def summary(self) -> str:
+        return f"{len(self.entries)} títulos, {BANDS} bandas x {ROWS} filas, umbral {THRESHOLD:.2f}"
+
+
+_index = NearDupIndex()
+_loaded = False
+
+
+def get_index() -> NearDupIndex:
+    """Índice compartido (se carga o siembra la primera vez)."""
+    global _loaded
+    if not _loaded:
+        _loaded = True
+        if not _index.load():
+            seeded = _index.seed_from_csv()
+            if seeded:
+                print(f"[NEAR_DUP] 🌱 Índice sembrado con {seeded} títulos publicados")
+                _index.save()
+    return _index
+
+
+def find_near_duplicate(title: str):
+    """(título publicado, similitud) si el título es casi duplicado; si no, None."""
+    if not NEAR_DUP_ENABLED:
+        return None
+    return get_index().find(title)
+
+
+def remember_title(title: str):
+    if NEAR_DUP_ENABLED and title:
+        get_index().add(title)
+
+
+def save_index():
+    if NEAR_DUP_ENABLED and _loaded:
+        _index.save()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+network_capture.py
+
+Captura de resultados desde las respuestas de red (page.on("response")).
+
+Mientras Chromium scrollea, la página pide los resultados que carga en
+diferido por XHR/fetch en JSON. Antes se tiraban y al final se volvía a
+serializar TODO el DOM con page.content() para parsearlo. Aquí se guardan
+las respuestas JSON cuya URL matchea SCRAPE_CAPTURE_PATTERNS y se mapean
+al esquema de items del bot:
+
+  - JSON con poly-cards        -> offers_state.map_state_items
+  - JSON tipo /search (results con permalink y price)
+                               -> meli_search._normalize_item
+
+El handler solo junta los objetos Response (no lee cuerpos dentro del
+evento); los cuerpos se leen una vez por página en collect()/collect_async().
+
+Uso:
+    capture = NetworkCapture().attach(page)     # o await attach_async(page)
+    page.goto(url); ...scroll...
+    items = capture.collect()
+    capture.reset()
+
+SCRAPE_NETWORK_CAPTURE=1 lo activa en offers_fetcher.
+"""
+
+import os
+import re
+from typing import Any, Dict, List
+
+
+def _env_patterns(key: str, default: str) -> list:
+    raw = os.getenv(key, default) or ""
+    return [re.compile(p.strip()) for p in raw.split(",") if p.strip()]
+
+
+CAPTURE_PATTERNS = _env_patterns(
+    "SCRAPE_CAPTURE_PATTERNS",
+    r"mercadolibre\.com\.mx/.*/api/,/ofertas/api/,polycard,/sites/MLM/search,/search/api/",
+)
+MAX_BODY_BYTES = 5 * 1024 * 1024   # respuestas más grandes no son listados
+
+
+def network_capture_enabled() -> bool:
+    """SCRAPE_NETWORK_CAPTURE=1 activa la captura (apagada por defecto)."""
+    return os.getenv("SCRAPE_NETWORK_CAPTURE", "0").strip().lower() in ("1", "true", "yes")
+
+
+def map_network_payload(payload: Any) -> List[Dict[str, Any]]:
+    """Items del bot desde un JSON capturado (poly-cards o resultados de búsqueda)."""
+    from src.offers_state import map_state_items
+
+    items = map_state_items(payload)
+    if items:
+        return items
+    results = payload.get("results") if isinstance(payload, dict) else None
+    if not isinstance(results, list):
+        return []
+    from src.meli_search import _normalize_item
+
+    return [
+        _normalize_item(r) for r in results
+        if isinstance(r, dict) and r.get("permalink") and r.get("price")
+    ]
+
+
+class NetworkCapture:
+    """Junta las respuestas JSON de listados de una página."""
+
+    def __init__(self, patterns=None):
+        self.patterns = list(CAPTURE_PATTERNS if patterns is None else patterns)
+        self.reset()
+
+    def reset(self):
+        self.pending = []
+        self.responses = 0
+        self.errors = 0
+
+    def matches(self, url: str) -> bool:
+        return any(p.search(url) for p in self.patterns)
+
+    def _on_response(self, response):
+        try:
+            if response.status != 200 or not self.matches(response.url):
+                return
+            ctype = (response.headers.get("content-type") or "").lower()
+            size = int(response.headers.get("content-length") or 0)
+        except (ValueError, TypeError, AttributeError):
+            return
+        if "json" in ctype and size <= MAX_BODY_BYTES:
+            self.pending.append(response)
+
+    def attach(self, page) -> "NetworkCapture":
+        """Instala el collector en una página de sync_playwright."""
+        page.on("response", self._on_response)
+        return self
+
+    async def attach_async(self, page) -> "NetworkCapture":
+        """Instala el collector en una página de async_playwright."""
+        page.on("response", self._on_response)
+        return self
+
+    def _take(self) -> list:
+        pending, self.pending = self.pending, []
+        self.responses += len(pending)
+        return pending
+
+    def _map_all(self, payloads: list) -> List[Dict[str, Any]]:
+        seen = {}
+        for payload in payloads:
+            for it in map_network_payload(payload):
+                if it.get("permalink") and it["permalink"] not in seen:
+                    seen[it["permalink"]] = it
+        return list(seen.values())
+
+    def collect(self) -> List[Dict[str, Any]]:
+        """Lee los cuerpos pendientes (sync) y devuelve los items únicos."""
+        payloads = []
+        for response in self._take():
+            try:
+                payloads.append(response.json())
+            except Exception:
+                self.errors += 1
+        return self._map_all(payloads)
+
+    async def collect_async(self) -> List[Dict[str, Any]]:
+        payloads = []
+        for response in self._take():
+            try:
+                payloads.append(await response.json())
+            except Exception:
+                self.errors += 1
+        return self._map_all(payloads)
+
+
+def combine_items(captured: List[Dict[str, Any]], parsed: List[Dict[str, Any]]) -> tuple:
+    """
+    Une lo capturado por red con lo parseado del HTML (la red gana en
+    duplicados). Devuelve (items, desde_red, desde_html).
+    """
+    items = list(captured)
+    seen = {it["permalink"] for it in captured}
+    from_html = 0
+    for it in parsed:
+        if it["permalink"] not in seen:
+            seen.add(it["permalink"])
+            items.append(it)
+            from_html += 1
+    return items, len(captured), from_html
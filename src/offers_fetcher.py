@@ -7,9 +7,19 @@ from typing import List, Dict, Any
 import os
 import time
 import re
-from bs4 import BeautifulSoup
+from collections import Counter
 from playwright.sync_api import sync_playwright
 from src.logger import get_logger
+from src.http_session import USER_AGENT as HTTP_USER_AGENT
+from src.html_backends import find_cards
+from src.text_normalize import fold_upper
+from src.resource_filter import ResourceFilter, resource_filter_enabled
+from src.network_capture import NetworkCapture, combine_items, network_capture_enabled
+from src.crawl_plan import AdaptivePager, band_label, pages_per_band, plan_bands, record_band_yield
+from src.snapshot_store import SnapshotRecorder, SnapshotReplay, record_enabled, replay_source, resolve_replay_dir
+from src.scrape_checkpoint import ScrapeCheckpoint, checkpoint_enabled
+from src.rate_limiter import backoff_delay
+from src.circuit_breaker import get_breaker
 
 log = get_logger("offers_fetcher")
 
@@ -30,7 +40,7 @@ def _extract_id_from_url(url: str) -> str:
     if match: return match.group(1).replace("-", "")
     return ""
 
-def _parse_coupon_strict(card_soup) -> tuple[str, float, str]:
+def _parse_coupon_strict(card) -> tuple[str, float, str]:
     c_text_found = ""
     selectors = [
         ".ui-vpp-coupons-awareness__checkbox-label", 
@@ -40,9 +50,9 @@ def _parse_coupon_strict(card_soup) -> tuple[str, float, str]:
     ]
     
     for sel in selectors:
-        tags = card_soup.select(sel)
+        tags = card.select(sel)
         for tag in tags:
-            text = tag.get_text(" ", strip=True).upper()
+            text = tag.text(" ").upper()
             is_checkbox = "checkbox-label" in sel
             has_keyword = any(k in text for k in ["CUPÓN", "CUPON", "APLICAR"])
             
@@ -52,6 +62,10 @@ def _parse_coupon_strict(card_soup) -> tuple[str, float, str]:
                 break
         if c_text_found: break
 
+    return _coupon_from_text(c_text_found)
+
+def _coupon_from_text(c_text_found: str) -> tuple[str, float, str]:
+    """Convierte el texto crudo de un cupón en (texto, valor, tipo)."""
     if c_text_found:
         clean_txt = c_text_found.upper()
         for word in ["APLICAR", "CUPÓN", "CUPON", "DE REGALO", "DE DESCUENTO", "OFF"]:
@@ -73,15 +87,38 @@ def _parse_coupon_strict(card_soup) -> tuple[str, float, str]:
             except: pass
     return "", 0.0, None
 
-# Añadir esta función en offers_fetcher.py
 def _normalize_text(text: str) -> str:
     """Elimina acentos y mayúsculas para comparación segura."""
-    return text.upper().replace("Á", "A").replace("É", "E").replace("Í", "I").replace("Ó", "O").replace("Ú", "U")
+    return fold_upper(text)
+
+def _promo_from_badge(t_raw: str) -> str:
+    """Traduce el texto de un badge/highlight al tag de promo del bot."""
+    t_norm = _normalize_text(t_raw) # <--- USAR NORMALIZACIÓN
+    if "MAS VENDIDO" in t_norm: return "🔥 Más Vendido"
+    if "DEL DIA" in t_norm: return "⏰ Oferta del Día"
+    if "RELAMPAGO" in t_norm: return "⚡ Oferta Relámpago" # <--- FIX: Detecta sin acento
+    if "IMPERDIBLE" in t_norm: return "💎 Imperdible"
+    if "RECOMENDADO" in t_norm: return "⭐ Recomendado"
+    return ""
+
+def _with_full(promo_tag: str) -> str:
+    """Concatena '⚡ FULL' al tag si no lo trae ya."""
+    if promo_tag:
+        if "FULL" not in promo_tag.upper():
+            return f"{promo_tag} | ⚡ FULL"
+        return promo_tag
+    return "⚡ FULL"
     
-def _parse_html_offers(html: str) -> List[Dict[str, Any]]:
+# FULL por texto: solo en los bloques de envío (no en todo el texto de la tarjeta)
+FULL_TEXT_SELECTORS = ".poly-component__shipping, .ui-search-item__shipping, .ui-search-item__fulfillment"
+
+def _parse_html_offers(html: str, backend: str | None = None) -> List[Dict[str, Any]]:
+    """
+    Parser DOM. `backend` = "bs4" | "lxml" | "selectolax" (ver html_backends.py);
+    por default se usa HTML_PARSER del .env.
+    """
     items = []
-    soup = BeautifulSoup(html, "html.parser")
-    cards = soup.select("li.ui-search-layout__item, div.ui-search-result__wrapper, div.poly-card, div.andes-card")
+    cards = find_cards(html, backend)
     
     for card in cards:
         try:
@@ -89,17 +126,17 @@ def _parse_html_offers(html: str) -> List[Dict[str, Any]]:
             link_tag = card.select_one("a.poly-component__title, a.ui-search-link, a")
             if not title_tag: continue
             
-            title = title_tag.get_text(strip=True)
-            permalink = link_tag.get("href", "").split("#")[0] if link_tag else ""
+            title = title_tag.text()
+            permalink = (link_tag.attr("href") or "").split("#")[0] if link_tag else ""
             if not permalink: continue
             
-            cid = card.get("data-item-id") or _extract_id_from_url(permalink)
+            cid = card.attr("data-item-id") or _extract_id_from_url(permalink)
 
             curr_tag = card.select_one(".poly-price__current .andes-money-amount__fraction, .ui-search-price__second-line .andes-money-amount__fraction")
-            price = _clean_price(curr_tag.get_text(strip=True)) if curr_tag else 0.0
+            price = _clean_price(curr_tag.text()) if curr_tag else 0.0
 
             orig_tag = card.select_one(".andes-money-amount--previous .andes-money-amount__fraction, .ui-search-price__original-value .andes-money-amount__fraction")
-            original_price = _clean_price(orig_tag.get_text(strip=True)) if orig_tag else 0.0
+            original_price = _clean_price(orig_tag.text()) if orig_tag else 0.0
 
             if price <= 0: continue
             if original_price == 0: original_price = price
@@ -107,7 +144,7 @@ def _parse_html_offers(html: str) -> List[Dict[str, Any]]:
             img_tag = card.select_one("img")
             thumbnail = ""
             if img_tag:
-                thumbnail = img_tag.get("data-src") or img_tag.get("src") or ""
+                thumbnail = img_tag.attr("data-src") or img_tag.attr("src") or ""
                 if "http" in thumbnail:
                     thumbnail = thumbnail.replace("I.jpg", "V.jpg").replace("_I.jpg", "_V.jpg")
 
@@ -115,25 +152,18 @@ def _parse_html_offers(html: str) -> List[Dict[str, Any]]:
             reviews = 0
             rating_tag = card.select_one(".poly-reviews__rating, .ui-search-reviews__rating")
             if rating_tag:
-                try: rating = float(rating_tag.get_text(strip=True))
+                try: rating = float(rating_tag.text())
                 except: pass
             reviews_tag = card.select_one(".poly-reviews__total, .ui-search-reviews__amount")
             if reviews_tag:
-                try: reviews = int(reviews_tag.get_text(strip=True).replace("(", "").replace(")", ""))
+                try: reviews = int(reviews_tag.text().replace("(", "").replace(")", ""))
                 except: pass
 
             # 5. TAGS DE OFERTA
             promo_tag = ""
             badges = card.select(".poly-component__highlight, .ui-search-item__highlight-label, .andes-badge__content")
             for b in badges:
-                t_raw = b.get_text(strip=True).upper()
-                t_norm = _normalize_text(t_raw) # <--- USAR NORMALIZACIÓN
-                
-                if "MAS VENDIDO" in t_norm: promo_tag = "🔥 Más Vendido"
-                elif "DEL DIA" in t_norm: promo_tag = "⏰ Oferta del Día"
-                elif "RELAMPAGO" in t_norm: promo_tag = "⚡ Oferta Relámpago" # <--- FIX: Detecta sin acento
-                elif "IMPERDIBLE" in t_norm: promo_tag = "💎 Imperdible"
-                elif "RECOMENDADO" in t_norm: promo_tag = "⭐ Recomendado"
+                promo_tag = _promo_from_badge(b.text())
                 if promo_tag: break
 
             # DETECCIÓN DE FULL
@@ -141,17 +171,13 @@ def _parse_html_offers(html: str) -> List[Dict[str, Any]]:
             # Detección por CSS/clases
             if card.select_one(".poly-component__shipped-from-fulfillment, .andes-icon--fulfillment, span.ui-search-item__fulfillment-label, .poly-component__shipping-badge"):
                 is_full = True
-            # Detección por texto (usando normalización)
-            elif "FULL" in _normalize_text(card.get_text()): 
+            # Detección por texto del bloque de envío (usando normalización)
+            elif any("FULL" in _normalize_text(t.text()) for t in card.select(FULL_TEXT_SELECTORS)):
                 is_full = True
             
             # Concatenación de FULL
             if is_full:
-                if promo_tag:
-                    if "FULL" not in promo_tag.upper():
-                        promo_tag = f"{promo_tag} | ⚡ FULL"
-                else:
-                    promo_tag = "⚡ FULL"
+                promo_tag = _with_full(promo_tag)
                    
             c_text, c_val, c_type = _parse_coupon_strict(card)
 
@@ -172,38 +198,638 @@ def _parse_html_offers(html: str) -> List[Dict[str, Any]]:
         except Exception: continue
     return items
 
-def fetch_offers(pages: int = 3) -> List[Dict[str, Any]]:
-    print(f"\n[PLAYWRIGHT] Iniciando scraping de {pages} páginas")
+BASE_URL = "https://www.mercadolibre.com.mx/ofertas"
+USER_AGENT = HTTP_USER_AGENT
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+# Páginas en paralelo (1 = modo clásico, una página a la vez con sync_playwright)
+SCRAPE_CONCURRENCY = max(1, int(os.getenv("SCRAPE_CONCURRENCY", "1") or 1))
+
+# Reintentos por página (con backoff y pestaña nueva) antes de darla por perdida
+PAGE_RETRIES = max(0, int(os.getenv("SCRAPE_PAGE_RETRIES", "2") or 0))
+
+# Circuit breaker del scraper (ver circuit_breaker.py)
+BREAKER = "scraper"
+SHORT_CIRCUIT = "cortocircuito"
+
+# Scroll adaptativo: se detiene cuando el número de tarjetas deja de crecer
+CARD_SELECTOR = "li.ui-search-layout__item, div.poly-card"
+SCROLL_MAX_SECONDS = float(os.getenv("SCRAPE_SCROLL_MAX_SECONDS", "8") or 8)
+SCROLL_STEP_PX = 1200
+SCROLL_SETTLE_MS = 250
+SCROLL_STABLE_ROUNDS = 2
+NETWORK_IDLE_MS = 1500
+
+_SCROLL_STATE_JS = """
+sel => ({
+    cards: document.querySelectorAll(sel).length,
+    bottom: window.innerHeight + window.scrollY >= document.body.scrollHeight - 50
+})
+"""
+
+def _page_url(page_num: int, band: tuple[float, float] | None = None) -> str:
+    #?promotion_type=lightning&shipping=fulfillment#filter_applied=promotion_type&filter_position=2&origin=qcat
+    lo, hi = band or (MIN_PRICE, MAX_PRICE)
+    return f"{BASE_URL}?price={lo}-{hi}&page={page_num}"
+
+def _parse_offers(html: str) -> tuple[List[Dict[str, Any]], str]:
+    """
+    Parsea una página probando primero el JSON de estado embebido y luego
+    el DOM. Devuelve (items, ruta) con ruta = "state" o "dom".
+    """
+    if os.getenv("SCRAPE_PARSE_STATE", "1").strip().lower() in ("1", "true", "yes"):
+        from src.offers_state import parse_state_offers
+        items = parse_state_offers(html)
+        if items:
+            return items, "state"
+    return _parse_html_offers(html), "dom"
+
+def _merge_items(all_items: Dict[str, Dict[str, Any]], items: List[Dict[str, Any]]) -> int:
+    """Agrega items al dict por permalink. Devuelve cuántos eran nuevos."""
+    new_c = 0
+    for it in items:
+        if it["permalink"] not in all_items:
+            all_items[it["permalink"]] = it
+            new_c += 1
+    return new_c
+
+def fetch_offers(pages: int = 3, concurrency: int | None = None) -> List[Dict[str, Any]]:
+    """
+    Scrapea /ofertas. `pages` es la base: con SCRAPE_ADAPTIVE (default) el
+    número real de páginas se ajusta según cuántos items nuevos trae cada una.
+    Con SCRAPE_PRICE_BANDS el presupuesto se reparte entre bandas de precio.
+    """
+    targets = _plan_targets(pages)
+    if replay_source():
+        return _fetch_from_snapshots(targets, replay_source())
+    if get_breaker(BREAKER).is_open():
+        print(f"[PLAYWRIGHT] ⛔ Circuito del scraper abierto: no se abre el navegador ({get_breaker(BREAKER).summary()})")
+        return []
+
+    recorder = SnapshotRecorder() if record_enabled() else None
+    checkpoint = ScrapeCheckpoint(_plan_key(targets)) if checkpoint_enabled() else None
+    concurrency = SCRAPE_CONCURRENCY if concurrency is None else max(1, concurrency)
+    total_base = sum(pager.base_pages for _, pager in targets)
+    from src.offers_http import http_first_enabled
+    if http_first_enabled():
+        import asyncio
+        return asyncio.run(_fetch_offers_http_first(targets, concurrency, recorder, checkpoint))
+    if concurrency > 1 and total_base > 1:
+        import asyncio
+        return asyncio.run(_fetch_offers_async(targets, concurrency, recorder, checkpoint))
+
+    print(f"\n[PLAYWRIGHT] Iniciando scraping de {total_base} páginas")
     all_items = {}
+    parse_paths = Counter()
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
-            context = browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-            page = context.new_page()
-            base_url = "https://www.mercadolibre.com.mx/ofertas"
-            #?promotion_type=lightning&shipping=fulfillment#filter_applied=promotion_type&filter_position=2&origin=qcat
-            
-            for page_num in range(1, pages + 1):
-                url = f"{base_url}?price={MIN_PRICE}-{MAX_PRICE}&page={page_num}"
-                print(f"[PAGE {page_num}] 📍 Navegando...")
-                try:
-                    page.goto(url, wait_until="domcontentloaded", timeout=45000)
-                    for _ in range(5): 
-                        page.mouse.wheel(0, 1000)
-                        time.sleep(0.5)
-                    html = page.content()
-                    items = _parse_html_offers(html)
-                    new_c = 0
-                    for it in items:
-                        if it["permalink"] not in all_items:
-                            all_items[it["permalink"]] = it
-                            new_c += 1
-                    print(f"[PAGE {page_num}] ✅ {len(items)} items ({new_c} nuevos)")
-                except Exception as e: print(f"[PAGE {page_num}] ❌ Error: {e}")
-            browser.close()
+        if _use_persistent_browser():
+            from src.browser_manager import get_browser_manager
+
+            # Corre en el hilo del browser tibio; este hilo queda sin event loop
+            def scrape_warm():
+                with get_browser_manager().page() as managed:
+                    page = managed
+                    for band, pager in targets:
+                        page = _scrape_pages_sync(page, band, pager, all_items, parse_paths, recorder, checkpoint)
+                    if page is not managed:
+                        page.close()
+
+            get_browser_manager().run(scrape_warm)
+        else:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+                context = browser.new_context(user_agent=USER_AGENT)
+                page = context.new_page()
+                for band, pager in targets:
+                    page = _scrape_pages_sync(page, band, pager, all_items, parse_paths, recorder, checkpoint)
+                browser.close()
     except Exception as e:
-        print(f"[PLAYWRIGHT] ❌ Error crítico: {e}")
+        return _partial("PLAYWRIGHT", e, all_items, parse_paths, targets)
+    return _finish("PLAYWRIGHT", all_items, parse_paths, targets, checkpoint)
+
+def _plan_targets(pages: int) -> List[tuple]:
+    """[(banda o None, AdaptivePager), ...] para este ciclo."""
+    bands = plan_bands(MIN_PRICE, MAX_PRICE)
+    if not bands:
+        return [(None, AdaptivePager(pages))]
+    per_band = pages_per_band(pages, len(bands))
+    print(f"[BANDAS] 💲 {len(bands)} bandas x {per_band} págs: {', '.join(band_label(b) for b in bands)}")
+    return [(b, AdaptivePager(per_band, label=band_label(b))) for b in bands]
+
+def _plan_key(targets: List[tuple]) -> str:
+    """Identifica el plan del ciclo: un checkpoint solo se retoma con el mismo plan."""
+    return "|".join(band_label(band) if band else f"{MIN_PRICE:g}-{MAX_PRICE:g}" for band, _ in targets)
+
+def _new_result(page_num: int, band: tuple[float, float] | None = None) -> Dict[str, Any]:
+    return {
+        "page": page_num, "tag": f"{band_label(band)} P{page_num}" if band else f"PAGE {page_num}",
+        "items": [], "elapsed": 0.0, "error": None, "resources": "", "scroll": "", "source": "", "via": "",
+        "origins": {}, "blocked": "",
+    }
+
+def _capture_covers(captured: List[Dict[str, Any]], cards: int) -> bool:
+    """La red trajo al menos tantos items como tarjetas hay en el DOM: no hace falta page.content()."""
+    return bool(captured) and len(captured) >= cards
+
+def _set_page_items(res: Dict[str, Any], captured: List[Dict[str, Any]], parsed: List[Dict[str, Any]], source: str):
+    """Items de la página (red + HTML) y de dónde salió cada uno."""
+    if captured:
+        res["items"], from_net, from_html = combine_items(captured, parsed)
+        res["source"] = f"network+{source}" if from_html else "network"
+    else:
+        res["items"], res["source"] = parsed, source
+        from_net, from_html = 0, len(parsed)
+    res["origins"] = {"network": from_net, "html": from_html}
+
+def _short_circuited(page_num: int, band=None) -> Dict[str, Any]:
+    """Resultado de una página que no se pidió porque el circuito está abierto."""
+    res = _new_result(page_num, band)
+    res["error"], res["via"] = "circuito abierto", SHORT_CIRCUIT
+    return res
+
+def _breaker_outcome(res: Dict[str, Any]) -> tuple[bool, str]:
+    """
+    (éxito, motivo) de la página para el circuito. Fallan los errores reales
+    y las páginas de challenge/bloqueo; una página vacía solo cuenta si es la
+    1 (las últimas páginas vacías son normales: bandas angostas, paginación
+    adaptativa que se pasa del final).
+    """
+    if res["error"] is not None:
+        return False, str(res["error"])
+    if res["blocked"]:
+        return False, res["blocked"]
+    if not res["items"] and res["page"] == 1:
+        return False, "0 items en la página 1"
+    return True, ""
+
+def _page_blocked(res: Dict[str, Any], final_url: str, html: str):
+    """Marca la página como challenge/bloqueo si no trajo items y el HTML lo parece."""
+    from src.offers_http import challenge_reason
+
+    if not res["items"]:
+        res["blocked"] = challenge_reason(200, final_url, html) or ""
+
+def _consume_result(res: Dict[str, Any], all_items: Dict[str, Dict[str, Any]], parse_paths: Counter, pager: AdaptivePager,
+                    checkpoint: ScrapeCheckpoint | None = None):
+    """Log de la página + decisión de paginación + merge (en ese orden) + checkpoint."""
+    tag = res["tag"]
+    if res["via"] not in ("checkpoint", SHORT_CIRCUIT):
+        get_breaker(BREAKER).record(*_breaker_outcome(res))
+    if res["error"] is not None:
+        print(f"[{tag}] ❌ Error: {res['error']} ({res['elapsed']:.1f}s)")
+        pager.record(res["page"], None, all_items)
+        if checkpoint: checkpoint.record_failure(res)
+    else:
+        parse_paths[res["source"]] += 1
+        for origin, n in res["origins"].items():
+            parse_paths[f"items:{origin}"] += n
+        ratio = pager.record(res["page"], res["items"], all_items)
+        new_c = _merge_items(all_items, res["items"])
+        if checkpoint and res["via"] != "checkpoint": checkpoint.record(res)
+        print(f"[{tag}] ✅ {len(res['items'])} items ({new_c} nuevos, {ratio:.0%} sin ver) en {res['elapsed']:.1f}s{res['scroll']} [parser={res['source']}]{' [' + res['via'] + ']' if res['via'] else ''}")
+    if res["resources"]: print(f"[{tag}] 🧹 {res['resources']}")
+
+def _from_checkpoint(checkpoint: ScrapeCheckpoint | None, page_num: int, band=None) -> Dict[str, Any] | None:
+    """Resultado guardado de la página (aunque haya huecos antes), o None si hay que pedirla."""
+    saved = checkpoint.get(_new_result(page_num, band)["tag"]) if checkpoint else None
+    if saved is None:
+        return None
+    res = _new_result(page_num, band)
+    res["items"], res["source"], res["origins"] = saved["items"], saved["source"], saved.get("origins") or {}
+    res["via"] = "checkpoint"
+    return res
+
+def _partial(tag: str, error: Exception, all_items, parse_paths: Counter, targets: List[tuple]) -> List[Dict[str, Any]]:
+    """Crash del navegador: se devuelve lo ya parseado y el checkpoint queda para retomar."""
+    print(f"[{tag}] ❌ Error crítico: {error}")
+    if not all_items:
         return []
+    print(f"[{tag}] 🩹 Se conservan {len(all_items)} items de las páginas ya terminadas")
+    return _finish(tag, all_items, parse_paths, targets)
+
+def _finish(tag: str, all_items: Dict[str, Dict[str, Any]], parse_paths: Counter, targets: List[tuple],
+            checkpoint: ScrapeCheckpoint | None = None) -> List[Dict[str, Any]]:
+    """Cierre del ciclo; con `checkpoint` lo borra solo si ninguna página quedó con error."""
     results = list(all_items.values())
-    print(f"[PLAYWRIGHT] 🏁 Total: {len(results)} ofertas.")
-    return results
\ No newline at end of file
+    if checkpoint and checkpoint.failed:
+        print(f"[{tag}] 💾 Checkpoint conservado: {len(checkpoint.failed)} páginas con error se piden el próximo ciclo")
+    elif checkpoint:
+        checkpoint.clear()
+    for _, pager in targets:
+        print(f"[{tag}] 📑 Paginación: {pager.summary()}")
+    bands = {band: pager for band, pager in targets if band}
+    if bands:
+        record_band_yield(bands)
+    pages_by_parser = {k: v for k, v in parse_paths.items() if not k.startswith("items:")}
+    origins = {k[6:]: v for k, v in parse_paths.items() if k.startswith("items:")}
+    print(f"[{tag}] 🧩 Parser por página: {pages_by_parser}")
+    if origins.get("network"):
+        print(f"[{tag}] 📡 Items por origen: {origins.get('network', 0)} de red, {origins.get('html', 0)} del HTML")
+    print(f"[{tag}] 🏁 Total: {len(results)} ofertas.")
+    return results
+
+def _scroll_until_stable(page) -> tuple[int, int]:
+    """
+    Scrollea hasta que el conteo de tarjetas se estabiliza (o se llega al
+    tope de SCRAPE_SCROLL_MAX_SECONDS). Devuelve (tarjetas, scrolls).
+    """
+    deadline = time.perf_counter() + SCROLL_MAX_SECONDS
+    remaining_ms = lambda: max(0, int((deadline - time.perf_counter()) * 1000))
+    try: page.wait_for_selector(CARD_SELECTOR, timeout=remaining_ms())
+    except Exception: pass
+    try: page.wait_for_load_state("networkidle", timeout=min(NETWORK_IDLE_MS, remaining_ms()))
+    except Exception: pass
+
+    last = page.evaluate(_SCROLL_STATE_JS, CARD_SELECTOR)["cards"]
+    stable = rounds = 0
+    while time.perf_counter() < deadline:
+        page.mouse.wheel(0, SCROLL_STEP_PX)
+        page.wait_for_timeout(min(SCROLL_SETTLE_MS, remaining_ms()))
+        rounds += 1
+        state = page.evaluate(_SCROLL_STATE_JS, CARD_SELECTOR)
+        if state["cards"] > last:
+            last, stable = state["cards"], 0
+            continue
+        stable += 1
+        if stable >= SCROLL_STABLE_ROUNDS or (state["bottom"] and last > 0):
+            break
+    return last, rounds
+
+async def _scroll_until_stable_async(page) -> tuple[int, int]:
+    """Versión async_playwright de _scroll_until_stable."""
+    deadline = time.perf_counter() + SCROLL_MAX_SECONDS
+    remaining_ms = lambda: max(0, int((deadline - time.perf_counter()) * 1000))
+    try: await page.wait_for_selector(CARD_SELECTOR, timeout=remaining_ms())
+    except Exception: pass
+    try: await page.wait_for_load_state("networkidle", timeout=min(NETWORK_IDLE_MS, remaining_ms()))
+    except Exception: pass
+
+    last = (await page.evaluate(_SCROLL_STATE_JS, CARD_SELECTOR))["cards"]
+    stable = rounds = 0
+    while time.perf_counter() < deadline:
+        await page.mouse.wheel(0, SCROLL_STEP_PX)
+        await page.wait_for_timeout(min(SCROLL_SETTLE_MS, remaining_ms()))
+        rounds += 1
+        state = await page.evaluate(_SCROLL_STATE_JS, CARD_SELECTOR)
+        if state["cards"] > last:
+            last, stable = state["cards"], 0
+            continue
+        stable += 1
+        if stable >= SCROLL_STABLE_ROUNDS or (state["bottom"] and last > 0):
+            break
+    return last, rounds
+
+def _use_persistent_browser() -> bool:
+    """BROWSER_PERSISTENT=1 reutiliza el Chromium tibio de browser_manager."""
+    return os.getenv("BROWSER_PERSISTENT", "0").strip().lower() in ("1", "true", "yes")
+
+def _fetch_from_snapshots(targets: List[tuple], source: str) -> List[Dict[str, Any]]:
+    """Replay: parsea páginas grabadas por snapshot_store, sin navegador."""
+    cycle_dir = resolve_replay_dir(source)
+    if cycle_dir is None:
+        print(f"[REPLAY] ❌ No encontré snapshots en '{source}'")
+        return []
+    replay = SnapshotReplay(cycle_dir)
+    print(f"\n[REPLAY] 📼 Leyendo páginas de {cycle_dir} ({len(replay)} grabadas)")
+    all_items = {}
+    parse_paths = Counter()
+    for band, pager in targets:
+        page_num = 1
+        while page_num <= pager.limit:
+            res = _new_result(page_num, band)
+            html = replay.get(page_num, _page_url(page_num, band), band)
+            if html is None:
+                print(f"[{res['tag']}] ⏭️ Sin snapshot")
+                break
+            t0 = time.perf_counter()
+            res["items"], res["source"] = _parse_offers(html)
+            res["elapsed"] = time.perf_counter() - t0
+            _consume_result(res, all_items, parse_paths, pager)
+            page_num += 1
+    return _finish("REPLAY", all_items, parse_paths, targets)
+
+def _instrument_sync(page) -> tuple:
+    """(rstats, capture) de la página; se instalan la primera vez que se usa."""
+    rstats = getattr(page, "_promo_filtered", None)
+    if rstats is None and resource_filter_enabled():
+        rstats = page._promo_filtered = ResourceFilter().attach(page)
+    capture = getattr(page, "_promo_capture", None)
+    if capture is None and network_capture_enabled():
+        capture = page._promo_capture = NetworkCapture().attach(page)
+    return rstats, capture
+
+def _fresh_page_sync(page):
+    """Pestaña nueva en el mismo contexto (la vieja se cierra). Si no se puede, sigue la misma."""
+    try:
+        new_page = page.context.new_page()
+    except Exception as e:
+        print(f"[PLAYWRIGHT] ⚠️ No se pudo abrir pestaña nueva: {e}")
+        return page
+    try: page.close()
+    except Exception: pass
+    return new_page
+
+def _retry_wait(res: Dict[str, Any], attempt: int, error: Exception) -> float:
+    delay = backoff_delay(attempt)
+    print(f"[{res['tag']}] 🔁 Reintento {attempt + 1}/{PAGE_RETRIES} en {delay:.1f}s con pestaña nueva ({error})")
+    return delay
+
+def _scrape_pages_sync(page, band, pager: AdaptivePager, all_items: Dict[str, Dict[str, Any]], parse_paths: Counter,
+                       recorder=None, checkpoint: ScrapeCheckpoint | None = None):
+    """Scrapea la banda página por página. Devuelve la pestaña en uso (puede ser otra tras un reintento)."""
+    page_num = 1
+    while page_num <= pager.limit:
+        saved = _from_checkpoint(checkpoint, page_num, band)
+        if saved:
+            _consume_result(saved, all_items, parse_paths, pager, checkpoint)
+            page_num += 1
+            continue
+        if not get_breaker(BREAKER).allow():
+            _consume_result(_short_circuited(page_num, band), all_items, parse_paths, pager, checkpoint)
+            break
+        url = _page_url(page_num, band)
+        res = _new_result(page_num, band)
+        print(f"[{res['tag']}] 📍 Navegando...")
+        t0 = time.perf_counter()
+        for attempt in range(PAGE_RETRIES + 1):
+            rstats, capture = _instrument_sync(page)
+            if rstats: rstats.reset()
+            if capture: capture.reset()
+            try:
+                page.goto(url, wait_until="domcontentloaded", timeout=45000)
+                cards, scrolls = _scroll_until_stable(page)
+                res["scroll"] = f" [{cards} tarjetas, {scrolls} scrolls]"
+                captured = capture.collect() if capture else []
+                if _capture_covers(captured, cards) and not recorder:
+                    _set_page_items(res, captured, [], "")
+                else:
+                    html = page.content()
+                    if recorder: recorder.record(page_num, url, html, band)
+                    _set_page_items(res, captured, *_parse_offers(html))
+                    _page_blocked(res, page.url, html)
+                res["error"] = None
+                break
+            except Exception as e:
+                res["error"] = e
+                if attempt >= PAGE_RETRIES:
+                    break
+                time.sleep(_retry_wait(res, attempt, e))
+                page = _fresh_page_sync(page)
+        res["elapsed"] = time.perf_counter() - t0
+        if rstats: res["resources"] = rstats.summary()
+        _consume_result(res, all_items, parse_paths, pager, checkpoint)
+        page_num += 1
+    return page
+
+# ---------------------------------------------------------------------------
+# ⚡ MODO CONCURRENTE (async_playwright)
+# ---------------------------------------------------------------------------
+
+async def _open_page_pool(browser, workers: int):
+    """Cola con `workers` pestañas (page, rstats, capture), cada una en su propio contexto."""
+    import asyncio
+
+    pool = asyncio.Queue()
+    for _ in range(workers):
+        context = await browser.new_context(user_agent=USER_AGENT)
+        pool.put_nowait(await _instrument_async(await context.new_page()))
+    return pool
+
+async def _instrument_async(page) -> tuple:
+    """(page, rstats, capture) listo para el pool."""
+    rstats = await ResourceFilter().attach_async(page) if resource_filter_enabled() else None
+    capture = await NetworkCapture().attach_async(page) if network_capture_enabled() else None
+    return page, rstats, capture
+
+async def _fresh_page_async(entry: tuple) -> tuple:
+    """Entrada del pool con una pestaña nueva en el mismo contexto (la vieja se cierra)."""
+    page = entry[0]
+    try:
+        fresh = await _instrument_async(await page.context.new_page())
+    except Exception as e:
+        print(f"[PLAYWRIGHT] ⚠️ No se pudo abrir pestaña nueva: {e}")
+        return entry
+    try: await page.close()
+    except Exception: pass
+    return fresh
+
+async def _scrape_page_async(pool, page_num: int, band=None, recorder=None) -> Dict[str, Any]:
+    """
+    Toma una página del pool, navega y parsea; si falla reintenta con
+    backoff y una pestaña nueva. Nunca lanza excepción.
+    """
+    import asyncio
+
+    result = _new_result(page_num, band)
+    entry = await pool.get()
+    url = _page_url(page_num, band)
+    t0 = time.perf_counter()
+    try:
+        for attempt in range(PAGE_RETRIES + 1):
+            page, rstats, capture = entry
+            if rstats: rstats.reset()
+            if capture: capture.reset()
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=45000)
+                cards, scrolls = await _scroll_until_stable_async(page)
+                result["scroll"] = f" [{cards} tarjetas, {scrolls} scrolls]"
+                captured = await capture.collect_async() if capture else []
+                if _capture_covers(captured, cards) and not recorder:
+                    _set_page_items(result, captured, [], "")
+                else:
+                    html = await page.content()
+                    if recorder: recorder.record(page_num, url, html, band)
+                    _set_page_items(result, captured, *_parse_offers(html))
+                    _page_blocked(result, page.url, html)
+                result["error"] = None
+                break
+            except Exception as e:
+                result["error"] = e
+                if attempt >= PAGE_RETRIES:
+                    break
+                await asyncio.sleep(_retry_wait(result, attempt, e))
+                entry = await _fresh_page_async(entry)
+    finally:
+        result["elapsed"] = time.perf_counter() - t0
+        if entry[1]: result["resources"] = entry[1].summary()
+        pool.put_nowait(entry)
+    return result
+
+async def _crawl_target_async(fetch_page, band, pager: AdaptivePager, workers: int, all_items, parse_paths, results: list,
+                              checkpoint: ScrapeCheckpoint | None = None):
+    """
+    Tandas de `workers` páginas de una banda; decide la paginación entre tandas.
+    `fetch_page(page_num, band)` es la corrutina que baja y parsea una página.
+    Las páginas que ya están en el checkpoint (aunque haya huecos entre
+    ellas) no se vuelven a pedir.
+    """
+    import asyncio
+
+    breaker = get_breaker(BREAKER)
+
+    async def guarded(n):
+        saved = _from_checkpoint(checkpoint, n, band)
+        if saved:
+            return saved
+        return await fetch_page(n, band) if breaker.allow() else _short_circuited(n, band)
+
+    next_page = 1
+    while next_page <= pager.limit:
+        wave = range(next_page, min(pager.limit, next_page + workers - 1) + 1)
+        wave_results = await asyncio.gather(*(guarded(n) for n in wave))
+        for res in wave_results:
+            _consume_result(res, all_items, parse_paths, pager, checkpoint)
+        results.extend(wave_results)
+        if breaker.is_open():
+            break
+        next_page = wave[-1] + 1
+
+async def _fetch_offers_async(targets: List[tuple], concurrency: int, recorder=None,
+                              checkpoint: ScrapeCheckpoint | None = None) -> List[Dict[str, Any]]:
+    """
+    Igual que fetch_offers pero con un pool acotado de pestañas en paralelo.
+    Cada pestaña vive en su propio contexto (cookies/cache separados).
+
+    Las páginas se lanzan en tandas de `concurrency`; al cerrar cada tanda se
+    loguea y se mezcla en orden de página (igual que el modo secuencial) y
+    la paginación adaptativa decide si hace falta otra tanda. Las bandas de
+    precio corren a la vez y comparten el mismo pool.
+    """
+    import asyncio
+    from playwright.async_api import async_playwright
+
+    total_base = sum(pager.base_pages for _, pager in targets)
+    workers = min(concurrency, total_base)
+    print(f"\n[PLAYWRIGHT] Iniciando scraping de {total_base} páginas ({workers} en paralelo)")
+    all_items = {}
+    parse_paths = Counter()
+    results = []
+    t_start = time.perf_counter()
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            pool = await _open_page_pool(browser, workers)
+
+            async def fetch_page(n, band):
+                return await _scrape_page_async(pool, n, band, recorder)
+
+            await asyncio.gather(*(
+                _crawl_target_async(fetch_page, band, pager, workers, all_items, parse_paths, results, checkpoint)
+                for band, pager in targets
+            ))
+            await browser.close()
+    except Exception as e:
+        return _partial("PLAYWRIGHT", e, all_items, parse_paths, targets)
+
+    wall = time.perf_counter() - t_start
+    busy = sum(r["elapsed"] for r in results)
+    print(f"[PLAYWRIGHT] ⏱️ {wall:.1f}s reales vs {busy:.1f}s sumando páginas")
+    return _finish("PLAYWRIGHT", all_items, parse_paths, targets, checkpoint)
+
+# ---------------------------------------------------------------------------
+# 🌐 MODO HTTP PRIMERO (aiohttp + Playwright solo de respaldo)
+# ---------------------------------------------------------------------------
+
+class _BrowserFallback:
+    """Pool de Playwright que solo se levanta si alguna página lo necesita."""
+
+    def __init__(self, workers: int):
+        import asyncio
+
+        self.workers = workers
+        self._lock = asyncio.Lock()
+        self._pw = None
+        self._browser = None
+        self.pool = None
+
+    async def get_pool(self):
+        async with self._lock:
+            if self.pool is None:
+                from playwright.async_api import async_playwright
+                print("[HTTP] 🧭 Levantando Chromium para páginas de respaldo")
+                self._pw = await async_playwright().start()
+                self._browser = await self._pw.chromium.launch(headless=True, args=LAUNCH_ARGS)
+                self.pool = await _open_page_pool(self._browser, self.workers)
+            return self.pool
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._pw is not None:
+            await self._pw.stop()
+
+async def _fetch_page_http_first(client, fallback: _BrowserFallback, stats, page_num: int, band=None, recorder=None) -> Dict[str, Any]:
+    """GET + parse; si vuelve challenge o 0 tarjetas, la misma página con Playwright."""
+    from src.offers_http import challenge_reason, timed_get
+
+    url = _page_url(page_num, band)
+    result = _new_result(page_num, band)
+    status, final_url, html, elapsed = await timed_get(client, url)
+    reason = challenge_reason(status, final_url, html)
+    if reason is None:
+        try:
+            result["items"], result["source"] = _parse_offers(html)
+        except Exception as e:
+            reason = f"parser: {e}"
+        if reason is None and not result["items"]:
+            reason = "0 tarjetas"
+    stats.record_http(elapsed, reason is None, reason or "")
+    if reason is None:
+        if recorder: recorder.record(page_num, url, html, band)
+        result["elapsed"] = elapsed
+        result["via"] = "http"
+        return result
+
+    try:
+        pool = await fallback.get_pool()
+    except Exception as e:
+        result["error"] = f"{reason}; sin navegador de respaldo: {e}"
+        result["elapsed"] = elapsed
+        return result
+    result = await _scrape_page_async(pool, page_num, band, recorder)
+    stats.record_browser(result["elapsed"])
+    result["elapsed"] += elapsed
+    result["via"] = f"navegador: {reason}"
+    return result
+
+async def _fetch_offers_http_first(targets: List[tuple], concurrency: int, recorder=None,
+                                   checkpoint: ScrapeCheckpoint | None = None) -> List[Dict[str, Any]]:
+    """
+    Igual que _fetch_offers_async, pero cada página se pide primero por HTTP
+    (una sola sesión aiohttp con keep-alive) y solo cae a Playwright si la
+    respuesta es un challenge o no trae tarjetas.
+    """
+    import asyncio
+    from src.offers_http import FetchPathStats, HttpPageClient, HTTP_POOL
+
+    total_base = sum(pager.base_pages for _, pager in targets)
+    workers = max(1, min(max(concurrency, HTTP_POOL), total_base))
+    print(f"\n[HTTP] Iniciando scraping de {total_base} páginas ({workers} en paralelo, Playwright de respaldo)")
+    all_items = {}
+    parse_paths = Counter()
+    results = []
+    stats = FetchPathStats()
+    fallback = _BrowserFallback(max(1, min(concurrency, workers)))
+    t_start = time.perf_counter()
+    try:
+        async with HttpPageClient(pool_size=workers) as client:
+            async def fetch_page(n, band):
+                return await _fetch_page_http_first(client, fallback, stats, n, band, recorder)
+
+            await asyncio.gather(*(
+                _crawl_target_async(fetch_page, band, pager, workers, all_items, parse_paths, results, checkpoint)
+                for band, pager in targets
+            ))
+    except Exception as e:
+        return _partial("HTTP", e, all_items, parse_paths, targets)
+    finally:
+        try:
+            await fallback.close()
+        except Exception as e:
+            print(f"[HTTP] ⚠️ Error cerrando el navegador de respaldo: {e}")
+
+    wall = time.perf_counter() - t_start
+    busy = sum(r["elapsed"] for r in results)
+    print(f"[HTTP] ⏱️ {wall:.1f}s reales vs {busy:.1f}s sumando páginas")
+    print(f"[HTTP] 📊 {stats.summary()}")
+    return _finish("HTTP", all_items, parse_paths, targets, checkpoint)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+offers_http.py
+
+Descarga de páginas de ofertas por HTTP plano (aiohttp), sin navegador.
+
+El HTML de /ofertas viene renderizado del servidor (tarjetas + JSON de
+estado), así que casi siempre alcanza con un GET. Usamos UNA sesión
+aiohttp con keep-alive y compresión para todo el ciclo; offers_fetcher
+pasa cada respuesta por el mismo _parse_offers y solo abre Playwright
+para las páginas que vuelven como challenge o sin tarjetas.
+
+SCRAPE_HTTP_FIRST=1 activa el modo (default: 0, solo Playwright).
+"""
+
+from __future__ import annotations
+import os
+import time
+from typing import Optional
+
+import aiohttp
+
+from src.http_session import HTML_HEADERS, async_session
+from src.rate_limiter import request_async
+
+HTTP_TIMEOUT = float(os.getenv("SCRAPE_HTTP_TIMEOUT", "20") or 20)
+HTTP_POOL = int(os.getenv("SCRAPE_HTTP_POOL", "8") or 8)
+
+HTTP_HEADERS = HTML_HEADERS
+
+# Pistas de que no nos dieron el listado sino una verificación anti-bot
+CHALLENGE_STATUS = {403, 429, 503}
+CHALLENGE_MARKERS = (
+    "account-verification",
+    "captcha",
+    "suspicious-traffic",
+    "Just a moment",
+    "/gz/webdevice",
+)
+
+
+def http_first_enabled() -> bool:
+    return os.getenv("SCRAPE_HTTP_FIRST", "0").strip().lower() in ("1", "true", "yes")
+
+
+def challenge_reason(status: int, final_url: str, html: str) -> Optional[str]:
+    """Motivo por el que la respuesta no sirve, o None si parece un listado."""
+    if status == 0:
+        return "error de red"
+    if status in CHALLENGE_STATUS:
+        return f"bloqueo HTTP {status}"
+    if status >= 400:
+        return f"HTTP {status}"
+    head = html[:20000]
+    for marker in CHALLENGE_MARKERS:
+        if marker in final_url or marker in head:
+            return f"challenge ({marker})"
+    return None
+
+
+class HttpPageClient:
+    """
+    Sesión aiohttp compartida por todo el ciclo.
+
+    Uso:
+        async with HttpPageClient() as client:
+            status, final_url, html = await client.get(url)
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL, timeout: float = HTTP_TIMEOUT):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self):
+        self.session = async_session(HTTP_HEADERS, limit=self.pool_size, timeout=self.timeout, auto_decompress=True)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, url: str) -> tuple[int, str, str]:
+        # Sin reintentos: un bloqueo acá se resuelve cayendo a Playwright
+        status, html, final_url = await request_async(self.session, "GET", url, max_retries=0, allow_redirects=True)
+        return status, final_url, html
+
+
+class FetchPathStats:
+    """Cuántas páginas resolvió cada camino (http / navegador) y con qué latencia."""
+
+    def __init__(self):
+        self.http_ok = 0
+        self.http_latency = []      # todos los intentos HTTP (sirvan o no)
+        self.browser_latency = []   # solo las páginas que cayeron a Playwright
+        self.fallback_reasons = {}
+
+    def record_http(self, elapsed: float, ok: bool, reason: str = ""):
+        self.http_latency.append(elapsed)
+        if ok:
+            self.http_ok += 1
+        else:
+            key = reason.split(" (")[0]
+            self.fallback_reasons[key] = self.fallback_reasons.get(key, 0) + 1
+
+    def record_browser(self, elapsed: float):
+        self.browser_latency.append(elapsed)
+
+    def summary(self) -> str:
+        total = self.http_ok + len(self.browser_latency)
+        if total == 0:
+            return "sin páginas"
+
+        def avg(values):
+            return sum(values) / len(values) if values else 0.0
+
+        reasons = ", ".join(f"{k}={v}" for k, v in sorted(self.fallback_reasons.items()))
+        return (
+            f"HTTP {self.http_ok}/{total} ({self.http_ok / total:.0%}) prom {avg(self.http_latency):.2f}s | "
+            f"navegador {len(self.browser_latency)}/{total} prom {avg(self.browser_latency):.2f}s"
+            + (f" ({reasons})" if reasons else "")
+        )
+
+
+async def timed_get(client: HttpPageClient, url: str) -> tuple[int, str, str, float]:
+    """GET con cronómetro. Errores de red -> status 0 (el que llama cae a Playwright)."""
+    t0 = time.perf_counter()
+    try:
+        status, final_url, html = await client.get(url)
+    except Exception as e:
+        return 0, url, f"{type(e).__name__}: {e}", time.perf_counter() - t0
+    return status, final_url, html, time.perf_counter() - t0
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+offers_state.py
+
+Extracción de ofertas desde el JSON de estado embebido en la página.
+
+Las páginas de búsqueda/ofertas de Mercado Libre ya traen los resultados
+serializados (poly-cards) dentro de un <script>. Decodificar ese blob es
+mucho más barato que armar el árbol completo de BeautifulSoup y correr
+una docena de selectores por tarjeta.
+
+Si el blob no aparece o cambió de forma, parse_state_offers devuelve None
+y offers_fetcher cae al parser DOM de siempre.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional
+import json
+
+from src.offers_fetcher import (
+    _coupon_from_text,
+    _extract_id_from_url,
+    _promo_from_badge,
+    _with_full,
+)
+
+# Marcadores conocidos del blob de estado (el primero que decodifique gana)
+_STATE_MARKERS = (
+    'id="__PRELOADED_STATE__"',    # <script id="__PRELOADED_STATE__" type="application/json">{...}
+    "window.__PRELOADED_STATE__",  # window.__PRELOADED_STATE__ = {...};
+    "_n.ctx.r=",                   # contexto de render "nordic"
+)
+
+IMAGE_URL = "https://http2.mlstatic.com/D_NQ_NP_{}-O.jpg"
+
+_decoder = json.JSONDecoder()
+
+
+def extract_state(html: str) -> Optional[Any]:
+    """Encuentra y decodifica el JSON de estado. None si no hay."""
+    for marker in _STATE_MARKERS:
+        pos = html.find(marker)
+        if pos == -1:
+            continue
+        start = html.find("{", pos + len(marker))
+        if start == -1:
+            continue
+        try:
+            state, _ = _decoder.raw_decode(html, start)
+            return state
+        except ValueError:
+            continue
+    return None
+
+
+def _iter_polycards(node: Any) -> Iterator[Dict[str, Any]]:
+    """Recorre el estado (en orden) buscando tarjetas poly-card."""
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            pc = cur.get("polycard")
+            if isinstance(pc, dict) and isinstance(pc.get("components"), list):
+                yield pc
+                continue
+            if isinstance(cur.get("metadata"), dict) and isinstance(cur.get("components"), list):
+                yield cur
+                continue
+            stack.extend(reversed(list(cur.values())))
+        elif isinstance(cur, list):
+            stack.extend(reversed(cur))
+
+
+def _fill_template(block: Dict[str, Any]) -> str:
+    """Rellena textos tipo 'Cupón {discount} OFF' con sus values."""
+    text = block.get("text") or ""
+    for v in block.get("values") or []:
+        if not isinstance(v, dict) or not v.get("key"):
+            continue
+        if isinstance(v.get("price"), dict):
+            val = f"${v['price'].get('value', '')}"
+        elif isinstance(v.get("label"), dict):
+            val = v["label"].get("text", "")
+        elif isinstance(v.get("icon"), dict):
+            val = (v["icon"].get("key") or "").upper()
+        else:
+            val = v.get("text", "")
+        text = text.replace("{" + v["key"] + "}", str(val))
+    return text
+
+
+def _component(comps: Dict[str, Any], name: str) -> Dict[str, Any]:
+    block = (comps.get(name) or {}).get(name)
+    return block if isinstance(block, dict) else {}
+
+
+def _map_polycard(pc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    meta = pc.get("metadata") or {}
+    comps = {
+        (c.get("type") or c.get("id")): c
+        for c in pc.get("components") or []
+        if isinstance(c, dict)
+    }
+
+    title = _component(comps, "title").get("text", "").strip()
+    permalink = (meta.get("url") or "").split("#")[0]
+    if not title or not permalink:
+        return None
+    if not permalink.startswith("http"):
+        permalink = "https://" + permalink.lstrip("/")
+
+    price_block = _component(comps, "price")
+    price = float((price_block.get("current_price") or {}).get("value") or 0)
+    original_price = float((price_block.get("previous_price") or {}).get("value") or 0)
+    if price <= 0:
+        return None
+    if original_price == 0:
+        original_price = price
+
+    thumbnail = ""
+    pictures = (pc.get("pictures") or {}).get("pictures") or []
+    if pictures and isinstance(pictures[0], dict) and pictures[0].get("id"):
+        thumbnail = IMAGE_URL.format(pictures[0]["id"])
+
+    reviews_block = _component(comps, "reviews")
+    try: rating = float(reviews_block.get("rating_average") or 0)
+    except (TypeError, ValueError): rating = 0.0
+    try: reviews = int(reviews_block.get("total") or 0)
+    except (TypeError, ValueError): reviews = 0
+
+    promo_tag = _promo_from_badge(_fill_template(_component(comps, "highlight")))
+
+    shipping = _component(comps, "shipping")
+    if "FULL" in _fill_template(shipping).upper():
+        promo_tag = _with_full(promo_tag)
+
+    c_text, c_val, _ = _coupon_from_text(_fill_template(_component(comps, "coupon")))
+
+    return {
+        "id": meta.get("id") or _extract_id_from_url(permalink),
+        "title": title,
+        "price": price,
+        "original_price": original_price,
+        "permalink": permalink,
+        "thumbnail": thumbnail,
+        "promo_tag": promo_tag,
+        "coupon_text": c_text,
+        "coupon_value": c_val,
+        "rating": rating,
+        "reviews_count": reviews,
+    }
+
+
+def map_state_items(state: Any) -> List[Dict[str, Any]]:
+    """Convierte cualquier JSON que contenga poly-cards en items del bot."""
+    items = []
+    for pc in _iter_polycards(state):
+        try:
+            item = _map_polycard(pc)
+        except Exception:
+            continue
+        if item:
+            items.append(item)
+    return items
+
+
+def parse_state_offers(html: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Items desde el estado embebido, o None si no hay blob reconocible
+    (en ese caso el que llama debe usar el parser DOM).
+    """
+    state = extract_state(html)
+    if state is None:
+        return None
+    items = map_state_items(state)
+    return items or None
@@ -4,19 +4,29 @@ promo_enricher.py - VERSIÓN ROBUSTA
 """
 
 from __future__ import annotations
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 import re
 
+from src.items_api import get_item_details, prefetch_item_details
+from src.text_normalize import fold
+
+_ITEM_ID = re.compile(r"MLM-?(\d+)")
+
 def _extract_item_id_from_url(url: str) -> Optional[str]:
-    m = re.search(r"(MLM\d{8,12})", url.upper())
-    if m: return m.group(1)
+    # Acepta "MLM123..." y "MLM-123..." (permalinks con guion), igual que offers_fetcher
+    m = _ITEM_ID.search((url or "").upper())
+    if m: return f"MLM{m.group(1)}"
     return None
 
+def _item_id(item: Dict[str, Any]) -> Optional[str]:
+    """Id normalizado (sin guion) del permalink, o el `id` que ya trae el item."""
+    return _extract_item_id_from_url(_item_url(item)) or _extract_item_id_from_url(str(item.get("id") or ""))
+
 def _normalize_official_tag(text: str) -> Optional[str]:
     if not text: return None
     
     # 🚨 FIX: Creamos la versión sin acento para la comparación
-    t_norm = text.strip().lower().replace("á","a").replace("é","e").replace("í","i").replace("ó","o").replace("ú","u")
+    t_norm = fold(text.strip())
     
     # Usamos las claves sin acento para la comparación
     if "relampago" in t_norm: return "⚡ Oferta Relámpago"
@@ -26,10 +36,17 @@ def _normalize_official_tag(text: str) -> Optional[str]:
     if "recomendado" in t_norm: return "⭐ Recomendado"
     
     return None
+
+def _item_url(item: Dict[str, Any]) -> str:
+    return item.get("permalink") or item.get("url") or item.get("link") or ""
+
+def prefetch_details(items: Iterable[Dict[str, Any]]) -> int:
+    """Etapa batch: datos reales (multi-get /items) de todos los candidatos."""
+    return prefetch_item_details(_item_id(it) for it in items)
     
 def enrich_item(item: Dict[str, Any]) -> Dict[str, Any]:
     enriched = dict(item or {})  
-    url = enriched.get("permalink") or enriched.get("url") or enriched.get("link")
+    url = _item_url(enriched)
     if not url: return enriched
 
     print(f"[ENRICH] 🚀 Procesando: {enriched.get('title', '')[:30]}...")
@@ -56,30 +73,35 @@ def enrich_item(item: Dict[str, Any]) -> Dict[str, Any]:
     if not final_tag and fetcher_tag:
         final_tag = fetcher_tag
 
-    # Calidad simulada para ofertas fuertes
     enriched["rating"] = float(enriched.get("rating") or 0.0)
     enriched["reviews_count"] = int(enriched.get("reviews_count") or 0)
     enriched["sold_quantity"] = int(enriched.get("sold_quantity") or 0)
 
-    if enriched["rating"] == 0.0 and enriched["reviews_count"] == 0:
-        # 🚨 FIX: Usamos t_check sin acentos para validar (Garantiza que no falle por acentos)
-        t_check = final_tag.lower().replace("á","a").replace("é","e").replace("í","i").replace("ó","o").replace("ú","u")
-        
-        if "relampago" in t_check or "mas vendido" in t_check or "full" in t_check:
-            enriched["rating"] = 4.5
-            enriched["reviews_count"] = 100
-            enriched["sold_quantity"] = 500
-            print(f"[QUALITY] Inyectando calidad alta por tag: {final_tag}")
-        elif final_tag:
-            enriched["rating"] = 4.0
-            enriched["reviews_count"] = 50
-            enriched["sold_quantity"] = 100
-            print(f"[QUALITY] Inyectando calidad alta por tag: {final_tag}")
+    # Datos reales del multi-get (prefetch_details) si los hay
+    item_id = _item_id(enriched)
+    details = get_item_details(item_id)
+    if details:
+        enriched["sold_quantity"] = details["sold_quantity"]
+        enriched["condition"] = details["condition"]
+        enriched["seller_id"] = details["seller_id"]
+        enriched["official_store_id"] = details["official_store_id"]
+        enriched["free_shipping"] = details["free_shipping"]
+        enriched["logistic_type"] = details["logistic_type"]
+        enriched["quality_source"] = "api"
+        if details["logistic_type"] == "fulfillment" and "FULL" not in final_tag.upper():
+            final_tag = f"{final_tag} | ⚡ FULL" if final_tag else "⚡ FULL"
+
+    # Sin datos reales pero con tag de promo: no se inventan rating/ventas
+    # (saldrían en el caption y en discount_confidence); se marca para que
+    # is_low_quality confíe en el tag en vez de rechazar por rating 0
+    elif enriched["rating"] == 0.0 and enriched["reviews_count"] == 0 and final_tag:
+        enriched["quality_source"] = "simulated"
+        print(f"[QUALITY] Sin datos de calidad, se confía en el tag: {final_tag}")
 
     enriched["promo_tag"] = final_tag
     enriched["coupon_text"] = fetcher_coupon
     
-    enriched["id"] = _extract_item_id_from_url(url) or enriched.get('id')
+    enriched["id"] = item_id or enriched.get('id')
     
     from src.price_validator import get_discount_confidence_score
     enriched["discount_confidence"] = get_discount_confidence_score(enriched, None)
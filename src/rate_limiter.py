@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+rate_limiter.py
+
+Capa común de rate limiting + reintentos para TODO el HTTP saliente
+(Telegram, alertas, API de ML, scraper HTTP).
+
+  - un token bucket por host (rate = peticiones/seg, burst = ráfaga)
+  - 429/5xx (y 403 de Mercado Libre) se reintentan con backoff
+    exponencial con jitter
+  - POST y demás métodos no idempotentes (sendMessage, refresh de OAuth)
+    solo se reintentan si el servidor pidió esperar (429 con
+    Retry-After/retry_after) o si la conexión ni se abrió: un 5xx o un
+    timeout de lectura pueden haber llegado a procesarse y reintentar
+    duplicaría el mensaje
+  - si el servidor dice cuánto esperar (header Retry-After o el
+    parameters.retry_after de Telegram) se respeta, y el host entero
+    queda en pausa ese tiempo (no solo la petición que falló)
+  - contadores por host para el log del ciclo (stats_summary)
+
+Límites por defecto en HOST_LIMITS; se pueden cambiar con
+RATE_LIMITS="api.mercadolibre.com=10:10,api.telegram.org=1:3"
+
+Uso síncrono (requests):
+    resp = request("POST", url, json=payload, timeout=20)
+
+Uso async (aiohttp):
+    status, text, final_url = await request_async(session, "GET", url, params=...)
+"""
+
+from __future__ import annotations
+import asyncio
+import email.utils
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from src.http_session import DEFAULT_TIMEOUT, get_session
+
+# host -> (peticiones por segundo, ráfaga)
+HOST_LIMITS = {
+    "api.mercadolibre.com": (10.0, 10),
+    "www.mercadolibre.com.mx": (2.0, 4),
+    "api.telegram.org": (1.0, 3),
+    "http2.mlstatic.com": (20.0, 20),   # CDN de imágenes (image_dedup)
+}
+DEFAULT_LIMIT = (5.0, 5)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_403_HOSTS = ("mercadolibre.com",)   # ML responde 403 cuando nos frena
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3") or 3)
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+
+def _parse_limits(raw: str) -> Dict[str, Tuple[float, int]]:
+    limits = {}
+    for chunk in raw.split(","):
+        try:
+            host, spec = chunk.strip().split("=")
+            rate, burst = spec.split(":")
+            limits[host.strip()] = (float(rate), int(burst))
+        except ValueError:
+            if chunk.strip():
+                print(f"[RATE] ⚠️ Límite inválido ignorado: '{chunk}'")
+    return limits
+
+
+HOST_LIMITS.update(_parse_limits(os.getenv("RATE_LIMITS", "")))
+
+
+class TokenBucket:
+    """Token bucket thread-safe; reserve() devuelve cuánto hay que esperar."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Toma un token (puede quedar en negativo) y devuelve la espera necesaria."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class HostStats:
+    __slots__ = ("requests", "retries", "throttled", "waited", "status", "errors")
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self.status = defaultdict(int)
+        self.errors = 0
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_stats: Dict[str, HostStats] = defaultdict(HostStats)
+_registry_lock = threading.Lock()
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).hostname or ""
+
+
+def _bucket(host: str) -> TokenBucket:
+    with _registry_lock:
+        b = _buckets.get(host)
+        if b is None:
+            rate, burst = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+            b = _buckets[host] = TokenBucket(rate, burst)
+        return b
+
+
+def retry_after_seconds(headers, body: str = "") -> Optional[float]:
+    """Retry-After (segundos o fecha HTTP) o parameters.retry_after de Telegram."""
+    raw = (headers or {}).get("Retry-After")
+    if raw:
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(raw).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    if body and "retry_after" in body:
+        try:
+            return float(json.loads(body)["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+    return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Backoff exponencial con jitter: entre la mitad y el total de base*2^n."""
+    ceiling = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def _idempotent(method: str) -> bool:
+    return (method or "GET").upper() in IDEMPOTENT_METHODS
+
+
+def _should_retry(host: str, status: int, retry_after: Optional[float], method: str = "GET") -> bool:
+    if not _idempotent(method):
+        # El server pudo haber procesado la petición: solo si pidió esperar
+        return status == 429 and retry_after is not None
+    if status in RETRY_STATUS:
+        return True
+    return status == 403 and (retry_after is not None or any(h in host for h in RETRY_403_HOSTS))
+
+
+def _never_sent(exc: Exception) -> bool:
+    """True si la conexión no llegó a abrirse (el server no vio la petición)."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if not isinstance(exc, requests.ConnectionError) or not exc.args:
+        return False
+    return isinstance(getattr(exc.args[0], "reason", exc.args[0]), NewConnectionError)
+
+
+def _plan_retry(host: str, status: int, headers, body: str, attempt: int) -> float:
+    """Registra el rechazo, pausa el host si el server lo pide y devuelve la espera."""
+    retry_after = retry_after_seconds(headers, body)
+    delay = retry_after if retry_after is not None else backoff_delay(attempt)
+    stats = _stats[host]
+    stats.retries += 1
+    if retry_after is not None:
+        _bucket(host).pause(retry_after)
+    print(f"[RATE] ⏳ {host} respondió {status or 'error'}; reintento {attempt + 1} en {delay:.1f}s")
+    return delay
+
+
+def throttle(url: str):
+    """Espera (bloqueando) a que el bucket del host tenga lugar."""
+    host = _host(url)
+    wait = _bucket(host).reserve()
+    stats = _stats[host]
+    stats.requests += 1
+    if wait > 0:
+        stats.throttled += 1
+        stats.waited += wait
+        time.sleep(wait)
+
+
+async def throttle_async(url: str):
+    host = _host(url)
+    wait = _bucket(host).reserve()
+    stats = _stats[host]
+    stats.requests += 1
+    if wait > 0:
+        stats.throttled += 1
+        stats.waited += wait
+        await asyncio.sleep(wait)
+
+
+def request(method: str, url: str, session=None, max_retries: int = MAX_RETRIES, **kwargs) -> requests.Response:
+    """
+    Petición con rate limit y reintentos sobre la sesión compartida del
+    hilo (http_session.get_session) salvo que se pase otra. Devuelve la última
+    respuesta (aunque sea de error); las excepciones de red se relanzan
+    cuando se acaban los reintentos.
+    """
+    host = _host(url)
+    sender = session or get_session()
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    for attempt in range(max_retries + 1):
+        throttle(url)
+        try:
+            resp = sender.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            _stats[host].errors += 1
+            if attempt >= max_retries or not (_idempotent(method) or _never_sent(e)):
+                raise
+            time.sleep(_plan_retry(host, 0, None, "", attempt))
+            continue
+        _stats[host].status[resp.status_code] += 1
+        if attempt < max_retries and _should_retry(host, resp.status_code,
+                                                   retry_after_seconds(resp.headers, resp.text[:500]), method):
+            time.sleep(_plan_retry(host, resp.status_code, resp.headers, resp.text[:500], attempt))
+            continue
+        return resp
+    return resp
+
+
+async def request_async(session, method: str, url: str, max_retries: int = MAX_RETRIES,
+                        with_headers: bool = False, **kwargs) -> Tuple:
+    """
+    Igual que request() pero con aiohttp. Devuelve (status, texto, url final)
+    y, con with_headers=True, además los headers de la respuesta.
+    Las excepciones de red se relanzan cuando se acaban los reintentos.
+    """
+    import aiohttp
+
+    host = _host(url)
+    for attempt in range(max_retries + 1):
+        await throttle_async(url)
+        try:
+            async with session.request(method, url, **kwargs) as resp:
+                text = await resp.text(errors="replace")
+                status, headers, final_url = resp.status, resp.headers, str(resp.url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _stats[host].errors += 1
+            never_sent = isinstance(e, aiohttp.ClientConnectorError)
+            if attempt >= max_retries or not (_idempotent(method) or never_sent):
+                raise
+            await asyncio.sleep(_plan_retry(host, 0, None, "", attempt))
+            continue
+        _stats[host].status[status] += 1
+        if attempt < max_retries and _should_retry(host, status, retry_after_seconds(headers, text[:500]), method):
+            await asyncio.sleep(_plan_retry(host, status, headers, text[:500], attempt))
+            continue
+        break
+    return (status, text, final_url, dict(headers)) if with_headers else (status, text, final_url)
+
+
+def host_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        host: {
+            "requests": s.requests,
+            "retries": s.retries,
+            "throttled": s.throttled,
+            "waited_s": round(s.waited, 1),
+            "errors": s.errors,
+            "status": dict(s.status),
+        }
+        for host, s in _stats.items()
+    }
+
+
+def stats_summary() -> str:
+    if not _stats:
+        return "sin peticiones"
+    parts = []
+    for host, s in sorted(_stats.items()):
+        codes = " ".join(f"{k}={v}" for k, v in sorted(s.status.items()))
+        parts.append(
+            f"{host}: {s.requests} req, {s.retries} reintentos, "
+            f"{s.throttled} frenadas ({s.waited:.1f}s)"
+            + (f", {s.errors} errores de red" if s.errors else "")
+            + (f" [{codes}]" if codes else "")
+        )
+    return " | ".join(parts)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+resource_filter.py
+
+Filtro de recursos para Playwright (page.route).
+
+Para parsear ofertas solo necesitamos el HTML: las URLs de imagen ya vienen
+en los atributos src/data-src, así que bloquear la descarga de las imágenes
+no cambia lo que ve _parse_html_offers. Igual con fuentes, video y los
+scripts de tracking/ads.
+
+Reglas (en este orden):
+  1. Dominio en SCRAPE_ALLOW_DOMAINS  -> se deja pasar siempre
+  2. Dominio en SCRAPE_DENY_DOMAINS   -> se bloquea
+  3. Tipo en SCRAPE_BLOCK_TYPES       -> se bloquea
+  4. Todo lo demás                    -> se deja pasar
+
+Como el request bloqueado nunca se descarga, los bytes ahorrados son una
+ESTIMACIÓN (promedio por tipo de recurso). Los bytes cargados sí son reales
+(content-length de las respuestas que pasaron).
+
+Uso:
+    rf = ResourceFilter()
+    stats = rf.attach(page)
+    page.goto(url)
+    print(stats.summary())
+    stats.reset()
+"""
+
+import os
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+def _env_list(key: str, default: str) -> list[str]:
+    raw = os.getenv(key, default) or ""
+    return [x.strip().lower() for x in raw.split(",") if x.strip()]
+
+
+BLOCK_TYPES = _env_list("SCRAPE_BLOCK_TYPES", "image,media,font")
+DENY_DOMAINS = _env_list(
+    "SCRAPE_DENY_DOMAINS",
+    "doubleclick.net,googletagmanager.com,google-analytics.com,googlesyndication.com,"
+    "googleadservices.com,facebook.net,facebook.com,hotjar.com,clarity.ms,criteo.com,"
+    "criteo.net,taboola.com,bat.bing.com",
+)
+ALLOW_DOMAINS = _env_list("SCRAPE_ALLOW_DOMAINS", "")
+
+# Tamaño promedio aproximado por tipo (bytes) para estimar el ahorro
+AVG_BYTES = {
+    "image": 40_000,
+    "media": 400_000,
+    "font": 35_000,
+    "script": 60_000,
+    "stylesheet": 25_000,
+}
+DEFAULT_AVG_BYTES = 5_000
+
+
+def _domain_matches(host: str, domains: list[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class ResourceStats:
+    """Contadores de una página (se pueden reiniciar entre navegaciones)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.blocked = Counter()
+        self.saved_bytes = 0
+        self.loaded_bytes = 0
+        self.requests = 0
+
+    def _on_response(self, response):
+        try:
+            size = int(response.headers.get("content-length") or 0)
+        except (ValueError, TypeError):
+            size = 0
+        self.loaded_bytes += size
+
+    def summary(self) -> str:
+        if not self.blocked:
+            return f"0/{self.requests} bloqueados, {self.loaded_bytes / 1024:.0f} KB cargados"
+        detail = ", ".join(f"{k}={v}" for k, v in self.blocked.most_common())
+        total = sum(self.blocked.values())
+        return (
+            f"{total}/{self.requests} bloqueados ({detail}), "
+            f"~{self.saved_bytes / 1024:.0f} KB ahorrados, "
+            f"{self.loaded_bytes / 1024:.0f} KB cargados"
+        )
+
+
+class ResourceFilter:
+    """Decide qué requests se abortan y cuenta el ahorro por página."""
+
+    def __init__(self, block_types=None, deny_domains=None, allow_domains=None):
+        self.block_types = set(BLOCK_TYPES if block_types is None else block_types)
+        self.deny_domains = list(DENY_DOMAINS if deny_domains is None else deny_domains)
+        self.allow_domains = list(ALLOW_DOMAINS if allow_domains is None else allow_domains)
+
+    def block_reason(self, url: str, resource_type: str) -> str | None:
+        """Devuelve la etiqueta de bloqueo ('image', 'tracking', ...) o None."""
+        host = (urlsplit(url).hostname or "").lower()
+        if _domain_matches(host, self.allow_domains):
+            return None
+        if _domain_matches(host, self.deny_domains):
+            return "tracking"
+        if resource_type in self.block_types:
+            return resource_type
+        return None
+
+    def _register(self, stats: ResourceStats, request) -> str | None:
+        stats.requests += 1
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason:
+            stats.blocked[reason] += 1
+            stats.saved_bytes += AVG_BYTES.get(request.resource_type, DEFAULT_AVG_BYTES)
+        return reason
+
+    def attach(self, page) -> ResourceStats:
+        """Instala el filtro en una página de sync_playwright."""
+        stats = ResourceStats()
+
+        def handler(route):
+            if self._register(stats, route.request):
+                route.abort()
+            else:
+                route.continue_()
+
+        page.route("**/*", handler)
+        page.on("response", stats._on_response)
+        return stats
+
+    async def attach_async(self, page) -> ResourceStats:
+        """Instala el filtro en una página de async_playwright."""
+        stats = ResourceStats()
+
+        async def handler(route):
+            if self._register(stats, route.request):
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await page.route("**/*", handler)
+        page.on("response", stats._on_response)
+        return stats
+
+
+def resource_filter_enabled() -> bool:
+    """SCRAPE_BLOCK_RESOURCES=0 desactiva el filtro."""
+    return os.getenv("SCRAPE_BLOCK_RESOURCES", "1").strip().lower() in ("1", "true", "yes")
@@ -8,6 +8,7 @@ No necesitas estar pendiente, se ejecuta solo.
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
 
@@ -26,6 +27,14 @@ class PromoScheduler:
         """Inicializar scheduler"""
         self.scheduler = BackgroundScheduler()
         self.is_running = False
+        # Un solo hilo trabajador persistente para que los ciclos no se
+        # pisen. El Chromium tibio de browser_manager vive en su propio
+        # hilo, así que aquí se puede usar asyncio.run sin problema.
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="promo_job")
+    
+    def _run_in_worker(self, job_func):
+        """Ejecuta job_func en el hilo trabajador y espera a que termine."""
+        return self._worker.submit(job_func).result()
     
     def start(self, job_func, interval_minutes: int = 30):
         """
@@ -46,8 +55,9 @@ class PromoScheduler:
         try:
             # Agregar job
             self.scheduler.add_job(
-                job_func,
+                self._run_in_worker,
                 'interval',
+                args=[job_func],
                 minutes=interval_minutes,
                 id='promo_bot_job',
                 name=f'Ejecutar cada {interval_minutes} minutos',
@@ -92,8 +102,16 @@ Presiona CTRL+C para detener.
             self.stop()
     
     def stop(self):
-        """Detener el scheduler"""
+        """Detener el scheduler y cerrar el browser compartido"""
         if self.scheduler.running:
             self.scheduler.shutdown()
             self.is_running = False
-            print("[SCHEDULER] ✓ Detenido correctamente")
\ No newline at end of file
+            print("[SCHEDULER] ✓ Detenido correctamente")
+        
+        # Cerrar Chromium (browser_manager lo hace en su propio hilo)
+        try:
+            from src.browser_manager import shutdown_browser_manager
+            shutdown_browser_manager()
+        except Exception as e:
+            print(f"[SCHEDULER] ⚠️ No se pudo cerrar el browser: {e}")
+        self._worker.shutdown(wait=False)
\ No newline at end of file
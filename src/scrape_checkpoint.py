@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+scrape_checkpoint.py
+
+Checkpoint por ciclo de las páginas que el scraper ya terminó.
+
+Cada página parseada se guarda (items + parser) en
+data/scrape_checkpoint.json, con escritura atómica. Si el ciclo se cae a
+la mitad (timeout, crash de Chromium, proceso reiniciado), el siguiente
+arranque con el MISMO plan (rango de precios / bandas) y dentro de
+SCRAPE_CHECKPOINT_TTL segundos re-usa esas páginas y sigue desde la
+página que falta (saltando todas las guardadas, aunque haya huecos), en
+lugar de volver a la página 1.
+
+El checkpoint se borra solo cuando el ciclo termina sin páginas con
+error; si alguna falló se conserva para pedir solo esas.
+SCRAPE_CHECKPOINT=0 lo desactiva.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+CHECKPOINT_FILE = ROOT / "data" / "scrape_checkpoint.json"
+
+CHECKPOINT_TTL = int(os.getenv("SCRAPE_CHECKPOINT_TTL", "1800") or 1800)
+
+
+def checkpoint_enabled() -> bool:
+    return os.getenv("SCRAPE_CHECKPOINT", "1").strip().lower() in ("1", "true", "yes")
+
+
+class ScrapeCheckpoint:
+    """Páginas terminadas del ciclo, indexadas por tag ('PAGE 3', '$300-800 P2')."""
+
+    def __init__(self, plan: str, path: Path = CHECKPOINT_FILE, ttl: int = CHECKPOINT_TTL):
+        self.plan = plan
+        self.path = Path(path)
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.failed = set()   # tags con error en ESTE ciclo
+        self.started_at = time.time()
+        self._load(ttl)
+        if self.pages:
+            print(f"[CHECKPOINT] ♻️ Retomando ciclo: {len(self.pages)} páginas ya hechas")
+
+    def _load(self, ttl: int):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[CHECKPOINT] ⚠️ Checkpoint ilegible, se ignora: {e}")
+            return
+        if data.get("plan") != self.plan:
+            return
+        if time.time() - float(data.get("updated_at") or 0) > ttl:
+            print("[CHECKPOINT] ⌛ Checkpoint vencido, se empieza de cero")
+            return
+        self.pages = data.get("pages") or {}
+        self.started_at = float(data.get("started_at") or self.started_at)
+
+    def get(self, tag: str) -> Optional[Dict[str, Any]]:
+        return self.pages.get(tag)
+
+    def record(self, res: Dict[str, Any]):
+        """Guarda una página terminada sin error."""
+        self.pages[res["tag"]] = {
+            "page": res["page"],
+            "items": res["items"],
+            "source": res["source"],
+            "origins": res.get("origins") or {},
+        }
+        self.failed.discard(res["tag"])
+        self._save()
+
+    def record_failure(self, res: Dict[str, Any]):
+        """Página que terminó con error: el checkpoint no se borra al cerrar el ciclo."""
+        self.failed.add(res["tag"])
+
+    def _save(self):
+        payload = {"plan": self.plan, "started_at": self.started_at, "updated_at": time.time(), "pages": self.pages}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"[CHECKPOINT] ❌ No se pudo guardar {self.path.name}: {e}")
+
+    def clear(self):
+        """Ciclo completo sin errores: el próximo empieza de cero."""
+        self.pages = {}
+        self.failed = set()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[CHECKPOINT] ⚠️ No se pudo borrar {self.path.name}: {e}")
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
-import os, requests
+import os
 from dotenv import load_dotenv
 from src.offers_fetcher import fetch_offers
+from src.http_session import get_session
 
 def has_affiliate(url: str) -> bool:
     return "matt_word=" in url and "matt_tool=" in url
@@ -16,7 +17,7 @@ def main():
         print("URL   :", url)
         print("AFF   :", "OK" if has_affiliate(url) else "MISSING")
         try:
-            r = requests.head(url, allow_redirects=True, timeout=10)
+            r = get_session().head(url, allow_redirects=True, timeout=10)
             print("FINAL :", r.url[:140])
         except Exception as e:
             print("HEAD error:", e)
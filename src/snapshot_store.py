@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+snapshot_store.py
+
+Grabación y replay del HTML que descarga el scraper.
+
+Grabar (SCRAPE_RECORD=1):
+    Cada ciclo crea data/snapshots/AAAAMMDD_HHMMSS/ con:
+      page_001.html.gz, page_002.html.gz, ...
+      manifest.json  -> [{page, band, url, timestamp, sha256, file, bytes}, ...]
+    Se conservan los últimos SNAPSHOT_KEEP ciclos (default 20).
+
+Replay (SCRAPE_REPLAY=<carpeta de ciclo> o "latest"):
+    fetch_offers lee las páginas de la carpeta en lugar de abrir Chromium.
+    Sirve como corpus fijo para benchmarks de parsers (bench_parsers.py
+    acepta la misma carpeta) y para correr todo el pipeline sin red.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SNAPSHOT_DIR = ROOT / "data" / "snapshots"
+MANIFEST = "manifest.json"
+
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", "20") or 20)
+
+
+def record_enabled() -> bool:
+    return os.getenv("SCRAPE_RECORD", "0").strip().lower() in ("1", "true", "yes")
+
+
+def replay_source() -> str:
+    """Valor de SCRAPE_REPLAY ('' si no hay replay)."""
+    return os.getenv("SCRAPE_REPLAY", "").strip()
+
+
+class SnapshotRecorder:
+    """Escribe las páginas de un ciclo comprimidas + manifest."""
+
+    def __init__(self, base_dir: Path = SNAPSHOT_DIR):
+        self.base_dir = Path(base_dir)
+        self.dir = self.base_dir / datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.entries = []
+        self.pruned = False
+        print(f"[SNAPSHOT] 💾 Grabando páginas en {self.dir}")
+
+    def record(self, page_num: int, url: str, html: str, band: tuple[float, float] | None = None):
+        raw = html.encode("utf-8")
+        # Numeración por orden de grabación: con bandas de precio hay varias
+        # "página 1" en el mismo ciclo (el replay las distingue por URL)
+        name = f"page_{len(self.entries) + 1:03d}.html.gz"
+        (self.dir / name).write_bytes(gzip.compress(raw, compresslevel=6))
+        self.entries.append({
+            "page": page_num,
+            "band": list(band) if band else None,
+            "url": url,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "sha256": hashlib.sha256(raw).hexdigest(),
+            "file": name,
+            "bytes": len(raw),
+        })
+        self._write_manifest()
+
+    def _write_manifest(self):
+        tmp = self.dir / (MANIFEST + ".tmp")
+        tmp.write_text(json.dumps(self.entries, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.dir / MANIFEST)
+        # _prune solo cuenta ciclos con manifest: recién ahora entra este
+        if not self.pruned:
+            self.pruned = True
+            _prune(self.base_dir, SNAPSHOT_KEEP)
+
+
+def _prune(base_dir: Path, keep: int):
+    """Borra los ciclos más viejos dejando `keep`."""
+    if not base_dir.exists():
+        return
+    cycles = sorted(d for d in base_dir.iterdir() if (d / MANIFEST).exists())
+    for old in cycles[:-keep] if keep > 0 else []:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def resolve_replay_dir(source: str) -> Path | None:
+    """'latest' -> último ciclo grabado; si no, la ruta dada."""
+    if source.lower() == "latest":
+        if not SNAPSHOT_DIR.exists():
+            return None
+        cycles = sorted(d for d in SNAPSHOT_DIR.iterdir() if (d / MANIFEST).exists())
+        return cycles[-1] if cycles else None
+    path = Path(source)
+    if not path.is_absolute():
+        path = ROOT / path
+    return path if (path / MANIFEST).exists() else None
+
+
+def _band_key(band) -> tuple | None:
+    return tuple(float(x) for x in band) if band else None
+
+
+class SnapshotReplay:
+    """
+    Lee páginas grabadas por URL o, si la URL no está, por (banda, página).
+    Nunca mezcla bandas: si una grabación vieja (sin banda en el manifest)
+    repite números de página, tenía bandas y se lee solo por URL.
+    """
+
+    def __init__(self, cycle_dir: Path):
+        self.dir = Path(cycle_dir)
+        self.entries = json.loads((self.dir / MANIFEST).read_text(encoding="utf-8"))
+        self.by_url = {e["url"]: e for e in self.entries}
+        self.by_page = {}
+        ambiguous = set()
+        for e in self.entries:
+            key = (_band_key(e.get("band")), e["page"])
+            if key in self.by_page:
+                ambiguous.add(key)
+            self.by_page[key] = e
+        if ambiguous:
+            self.by_page = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, page_num: int, url: str, band: tuple[float, float] | None = None) -> str | None:
+        entry = self.by_url.get(url) or self.by_page.get((_band_key(band), page_num))
+        if not entry:
+            return None
+        raw = gzip.decompress((self.dir / entry["file"]).read_bytes())
+        if hashlib.sha256(raw).hexdigest() != entry["sha256"]:
+            print(f"[SNAPSHOT] ⚠️ Hash distinto en {entry['file']}, se usa igual")
+        return raw.decode("utf-8")
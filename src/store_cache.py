@@ -1,53 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+store_cache.py
+
+Caché de productos ya publicados (hash del título + link canónico).
+
+Antes cada publicación reescribía title_cache.json y seen_products.json
+completos (indent=2, sin escritura atómica): el costo crecía con el
+historial y un corte a media escritura dejaba el JSON roto. Ahora:
+
+  - SQLite en modo WAL (data/seen_cache.db), tablas title_hashes y
+    seen_products con clave primaria: insertar es O(1) y cada flush es
+    una transacción (atómica)
+  - en memoria quedan los mismos title_cache / seen_products para
+    consultar sin tocar el disco; al arrancar se cargan con dos SELECT
+  - add_product_to_cache solo encola; flush_seen_cache() escribe el lote
+    al final del ciclo (también cada SEEN_FLUSH_BATCH altas y al salir)
+  - la primera vez (o si el JSON cambió, p.ej. al restaurar un respaldo)
+    se importan data/title_cache.json y data/seen_products.json; los
+    JSON no se borran
+"""
+
+import atexit
 import hashlib
 import os
 import json
+import sqlite3
+import threading
 from datetime import datetime
 
+from src.near_dup import find_near_duplicate, remember_title, save_index
+from src.text_normalize import title_key
+
+SEEN_DB_FILE = "data/seen_cache.db"
 TITLE_CACHE_FILE = "data/title_cache.json"
 SEEN_PRODUCTS_FILE = "data/seen_products.json"
+SEEN_FLUSH_BATCH = max(1, int(os.getenv("SEEN_FLUSH_BATCH", "5") or 5))
+# Versión de la clave del hash de títulos: si cambia title_key, se sube
+# para no mezclar hashes de claves distintas (los viejos siguen por
+# _legacy_title_hash)
+TITLE_HASH_VERSION = "v2"
 
 title_cache = set()
 seen_products = {}
 
+_pending_titles = []    # [(hash, ts)] sin escribir
+_pending_links = []     # [(link, ts)] sin escribir
+_conn = None
+_lock = threading.Lock()
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(SEEN_DB_FILE) or ".", exist_ok=True)
+        _conn = sqlite3.connect(SEEN_DB_FILE, check_same_thread=False, timeout=10)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.execute("CREATE TABLE IF NOT EXISTS title_hashes (hash TEXT PRIMARY KEY, ts TEXT)")
+        _conn.execute("CREATE TABLE IF NOT EXISTS seen_products (link TEXT PRIMARY KEY, ts TEXT)")
+        _conn.execute("CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY, signature TEXT)")
+        _conn.commit()
+    return _conn
+
+
+def _file_signature(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}:{int(st.st_mtime)}"
+
+
+def _migrate_json(db: sqlite3.Connection):
+    """Importa los JSON viejos (INSERT OR IGNORE: repetirlo no duplica nada)."""
+    for path, table in ((TITLE_CACHE_FILE, "title_hashes"), (SEEN_PRODUCTS_FILE, "seen_products")):
+        if not os.path.exists(path):
+            continue
+        signature = _file_signature(path)
+        row = db.execute("SELECT signature FROM migrations WHERE source=?", (path,)).fetchone()
+        if row and row[0] == signature:
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[CACHE] ⚠️ No se pudo migrar {path}: {e}")
+            continue
+        if table == "title_hashes":
+            rows = [(h, "") for h in data]
+        else:
+            rows = [(link, ts) for link, ts in data.items()]
+        with db:
+            db.executemany(f"INSERT OR IGNORE INTO {table} VALUES (?, ?)", rows)
+            db.execute("INSERT OR REPLACE INTO migrations VALUES (?, ?)", (path, signature))
+        print(f"[CACHE] 📥 {len(rows)} registros migrados de {path} a {SEEN_DB_FILE}")
+
+
 def init_title_cache():
     global title_cache, seen_products
 
-    if os.path.exists(TITLE_CACHE_FILE):
-        with open(TITLE_CACHE_FILE, "r", encoding="utf-8") as f:
-            title_cache = set(json.load(f))
+    with _lock:
+        db = _db()
+        _migrate_json(db)
+        title_cache = {h for (h,) in db.execute("SELECT hash FROM title_hashes")}
+        seen_products = dict(db.execute("SELECT link, ts FROM seen_products"))
 
-    if os.path.exists(SEEN_PRODUCTS_FILE):
-        with open(SEEN_PRODUCTS_FILE, "r", encoding="utf-8") as f:
-            seen_products = json.load(f)
+def flush_seen_cache() -> int:
+    """Escribe en una transacción las altas pendientes; devuelve cuántas fueron."""
+    with _lock:
+        if not _pending_titles and not _pending_links:
+            return 0
+        count = len(_pending_titles) + len(_pending_links)
+        try:
+            with _db() as db:
+                db.executemany("INSERT OR IGNORE INTO title_hashes VALUES (?, ?)", _pending_titles)
+                db.executemany("INSERT OR REPLACE INTO seen_products VALUES (?, ?)", _pending_links)
+        except sqlite3.Error as e:
+            # Quedan pendientes: se reintenta en el próximo flush
+            print(f"[CACHE] ❌ Advertencia: No se pudo guardar el caché. Error: {e}")
+            return 0
+        _pending_titles.clear()
+        _pending_links.clear()
+    save_index()
+    return count
 
 def save_title_cache():
-    # 🚨 CORRECCIÓN: Manejar el PermissionError al guardar
-    try:
-        with open(TITLE_CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(list(title_cache), f, ensure_ascii=False, indent=2)
-
-        with open(SEEN_PRODUCTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(seen_products, f, ensure_ascii=False, indent=2)
-            
-    except Exception as e:
-        # Esto evita que el bot muera; solo se salta el guardado en este ciclo.
-        print(f"[CACHE] ❌ Advertencia: No se pudo guardar el caché. Error: {e}")
+    # Nombre histórico: ya no reescribe nada, solo baja lo pendiente
+    flush_seen_cache()
+
+atexit.register(flush_seen_cache)
+
+def _title_hash(title: str) -> str:
+    # Clave normalizada (sin acentos/colores): "Colchón ... Blanco" = "colchon ... negro"
+    return hashlib.md5(f"{TITLE_HASH_VERSION}:{title_key(title or '')}".encode()).hexdigest()
+
+def _legacy_title_hash(title: str) -> str:
+    # v1: hashes guardados antes de title_key (solo minúsculas)
+    return hashlib.md5((title or "").lower().strip().encode()).hexdigest()
 
 def is_product_seen(title: str, canonical_id: str) -> bool:
-    title_hash = hashlib.md5(title.lower().strip().encode()).hexdigest()
-    return title_hash in title_cache or canonical_id in seen_products
+    if canonical_id in seen_products:
+        return True
+    if _title_hash(title) in title_cache or _legacy_title_hash(title) in title_cache:
+        return True
+    # Variantes y republicaciones con otra redacción (MinHash/LSH)
+    match = find_near_duplicate(title)
+    if match:
+        print(f"[CACHE] 🔁 Casi duplicado ({match[1]:.2f}): '{title[:50]}' ~ '{match[0][:50]}'")
+        return True
+    return False
+
+def seen_ratio(titles, near_dup: bool = True) -> float:
+    """
+    Fracción de títulos ya publicados (hash exacto o, con near_dup, casi
+    duplicado). Solo lectura y sin logs: la usa crawl_plan por página.
+    """
+    titles = list(titles)
+    if not titles:
+        return 0.0
+    seen = 0
+    for title in titles:
+        if _title_hash(title) in title_cache or _legacy_title_hash(title) in title_cache:
+            seen += 1
+        elif near_dup and find_near_duplicate(title):
+            seen += 1
+    return seen / len(titles)
 
 def add_product_to_cache(it: dict, final_link: str):
-    title = it.get("title", "").lower().strip()
-    
+    title = it.get("title", "")
+
     # 🚨 FIX CRÍTICO: Asegurarse de que final_link no sea None
     if not final_link:
         print("[CACHE] ⚠️ Advertencia: Link nulo o vacío, no se agregó a la caché.")
         return False
-        
+
     canonical = final_link.strip()
-    title_hash = hashlib.md5(title.encode()).hexdigest()
-    title_cache.add(title_hash)
-    seen_products[canonical] = datetime.now().isoformat()
-    save_title_cache()
-    return True
\ No newline at end of file
+    now = datetime.now().isoformat()
+    title_hash = _title_hash(title)
+    with _lock:
+        title_cache.add(title_hash)
+        seen_products[canonical] = now
+        _pending_titles.append((title_hash, now))
+        _pending_links.append((canonical, now))
+        pending = len(_pending_links)
+    remember_title(title)
+    if pending >= SEEN_FLUSH_BATCH:
+        flush_seen_cache()
+    return True
@@ -3,6 +3,9 @@ import requests
 import os
 from dotenv import load_dotenv
 
+from src.circuit_breaker import get_breaker, service_up
+from src.rate_limiter import request
+
 # Cargar el archivo .env al inicio del modulo
 load_dotenv()
 
@@ -21,13 +24,21 @@ def _send_request(method: str, payload: dict) -> bool:
         print(f"[TELEGRAM] Error: Faltan credenciales en .env")
         return False
         
+    breaker = get_breaker("telegram")
+    if not breaker.allow():
+        print(f"[telegram] Circuito abierto, no se envía ({breaker.summary()})")
+        return False
+
     url = f"{API_URL}/{method}"
     try:
-        resp = requests.post(url, json=payload, timeout=20)
+        # rate limit por host + reintento respetando retry_after de Telegram
+        resp = request("POST", url, json=payload, timeout=20)
     except requests.RequestException as e:
+        breaker.record_failure(f"red: {e}")
         print(f"[telegram] ERROR de red: {e}")
         return False
 
+    breaker.record(service_up(resp.status_code), f"HTTP {resp.status_code}")
     if resp.status_code != 200:
         print(f"[telegram] ERROR HTTP {resp.status_code}: {resp.text}")
         return False
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+token_manager.py
+
+Un solo lugar para el access token de Mercado Libre (OAuth).
+
+El access token dura ~6 horas, así que no hace falta pedir uno nuevo a
+/oauth/token en cada corrida. Lo guardamos con su vencimiento en
+data/meli_token.json y solo se renueva cuando faltan menos de
+TOKEN_REFRESH_MARGIN segundos (default 10 min).
+
+  - escritura atómica (tmp + os.replace)
+  - lock de archivo (data/meli_token.lock) para que dos procesos no
+    renueven a la vez; el segundo relee el archivo y usa el token nuevo
+  - lock de hilo (single-flight): varios hilos/corrutinas pidiendo token
+    a la vez disparan UNA sola renovación
+
+ML rota el refresh token en cada renovación: el nuevo se guarda en el
+mismo archivo, así que ya no se reescribe el .env. MELI_REFRESH_TOKEN
+del .env solo se usa la primera vez (o si el guardado deja de servir).
+
+Uso:
+    from src.token_manager import get_access_token
+    token = get_access_token()   # None si no hay credenciales o falla
+"""
+
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+from src.rate_limiter import request
+
+ROOT = Path(__file__).resolve().parents[1]
+TOKEN_FILE = ROOT / "data" / "meli_token.json"
+LOCK_FILE = ROOT / "data" / "meli_token.lock"
+
+OAUTH_URL = "https://api.mercadolibre.com/oauth/token"
+TOKEN_REFRESH_MARGIN = int(os.getenv("TOKEN_REFRESH_MARGIN", "600") or 600)
+LOCK_TIMEOUT = 30
+
+_thread_lock = threading.Lock()
+_memory: Dict[str, Any] = {}
+
+
+def _env(key: str) -> str:
+    # Limpiamos comillas por si acaso quedaron en el .env
+    return os.getenv(key, "").strip().strip("'").strip('"')
+
+
+def has_credentials() -> bool:
+    return bool(_env("MELI_CLIENT_ID") and _env("MELI_CLIENT_SECRET"))
+
+
+@contextmanager
+def _file_lock():
+    """Lock exclusivo entre procesos (msvcrt en Windows, fcntl en el resto)."""
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fh = open(LOCK_FILE, "a+b")
+    try:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        if os.name == "nt":
+            import msvcrt
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError("lock de token ocupado")
+                    time.sleep(0.1)
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            while True:
+                try:
+                    fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError("lock de token ocupado")
+                    time.sleep(0.1)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    finally:
+        fh.close()
+
+
+def _load() -> Dict[str, Any]:
+    if not TOKEN_FILE.exists():
+        return {}
+    try:
+        return json.loads(TOKEN_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _save(data: Dict[str, Any]):
+    TOKEN_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = TOKEN_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, TOKEN_FILE)
+
+
+def _is_fresh(data: Dict[str, Any]) -> bool:
+    return bool(data.get("access_token")) and data.get("expires_at", 0) - TOKEN_REFRESH_MARGIN > time.time()
+
+
+def _store_response(payload: Dict[str, Any], previous_refresh: str = "") -> Dict[str, Any]:
+    data = {
+        "access_token": payload["access_token"],
+        "refresh_token": payload.get("refresh_token") or previous_refresh,
+        "expires_at": time.time() + int(payload.get("expires_in") or 21600),
+        "obtained_at": time.time(),
+        "user_id": payload.get("user_id"),
+    }
+    _save(data)
+    return data
+
+
+def _post_oauth(payload: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    try:
+        resp = request("POST", OAUTH_URL, data=payload, timeout=15)
+    except requests.RequestException as e:
+        print(f"[TOKEN] ❌ Error de red al renovar: {e}")
+        return None
+    if resp.status_code != 200:
+        print(f"[TOKEN] ❌ Error {resp.status_code} al renovar: {resp.text[:200]}")
+        return None
+    try:
+        return resp.json()
+    except ValueError:
+        print("[TOKEN] ❌ Respuesta de /oauth/token no es JSON")
+        return None
+
+
+def _refresh(cached: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Renueva con el refresh token guardado; si falla, con el del .env."""
+    candidates = []
+    for rt in (cached.get("refresh_token"), _env("MELI_REFRESH_TOKEN")):
+        if rt and rt not in candidates:
+            candidates.append(rt)
+    if not candidates:
+        print("[TOKEN] ❌ No hay MELI_REFRESH_TOKEN (corre setup_tokens.py)")
+        return None
+
+    for rt in candidates:
+        print("[TOKEN] 🔄 Renovando access token con MercadoLibre...")
+        payload = _post_oauth({
+            "grant_type": "refresh_token",
+            "client_id": _env("MELI_CLIENT_ID"),
+            "client_secret": _env("MELI_CLIENT_SECRET"),
+            "refresh_token": rt,
+        })
+        if payload and payload.get("access_token"):
+            return _store_response(payload, rt)
+    return None
+
+
+def get_access_token(force_refresh: bool = False) -> Optional[str]:
+    """
+    Access token vigente. Solo va a /oauth/token si el guardado está por
+    vencer (o si force_refresh=True, p.ej. después de un 401).
+    """
+    global _memory
+    if not force_refresh and _is_fresh(_memory):
+        return _memory["access_token"]
+    if not has_credentials():
+        print("[TOKEN] ❌ Faltan MELI_CLIENT_ID / MELI_CLIENT_SECRET en el .env")
+        return None
+
+    stale = _memory.get("access_token")
+    with _thread_lock:
+        # Otro hilo pudo renovarlo mientras esperábamos el lock
+        if _is_fresh(_memory) and (not force_refresh or _memory["access_token"] != stale):
+            return _memory["access_token"]
+        try:
+            with _file_lock():
+                cached = _load()
+                # ...o lo renovó otro proceso
+                if _is_fresh(cached) and (not force_refresh or cached["access_token"] != stale):
+                    _memory = cached
+                    return cached["access_token"]
+                data = _refresh(cached)
+        except TimeoutError as e:
+            print(f"[TOKEN] ⚠️ {e}; uso lo que haya en disco")
+            cached = _load()
+            data = cached if _is_fresh(cached) else None
+        if not data:
+            return None
+        _memory = data
+        return data["access_token"]
+
+
+def exchange_authorization_code(code: str, redirect_uri: str) -> Optional[Dict[str, Any]]:
+    """Primer canje (code -> tokens) de setup_tokens.py; deja el caché listo."""
+    payload = _post_oauth({
+        "grant_type": "authorization_code",
+        "client_id": _env("MELI_CLIENT_ID"),
+        "client_secret": _env("MELI_CLIENT_SECRET"),
+        "code": code,
+        "redirect_uri": redirect_uri,
+    })
+    if not payload or not payload.get("access_token"):
+        return None
+    global _memory
+    with _thread_lock, _file_lock():
+        _memory = _store_response(payload)
+    return payload
+
+
+def token_status() -> str:
+    data = _memory if _memory else _load()
+    if not data.get("access_token"):
+        return "sin token guardado"
+    left = data.get("expires_at", 0) - time.time()
+    return f"vence en {left / 60:.0f} min" if left > 0 else "vencido"
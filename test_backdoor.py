@@ -1,7 +1,10 @@
-import requests
 import os
 from dotenv import load_dotenv
 
+from src.http_cache import cached_get
+from src.http_session import APP_USER_AGENT
+from src.rate_limiter import request
+
 load_dotenv()
 access_token = os.getenv("MELI_REFRESH_TOKEN", "").strip() # Usamos esto solo para renovar si hiciera falta
 # Nota: Asumimos que el token access está fresco o que probaremos sin token también.
@@ -12,7 +15,7 @@ def probar_puerta_trasera():
     
     headers = {
         # A veces, NO enviar Authorization ayuda en endpoints públicos de navegación
-        "User-Agent": "PromoAdictosBot/1.0"
+        "User-Agent": APP_USER_AGENT
     }
 
     print("🕵️ Probando rutas alternativas de datos...\n")
@@ -23,7 +26,7 @@ def probar_puerta_trasera():
     
     print(f"1️⃣ Intentando descargar 'Destacados de Videojuegos'...")
     try:
-        r = requests.get(url_highlights, headers=headers)
+        r = cached_get(url_highlights, headers=headers)
         if r.status_code == 200:
             data = r.json()
             items = data.get('content', [])
@@ -42,7 +45,7 @@ def probar_puerta_trasera():
     url_cat_search = f"https://api.mercadolibre.com/sites/MLM/search?category={category_id}&sort=price_asc&limit=3"
     
     try:
-        r2 = requests.get(url_cat_search, headers=headers)
+        r2 = request("GET", url_cat_search, headers=headers, timeout=15)
         if r2.status_code == 200:
             print(f"   ✅ ¡ABIERTO! (Búsqueda por categoría funciona)")
             item = r2.json()['results'][0]
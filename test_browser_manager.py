@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Con el Chromium tibio arrancado, el hilo del ciclo tiene que poder seguir
+usando asyncio.run (items_api, image_dedup, meli_search...) y el
+`with sync_playwright()` de affiliate_runtime.
+
+Se usa el driver real de Playwright; solo chromium.launch es falso para
+no depender del binario de Chromium.
+
+    python -m pytest -q test_browser_manager.py
+"""
+
+import asyncio
+
+from playwright.sync_api import sync_playwright as real_sync_playwright
+
+import src.affiliate_runtime as affiliate_runtime
+import src.browser_manager as browser_manager
+
+
+class _FakePage:
+    def on(self, event, handler):
+        pass
+
+    def close(self):
+        pass
+
+
+class _FakeContext:
+    def new_page(self):
+        return _FakePage()
+
+    def close(self):
+        pass
+
+
+class _FakeBrowser:
+    def is_connected(self):
+        return True
+
+    def new_context(self, **kwargs):
+        return _FakeContext()
+
+    def close(self):
+        pass
+
+
+class _FakeChromium:
+    def __init__(self, launches, fail=False):
+        self.launches = launches
+        self.fail = fail
+
+    def launch(self, **kwargs):
+        self.launches.append(kwargs)
+        if self.fail:
+            raise RuntimeError("sin Chromium en la prueba")
+        return _FakeBrowser()
+
+
+class _PlaywrightProxy:
+    """Playwright real (driver y event loop) con chromium falso."""
+
+    def __init__(self, pw, chromium):
+        self._pw = pw
+        self.chromium = chromium
+
+    def stop(self):
+        self._pw.stop()
+
+
+def _playwright_factory(launches, fail=False):
+    """Reemplazo de sync_playwright() que arranca el driver real."""
+    class _Starter:
+        def __init__(self):
+            self._cm = real_sync_playwright()
+
+        def start(self):
+            return _PlaywrightProxy(self._cm.start(), _FakeChromium(launches, fail))
+
+        def __enter__(self):
+            return _PlaywrightProxy(self._cm.__enter__(), _FakeChromium(launches, fail))
+
+        def __exit__(self, *exc):
+            return self._cm.__exit__(*exc)
+
+    return _Starter
+
+
+def test_asyncio_and_affiliate_after_manager_started(monkeypatch):
+    manager_launches, aff_launches = [], []
+    monkeypatch.setattr(browser_manager, "sync_playwright", _playwright_factory(manager_launches))
+    monkeypatch.setattr(affiliate_runtime, "sync_playwright", _playwright_factory(aff_launches, fail=True))
+
+    manager = browser_manager.BrowserManager()
+
+    def open_page():
+        with manager.page():
+            return True
+
+    try:
+        assert manager.run(open_page)
+        assert len(manager_launches) == 1
+
+        async def answer():
+            await asyncio.sleep(0)
+            return 42
+
+        # Antes: "asyncio.run() cannot be called from a running event loop"
+        assert asyncio.run(answer()) == 42
+
+        # Antes: "using Playwright Sync API inside the asyncio loop" sin
+        # llegar a lanzar el browser
+        assert affiliate_runtime._generate_affiliate_url("https://articulo.mercadolibre.com.mx/MLM-1") is None
+        assert len(aff_launches) == 1
+
+        # El browser tibio sigue sirviendo en su hilo
+        assert manager.run(open_page)
+        assert len(manager_launches) == 1
+    finally:
+        manager.shutdown()
+
+
+def test_new_page_outside_run_is_rejected():
+    manager = browser_manager.BrowserManager()
+    try:
+        manager.new_page()
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("new_page() fuera de run() debería fallar")